@@ -2,17 +2,21 @@
 config.py
 Central repository for all stabilized parameters of the simulation.
 """
+import copy
 
 # --- World & Geometry Configuration ---
 WORLD_SETTINGS = {
     "geometry": "square",       # Options: "square", "torus", "l-shape"
     "grid_size": (50, 50),      # Width, Height
+    "backend": "dense",         # Options: "dense" (object array), "sparse" (chunked spatial hash)
+    "chunk_size": 64,           # Sparse backend: cells per chunk side
     "transparency": 0.8,       # Base shared information quality
     "fame_decay": 0.05,        # How fast reputation is forgotten
     "fame_radius": 5,         # Base geography for news travel
     "gossip_reliability": 0.9, # Global channel quality
     "identity_gossip_bias": 0.4,# Maximum distortion caused by being a stranger
     "initial_fame": 0.5,       # Starting neutral reputation
+    "ledger_history": 50,      # Recent public moves kept per agent
 }
 
 # --- Game & Economic Physics ---
@@ -39,7 +43,8 @@ POPULATION_SETTINGS = {
     "mutation_rate": 0.1,
     "birth_protocol": "displace", # Options: "stay", "displace", "launch"
     "starting_points": 150,
-    "max_age": 100             # Maximum lifespan in ticks
+    "max_age": 100,            # Maximum lifespan in ticks
+    "memory_prune_every": 100  # Ticks between sweeps of dead opponents out of private memories
 }
 
 # --- Identity & Tribal Configuration ---
@@ -62,7 +67,8 @@ BRAIN_SETTINGS = {
     "min_memory": 5,
     "max_memory": 50,
     "mutation_power": 0.2, # Standard deviation of Gaussian noise added to weights
-    "mutation_rate": 0.1   # Probability of a weight being mutated
+    "mutation_rate": 0.1,  # Probability of a weight being mutated
+    "precision": "float64" # Brain/identity tensors: "float64" or "float32" (half the memory; see kernels.compare_precision)
 }
 
 # --- Brain Layer Metabolic Costs ---
@@ -74,4 +80,184 @@ BRAIN_COSTS = {
     "reinforcement": 0.03, # Cost of reward-based learning
     "creative": 0.01,      # Cost of random exploration/noise
     "identity": 0.005      # Cost of processing tribal signatures
-}
\ No newline at end of file
+}
+
+# --- Randomness (simulation/rng.py) ---
+RNG_SETTINGS = {
+    "seed": None,              # Root seed for every random stream (None = fresh entropy, printed at start)
+    "block_size": 4096         # Numbers pre-drawn per stream block
+}
+
+# --- Run Control & Steady-State Detection ---
+RUN_SETTINGS = {
+    "max_ticks": 5000,
+    "stop_on_steady_state": False, # End the run once equilibrium is detected
+    "steady_window": 200,          # Ticks per half-window compared
+    "steady_patience": 3,          # Consecutive steady checks required
+    "steady_check_every": 25,      # Ticks between checks
+    "steady_var_ratio": 4.0,       # Max variance ratio between the two halves
+    "steady_floor": 1e-3,          # Scale floor for metrics hovering around zero
+    "steady_criteria": {           # Metric -> relative tolerance on the mean shift
+        "pop": 0.05,
+        "coop_share": 0.05,
+        "avg_w_reptilian": 0.02,
+        "avg_w_hebb": 0.02,
+        "avg_w_memetic": 0.02,
+        "avg_w_rl": 0.02
+    }
+}
+
+# --- Lineage & Phylogeny Tracking ---
+LINEAGE_SETTINGS = {
+    "enabled": False,          # Record parent -> child edges for every birth
+    "prune_every": 250,        # Ticks between coalescence prunes
+    "traits": ["w_reptilian", "w_hebb", "w_memetic", "w_rl", "hidden_size", "creativity"]
+}
+
+# --- Interaction Network ---
+NETWORK_SETTINGS = {
+    "enabled": False,          # Record who plays whom (simulation/network.py)
+    "compact_every": 100,      # Ticks between compactions of the event buffer
+    "buffer_size": 1 << 18,    # Buffered directed events before a forced compaction
+    "decay": 0.995,            # Per-tick weight decay of past interactions
+    "min_weight": 0.05,        # Edges fading below this many plays are dropped
+    "tribe_radius": 0.3        # Cultural distance within which partners count as one tribe
+}
+
+# --- Territory Analytics (simulation/territory.py) ---
+TERRITORY_SETTINGS = {
+    "enabled": False,          # Label contiguous regions of similar agents every `every` ticks
+    "trait": "culture",        # Similarity by "culture" (cultural signature) or "genetic" (green beard)
+    "threshold": 0.3,          # Max signature distance between adjacent cells of one territory
+    "min_area": 4,             # Smaller connected groups are not counted as territories
+    "every": 1,                # Ticks between updates
+    "full_relabel": 0.5        # Relabel everything when more than this share of cells is affected
+}
+
+# --- Sampled Decision Tracer (simulation/tracer.py) ---
+TRACER_SETTINGS = {
+    "enabled": False,          # Record per-layer logit contributions of sampled agents' decisions
+    "rate": 0.02,              # Fraction of agents followed (picked by id, for their whole life)
+    "capacity": 200000,        # Decisions kept in the ring buffer (oldest overwritten)
+    "export": None             # Optional .npz path written at the end of the run
+}
+
+# --- Metric Registry (utils/metrics.py) ---
+METRIC_SETTINGS = {
+    "every": {},               # Per-metric cadence in ticks, e.g. {"avg_hebb_norm": 10}
+    "sample": {},              # Per-metric agent sample fraction, e.g. {"avg_fame": 0.05}
+    "min_sample": 64,          # Sampled metrics never use fewer agents than this
+    "log": None                # Metrics the RollupLogger records (None = all registered)
+}
+
+# --- Metric Rollups & Retention ---
+ROLLUP_SETTINGS = {
+    "enabled": False,          # Use RollupLogger instead of the per-tick CSV
+    "raw_window": 1000,        # Recent ticks kept at full resolution
+    "levels": (10, 100, 1000), # Rollup resolutions (ticks per row)
+    "retention": {10: 10000, 100: 10000, 1000: None}, # Rows kept in memory per level (None = all)
+    "crash_drop": 0.5,         # Population fraction lost that counts as a crash...
+    "crash_window": 20,        # ...within this many ticks
+    "event_post_window": 100   # Ticks recorded after an anomaly (the raw window covers before)
+}
+
+# --- Compute Kernels ---
+KERNEL_SETTINGS = {
+    "backend": "reference"     # Options: "reference" (scalar, sequential turn), "numpy" (batched turn)
+}
+
+# --- Shared-Memory Population Snapshots ---
+SNAPSHOT_SETTINGS = {
+    "enabled": False,          # Publish a snapshot every tick for sidecar readers
+    "name": "muqa_snapshot",   # Shared memory segment name
+    "capacity": 10000          # Max agents per snapshot (extra agents are truncated)
+}
+
+# --- Live Telemetry Server ---
+TELEMETRY_SETTINGS = {
+    "enabled": False,          # Serve stats/frames over localhost while running
+    "host": "127.0.0.1",
+    "port": 8765,              # 0 picks a free port
+    "unix_socket": None,       # Optional extra Unix socket path
+    "queue_size": 32,          # Pending events per client before the oldest are dropped
+    "frame_every": 10,         # Ticks between map frames
+    "frame_size": 64,          # Downsampled frame resolution (cells per side)
+    "metrics": None            # Metrics streamed to clients (None = all registered)
+}
+
+# --- Recorded Frame Stream (Replay) ---
+RECORDER_SETTINGS = {
+    "enabled": False,          # Record every tick's map for utils/replay.py
+    "directory": "recordings", # One sub-directory per run
+    "chunk_ticks": 256         # Frames buffered in memory before each write
+}
+
+# --- Soak Test / Leak Detection (utils/soak.py) ---
+SOAK_SETTINGS = {
+    "ticks": 5000,             # Length of a soak run
+    "sample_every": 100,       # Ticks between memory samples
+    "warmup": 500,             # Ticks ignored while the population settles
+    "tolerance": 0.10,         # Allowed memory growth the live population does not explain (fraction)
+    "top": 10                  # Allocation sites listed in the report
+}
+
+# --- Domain Decomposition (Multi-Process Grid) ---
+DOMAIN_SETTINGS = {
+    "workers": 4,              # Vertical strips / worker processes
+    "min_strip_width": 2       # Each strip needs distinct left and right border columns
+}
+
+# --- Pipelined Run Loop (main.py) ---
+PIPELINE_SETTINGS = {
+    "enabled": False,          # Engine on its own thread; stats, logs and rendering read per-tick snapshots
+    "queue_size": 8,           # Snapshots waiting for the stats stage
+    "policy": "block",         # When stats fall behind: "block" the engine (complete logs) or "drop" the oldest
+    "render_queue_size": 2,    # Stats-stamped snapshots waiting for the dashboard
+    "render_policy": "drop"    # The dashboard skips to the newest tick rather than holding the run back
+}
+
+# --- Island Model (Parallel Populations with Migration) ---
+ISLAND_SETTINGS = {
+    "islands": 4,              # Independent engines, one worker process each
+    "topology": "ring",        # Migration routes: "ring" (to the next island) or "full" (to all others)
+    "migrate_every": 50,       # Ticks between migrations (islands only synchronise then)
+    "migration_fraction": 0.05,# Share of each island's agents sent away per migration
+    "overrides": []            # Per-island {group: {key: value}} config overrides, in island order
+}
+
+# --- What-If Branching (simulation/branching.py) ---
+BRANCH_SETTINGS = {
+    "ticks": 500,              # Ticks each forked branch runs past the fork point
+    "processes": None          # Branches running at once (None = one per CPU)
+}
+
+# --- Sweep Result Cache (utils/runcache.py) ---
+CACHE_SETTINGS = {
+    "directory": "cache/runs", # Entries keyed by hash of resolved settings, seed and engine version
+    "max_bytes": 2 * 1024**3,  # Least recently used entries are evicted beyond this size (None = no limit)
+    "max_age_days": 30,        # Entries unused for longer are evicted (None = keep)
+    "checkpoint_every": 500,   # Ticks between mid-run checkpoints an interrupted run resumes from (0 = off)
+    "processes": None          # Sweep worker processes (None = 1, in-process)
+}
+
+# Every settings group above, in declaration order.
+SETTING_GROUPS = (
+    "WORLD_SETTINGS", "GAME_PHYSICS", "POPULATION_SETTINGS", "IDENTITY_SETTINGS",
+    "BRAIN_SETTINGS", "BRAIN_COSTS", "RNG_SETTINGS", "RUN_SETTINGS", "LINEAGE_SETTINGS",
+    "NETWORK_SETTINGS", "TERRITORY_SETTINGS", "TRACER_SETTINGS", "METRIC_SETTINGS", "ROLLUP_SETTINGS", "KERNEL_SETTINGS",
+    "SNAPSHOT_SETTINGS", "TELEMETRY_SETTINGS", "RECORDER_SETTINGS", "SOAK_SETTINGS",
+    "PIPELINE_SETTINGS", "DOMAIN_SETTINGS", "ISLAND_SETTINGS",
+    "BRANCH_SETTINGS", "CACHE_SETTINGS"
+)
+
+def snapshot_settings():
+    """Returns a deep copy of every settings group (picklable, e.g. for worker processes)."""
+    return {name: copy.deepcopy(globals()[name]) for name in SETTING_GROUPS}
+
+def apply_settings(state):
+    """
+    Updates settings groups in place from a {group: {key: value}} mapping.
+    In-place so modules that did `from config import X` see the new values.
+    """
+    for name, values in state.items():
+        globals()[name].update(values)
\ No newline at end of file
@@ -1,132 +1,144 @@
 """
 main.py
 The orchestration script. Runs the simulation, visualizes it, and logs history.
+Run with --headless to skip the dashboard (matplotlib is then never imported).
 """
 import time
 import sys
-import numpy as np
 from simulation.engine import SimulationEngine
-from utils.visualizer import Visualizer
 from utils.logger import WorldLogger
-from config import WORLD_SETTINGS
+from config import (WORLD_SETTINGS, SNAPSHOT_SETTINGS, TELEMETRY_SETTINGS, ROLLUP_SETTINGS, RUN_SETTINGS,
+                    RECORDER_SETTINGS, METRIC_SETTINGS, PIPELINE_SETTINGS, TRACER_SETTINGS)
+from utils.convergence import SteadyStateDetector
+from utils.metrics import default_registry
 
-def get_social_stats(engine):
-    pop = len(engine.agents)
-    if pop == 0:
-        return None
 
-    import numpy as np
-    
-    avg_points = sum(a.points for a in engine.agents) / pop
-    avg_fame = sum(engine.social_ledger.get_fame(observer=None, target=a) for a in engine.agents) / pop
-    avg_mem = sum(a.memory_capacity for a in engine.agents) / pop
-    avg_cult = np.mean([a.cultural_signature for a in engine.agents], axis=0)
-    avg_hidden = sum(a.dna["hidden_size"] for a in engine.agents) / pop
-    
-    # --- New Brain Metrics ---
-    # 1. Cognitive Stack (Avg Trust Weights)
-    avg_w_reptilian = sum(a.dna["w_reptilian"] for a in engine.agents) / pop
-    avg_w_hebb = sum(a.dna["w_hebb"] for a in engine.agents) / pop
-    avg_w_memetic = sum(a.dna["w_memetic"] for a in engine.agents) / pop
-    avg_w_rl = sum(a.dna["w_rl"] for a in engine.agents) / pop
-    
-    # 2. Wisdom (Matrix Norms)
-    # How "trained" are they?
-    avg_hebb_norm = sum(np.linalg.norm(a.W_hebb) for a in engine.agents) / pop
-    avg_rl_norm = sum(np.linalg.norm(a.W_rl) for a in engine.agents) / pop
-    
-    # 3. Creativity
-    avg_creativity = sum(a.dna["creativity"] for a in engine.agents) / pop
-    
-    # --- 4. Tribal Metrics ---
-    # Divergence: Variance/Distance from mean
-    gen_sigs = np.array([a.dna["genetic_signature"] for a in engine.agents])
-    cult_sigs = np.array([a.cultural_signature for a in engine.agents])
-    
-    avg_gen_div = np.mean(np.linalg.norm(gen_sigs - np.mean(gen_sigs, axis=0), axis=1))
-    avg_cult_div = np.mean(np.linalg.norm(cult_sigs - np.mean(cult_sigs, axis=0), axis=1))
-    
-    # Social Fog (Sampled from engine tracking)
-    avg_fame_fog = engine.total_fog / engine.interactions_this_tick if engine.interactions_this_tick > 0 else 0.0
-    
-    # Identity Bias (Absolute weights of identity inputs in Reptilian layer)
-    # Inputs: [..., KinProx, CultProx] at indices 5 and 6
-    avg_kin_bias = np.mean([np.sum(np.abs(a.dna["W1"][5, :])) for a in engine.agents])
-    avg_cult_bias = np.mean([np.sum(np.abs(a.dna["W1"][6, :])) for a in engine.agents])
-
-    return {
-        "tick": engine.tick,
-        "pop": pop,
-        "avg_pts": avg_points,
-        "avg_fame": avg_fame,
-        "avg_mem": avg_mem,
-        "avg_idl": np.mean(avg_cult),
-        "avg_hidden": avg_hidden,
-        
-        # Cognitive Stack
-        "avg_w_reptilian": avg_w_reptilian,
-        "avg_w_hebb": avg_w_hebb,
-        "avg_w_memetic": avg_w_memetic,
-        "avg_w_rl": avg_w_rl,
-        
-        # Wisdom & Creativity
-        "avg_hebb_norm": avg_hebb_norm,
-        "avg_rl_norm": avg_rl_norm,
-        "avg_creativity": avg_creativity,
-        
-        # Tribal Landscape
-        "avg_gen_div": avg_gen_div,
-        "avg_cult_div": avg_cult_div,
-        "avg_fame_fog": avg_fame_fog,
-        "avg_kin_bias": avg_kin_bias,
-        "avg_cult_bias": avg_cult_bias,
-        
-        "total_C": engine.coops_this_tick,
-        "total_D": engine.defects_this_tick,
-        "total_deaths": engine.deaths_this_tick
-    }
-
-def main():
+def main(headless=False):
     print("--- MUQA SIMULATION STARTING ---")
     engine = SimulationEngine()
-    viz = Visualizer(WORLD_SETTINGS["grid_size"])
-    logger = WorldLogger()
+    print(f"Seed: {engine.seed} (set RNG_SETTINGS['seed'] to replay this run)")
+    viz = None
+    if not headless:
+        # Deferred: matplotlib dominates startup time
+        from utils.visualizer import Visualizer
+        viz = Visualizer(WORLD_SETTINGS["grid_size"])
+    if ROLLUP_SETTINGS["enabled"]:
+        from utils.rollup import RollupLogger
+        logger = RollupLogger()
+    else:
+        logger = WorldLogger()
     
     print(f"Logging to: {logger.get_log_path()}")
 
-    MAX_TICKS = 5000
+    if SNAPSHOT_SETTINGS["enabled"]:
+        from simulation.snapshot import SnapshotPublisher
+        engine.publisher = SnapshotPublisher()
+        print(f"Publishing snapshots to shared memory: {engine.publisher.name}")
+
+    if RECORDER_SETTINGS["enabled"]:
+        from utils.recorder import FrameRecorder
+        engine.recorder = FrameRecorder()
+        print(f"Recording frames to: {engine.recorder.path}")
+
+    telemetry = None
+    if TELEMETRY_SETTINGS["enabled"]:
+        from utils.telemetry import TelemetryServer, downsample_frame
+        telemetry = TelemetryServer().start()
+        print(f"Telemetry on http://{telemetry.host}:{telemetry.port}/stream")
+
+    detector = SteadyStateDetector()
+
+    # Only metrics somebody subscribed to are computed
+    metrics = default_registry()
+    metrics.subscribe("logger", getattr(logger, "METRICS", METRIC_SETTINGS["log"]))
+    metrics.subscribe("console", ["pop", "avg_fame", "avg_pts"])
+    metrics.subscribe("convergence", detector.metrics())
+    if viz is not None:
+        metrics.subscribe("visualizer", viz.METRICS)
+    if telemetry is not None:
+        metrics.subscribe("telemetry", TELEMETRY_SETTINGS["metrics"])
+
+    def consume(state):
+        """Stats, logging and telemetry for one finished tick. Returns None to end the run."""
+        t = state.tick - 1
+        stats = metrics.collect(state)
+        if not stats:
+            final = {"tick": state.tick, "pop": 0, "total_deaths": state.deaths_this_tick}
+            logger.log_tick(final)
+            detector.update(final)
+            print("\nSocietal Extinction Reached.")
+            return None
+
+        logger.log_tick(metrics.select(stats, "logger"))
+        if telemetry is not None:
+            frame = None
+            if t % TELEMETRY_SETTINGS["frame_every"] == 0:
+                frame = downsample_frame(state.world)
+            telemetry.publish(metrics.select(stats, "telemetry"), frame)
+        if t % 5 == 0:
+            status = (f"Tick: {t:04d} | Pop: {stats['pop']:03d} | "
+                     f"Avg Fame: {stats['avg_fame']:.2f} | Pts: {stats['avg_pts']:.1f}")
+            sys.stdout.write("\r" + status)
+            sys.stdout.flush()
+        if detector.update(stats) == "steady" and RUN_SETTINGS["stop_on_steady_state"]:
+            return None
+        return stats
+
+    def render(state, stats):
+        viz.update(state.world, state.social_ledger, state.tick - 1, stats)
+
+    MAX_TICKS = RUN_SETTINGS["max_ticks"]
+    pipeline = None
     try:
-        for t in range(MAX_TICKS):
-            # 1. Run Engine
-            engine.run_tick()
-            
-            # 2. Handle Statistics
-            stats = get_social_stats(engine)
-            
-            # 3. Update Visualization
-            if t % 1 == 0: # Smooth 60fps
-                viz.update(engine.world, engine.social_ledger, t, stats)
-            
-            # 3. Handle Statistics & Logging
-            stats = get_social_stats(engine)
-            if stats:
-                logger.log_tick(stats)
-                if t % 5 == 0:
-                    status = (f"Tick: {t:04d} | Pop: {stats['pop']:03d} | "
-                             f"Avg Fame: {stats['avg_fame']:.2f} | Pts: {stats['avg_pts']:.1f}")
-                    sys.stdout.write("\r" + status)
-                    sys.stdout.flush()
-            else:
-                print("\nSocietal Extinction Reached.")
-                break
-                
-            time.sleep(0.01)
+        if PIPELINE_SETTINGS["enabled"]:
+            # Engine on its own thread; stats and rendering consume frozen per-tick snapshots
+            # carrying the due metrics' inputs, plus a map frame on rendered or streamed ticks
+            from utils.pipeline import PipelinedLoop
+
+            def frames(tick):
+                return viz is not None or (telemetry is not None and (tick - 1) % TELEMETRY_SETTINGS["frame_every"] == 0)
+            pipeline = PipelinedLoop(engine, consume, render if viz is not None else None, metrics=metrics, frames=frames)
+            pipeline.run(MAX_TICKS)
+        else:
+            for _ in range(MAX_TICKS):
+                # 1. Run Engine
+                engine.run_tick()
+
+                # 2. Statistics, Logging & Telemetry
+                stats = consume(engine)
+                if stats is None:
+                    break
+
+                # 3. Update Visualization
+                if viz is not None:
+                    render(engine, stats)
+                    time.sleep(0.01)
 
     except KeyboardInterrupt:
         print("\nSimulation interrupted.")
     finally:
-        print("\nFinalizing logs...")
-        viz.close()
+        print("\n" + detector.report())
+        print(metrics.cost_report())
+        if pipeline is not None:
+            print(pipeline.report())
+        if engine.territories is not None:
+            print(engine.territories.report())
+        if engine.tracer is not None:
+            print(engine.tracer.report())
+            if TRACER_SETTINGS["export"]:
+                engine.tracer.export(TRACER_SETTINGS["export"])
+        print("Finalizing logs...")
+        if hasattr(logger, "close"):
+            logger.close()
+        if engine.publisher is not None:
+            engine.publisher.close()
+        if engine.recorder is not None:
+            engine.recorder.close()
+            print(f"Replay with: python -m utils.replay {engine.recorder.path}")
+        if telemetry is not None:
+            telemetry.stop()
+        if viz is not None:
+            viz.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(headless="--headless" in sys.argv)
\ No newline at end of file
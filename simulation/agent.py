@@ -2,18 +2,24 @@
 simulation/agent.py
 Defines the Agent class with Neural Network (Brain) based decision making.
 """
-import uuid
-import random
 import numpy as np
 from config import POPULATION_SETTINGS, BRAIN_SETTINGS, GAME_PHYSICS, IDENTITY_SETTINGS
+from simulation import rng
+
+
+def brain_dtype():
+    """Float type of brain weights, signatures and decision inputs (BRAIN_SETTINGS['precision'])."""
+    return np.dtype(BRAIN_SETTINGS["precision"])
+
 
 class Agent:
-    def __init__(self, position, dna=None):
+    def __init__(self, position, dna=None, age=None, agent_id=None):
         # 1. Identity & State
-        self.id = uuid.uuid4()
+        self.id = agent_id if agent_id is not None else rng.stream("identity").uuid4()
         self.points = POPULATION_SETTINGS["starting_points"]
         self.position = position
-        self.age = random.randint(0, 50) 
+        self.age = age if age is not None else rng.stream("genesis").randint(0, 50)
+        self.lineage_id = None # Assigned by LineageTracker when tracking is on
         
         # 2. DNA (The Brain Weights & Traits)
         if dna is None:
@@ -24,8 +30,9 @@ class Agent:
         # 3. Lifetime Learning State (The Plastic Layers)
         # These start as Zero and evolve during lifetime
         # Shape: Input Size -> Output Size (Direct parallel pathways)
-        self.W_hebb = np.zeros((BRAIN_SETTINGS["input_size"], BRAIN_SETTINGS["output_size"]))
-        self.W_rl = np.zeros((BRAIN_SETTINGS["input_size"], BRAIN_SETTINGS["output_size"]))
+        dtype = brain_dtype()
+        self.W_hebb = np.zeros((BRAIN_SETTINGS["input_size"], BRAIN_SETTINGS["output_size"]), dtype=dtype)
+        self.W_rl = np.zeros((BRAIN_SETTINGS["input_size"], BRAIN_SETTINGS["output_size"]), dtype=dtype)
         
         # Learning Context
         self.last_input = None
@@ -39,42 +46,100 @@ class Agent:
         # We start with the genetic baseline but it shifts during lifetime
         self.cultural_signature = self.dna["starting_culture"].copy()
         
+    @classmethod
+    def spawn_batch(cls, positions):
+        """
+        Creates one founder per position with all random DNA drawn in bulk:
+        one draw per trait across the batch, and one weight draw per brain
+        width (agents of the same width share a contiguous block).
+        """
+        n = len(positions)
+        n_in, n_out = BRAIN_SETTINGS["input_size"], BRAIN_SETTINGS["output_size"]
+        dtype = brain_dtype()
+        genesis = rng.stream("genesis")
+
+        hidden = genesis.integers(BRAIN_SETTINGS["min_hidden"], BRAIN_SETTINGS["max_hidden"] + 1, n)
+        W1 = [None] * n
+        W2 = [None] * n
+        for h in np.unique(hidden):
+            members = np.flatnonzero(hidden == h)
+            block1 = genesis.randn(len(members), n_in, h).astype(dtype, copy=False)
+            block2 = genesis.randn(len(members), h, n_out).astype(dtype, copy=False)
+            for j, k in enumerate(members):
+                W1[k], W2[k] = block1[j], block2[j]
+
+        # Python scalars up front: per-element numpy indexing dominates otherwise
+        hidden = hidden.tolist()
+        w_reptilian = genesis.uniform(0.5, 1.5, n).tolist()
+        w_hebb = genesis.uniform(0.0, 1.0, n).tolist()
+        w_memetic = genesis.uniform(0.0, 1.0, n).tolist()
+        w_rl = genesis.uniform(0.0, 1.0, n).tolist()
+        genetic = list(genesis.randn(n, IDENTITY_SETTINGS["genetic_dim"]).astype(dtype, copy=False))
+        culture = list(genesis.uniform(0, 1, (n, IDENTITY_SETTINGS["cultural_dim"])).astype(dtype, copy=False))
+        creativity = genesis.uniform(0.01, 0.1, n).tolist()
+        learning_rate = genesis.uniform(0.01, 0.1, n).tolist()
+        memory = genesis.integers(BRAIN_SETTINGS["min_memory"], BRAIN_SETTINGS["max_memory"] + 1, n).tolist()
+        ages = genesis.integers(0, 51, n).tolist()
+        ids = rng.stream("identity").uuids(n)
+
+        agents = []
+        for k, position in enumerate(positions):
+            dna = {
+                "hidden_size": hidden[k],
+                "W1": W1[k],
+                "W2": W2[k],
+                "w_reptilian": w_reptilian[k],
+                "w_hebb": w_hebb[k],
+                "w_memetic": w_memetic[k],
+                "w_rl": w_rl[k],
+                "genetic_signature": genetic[k],
+                "starting_culture": culture[k],
+                "creativity": creativity[k],
+                "learning_rate": learning_rate[k],
+                "memory_capacity": memory[k]
+            }
+            agents.append(cls(position, dna=dna, age=ages[k], agent_id=ids[k]))
+        return agents
+
     def _init_brain(self):
         """Initializes random weights and cognitive traits."""
-        hidden_size = random.randint(BRAIN_SETTINGS["min_hidden"], BRAIN_SETTINGS["max_hidden"])
+        genesis = rng.stream("genesis")
+        dtype = brain_dtype()
+        hidden_size = genesis.randint(BRAIN_SETTINGS["min_hidden"], BRAIN_SETTINGS["max_hidden"])
         mem_start = BRAIN_SETTINGS["min_memory"]
         mem_end = BRAIN_SETTINGS["max_memory"]
         
         # --- Tribal Signatures ---
         # Hardware (DNA)
-        genetic_signature = np.random.randn(IDENTITY_SETTINGS["genetic_dim"])
+        genetic_signature = genesis.randn(IDENTITY_SETTINGS["genetic_dim"]).astype(dtype)
         # Software (Starting Culture)
-        starting_culture = np.random.uniform(0, 1, IDENTITY_SETTINGS["cultural_dim"])
+        starting_culture = genesis.uniform(0, 1, IDENTITY_SETTINGS["cultural_dim"]).astype(dtype)
 
         return {
             # --- Reptilian Layer (Static) ---
             "hidden_size": hidden_size,
-            "W1": np.random.randn(BRAIN_SETTINGS["input_size"], hidden_size),
-            "W2": np.random.randn(hidden_size, BRAIN_SETTINGS["output_size"]),
+            "W1": genesis.randn(BRAIN_SETTINGS["input_size"], hidden_size).astype(dtype),
+            "W2": genesis.randn(hidden_size, BRAIN_SETTINGS["output_size"]).astype(dtype),
             
             # --- Cognitive Traits (Layer Weights) ---
-            "w_reptilian": random.uniform(0.5, 1.5),
-            "w_hebb": random.uniform(0.0, 1.0),
-            "w_memetic": random.uniform(0.0, 1.0),
-            "w_rl": random.uniform(0.0, 1.0),
+            "w_reptilian": genesis.uniform(0.5, 1.5),
+            "w_hebb": genesis.uniform(0.0, 1.0),
+            "w_memetic": genesis.uniform(0.0, 1.0),
+            "w_rl": genesis.uniform(0.0, 1.0),
             
             # --- Identity DNA ---
             "genetic_signature": genetic_signature,
             "starting_culture": starting_culture,
             
             # --- Personality Specs ---
-            "creativity": random.uniform(0.01, 0.1), # Noise sigma
-            "learning_rate": random.uniform(0.01, 0.1),
-            "memory_capacity": random.randint(mem_start, mem_end)
+            "creativity": genesis.uniform(0.01, 0.1), # Noise sigma
+            "learning_rate": genesis.uniform(0.01, 0.1),
+            "memory_capacity": genesis.randint(mem_start, mem_end)
         }
 
     def mutate(self):
         """Returns a mutated copy of the current DNA (Weights + Traits)."""
+        mutation = rng.stream("mutation")
         new_dna = {
             "hidden_size": self.dna["hidden_size"],
             "W1": self.dna["W1"].copy(),
@@ -91,17 +156,17 @@ class Agent:
         }
         
         # --- Neurogenesis / Atrophy (Brain Resizing) ---
-        if random.random() < BRAIN_SETTINGS["mutation_rate"]:
+        if mutation.random() < BRAIN_SETTINGS["mutation_rate"]:
             current_h = new_dna["hidden_size"]
-            choice = random.choice([-1, 1])
+            choice = mutation.choice([-1, 1])
             new_h = max(BRAIN_SETTINGS["min_hidden"], min(BRAIN_SETTINGS["max_hidden"], current_h + choice))
             
             if new_h > current_h: # Growth: Add Neuron (Column to W1, Row to W2)
                 # Add column to W1
-                new_col = np.random.randn(BRAIN_SETTINGS["input_size"], 1)
+                new_col = mutation.randn(BRAIN_SETTINGS["input_size"], 1).astype(new_dna["W1"].dtype)
                 new_dna["W1"] = np.hstack((new_dna["W1"], new_col))
                 # Add row to W2
-                new_row = np.random.randn(1, BRAIN_SETTINGS["output_size"])
+                new_row = mutation.randn(1, BRAIN_SETTINGS["output_size"]).astype(new_dna["W2"].dtype)
                 new_dna["W2"] = np.vstack((new_dna["W2"], new_row))
                 new_dna["hidden_size"] = new_h
                 
@@ -114,43 +179,122 @@ class Agent:
 
         # Apply Standard Noise Mutation
         # Apply Gaussian noise to W1
-        mask1 = np.random.rand(*new_dna["W1"].shape) < BRAIN_SETTINGS["mutation_rate"]
-        noise1 = np.random.randn(*new_dna["W1"].shape) * BRAIN_SETTINGS["mutation_power"]
+        mask1 = mutation.rand(*new_dna["W1"].shape) < BRAIN_SETTINGS["mutation_rate"]
+        noise1 = mutation.randn(*new_dna["W1"].shape) * BRAIN_SETTINGS["mutation_power"]
         new_dna["W1"][mask1] += noise1[mask1]
         
         # Apply Gaussian noise to W2
-        mask2 = np.random.rand(*new_dna["W2"].shape) < BRAIN_SETTINGS["mutation_rate"]
-        noise2 = np.random.randn(*new_dna["W2"].shape) * BRAIN_SETTINGS["mutation_power"]
+        mask2 = mutation.rand(*new_dna["W2"].shape) < BRAIN_SETTINGS["mutation_rate"]
+        noise2 = mutation.randn(*new_dna["W2"].shape) * BRAIN_SETTINGS["mutation_power"]
         new_dna["W2"][mask2] += noise2[mask2]
         
         # --- Trait Mutation ---
         for trait in ["w_reptilian", "w_hebb", "w_memetic", "w_rl", "creativity", "learning_rate"]:
-            if random.random() < BRAIN_SETTINGS["mutation_rate"]:
-                noise = random.uniform(-0.1, 0.1)
+            if mutation.random() < BRAIN_SETTINGS["mutation_rate"]:
+                noise = mutation.uniform(-0.1, 0.1)
                 new_dna[trait] += noise
                 new_dna[trait] = max(0.0, new_dna[trait])
 
         # Mutate Memory Capacity
-        if random.random() < BRAIN_SETTINGS["mutation_rate"]:
-            change = random.randint(-2, 2)
+        if mutation.random() < BRAIN_SETTINGS["mutation_rate"]:
+            change = mutation.randint(-2, 2)
             new_mem = new_dna["memory_capacity"] + change
             new_dna["memory_capacity"] = max(BRAIN_SETTINGS["min_memory"], min(BRAIN_SETTINGS["max_memory"], new_mem))
             
         # --- Identity Mutation ---
         new_dna["genetic_signature"] = self.dna["genetic_signature"].copy()
-        if random.random() < IDENTITY_SETTINGS["mutation_rate"]:
-            noise = np.random.randn(IDENTITY_SETTINGS["genetic_dim"]) * 0.1
+        if mutation.random() < IDENTITY_SETTINGS["mutation_rate"]:
+            noise = mutation.randn(IDENTITY_SETTINGS["genetic_dim"]) * 0.1
             new_dna["genetic_signature"] += noise
 
         # Inherit Culture (Cultural Transmission from Parent's Current State)
         new_dna["starting_culture"] = self.cultural_signature.copy()
-        if random.random() < IDENTITY_SETTINGS["mutation_rate"]:
-            noise = np.random.uniform(-0.1, 0.1, IDENTITY_SETTINGS["cultural_dim"])
+        if mutation.random() < IDENTITY_SETTINGS["mutation_rate"]:
+            noise = mutation.uniform(-0.1, 0.1, IDENTITY_SETTINGS["cultural_dim"])
             new_dna["starting_culture"] += noise
             new_dna["starting_culture"] = np.clip(new_dna["starting_culture"], 0, 1)
         
         return new_dna
 
+    @staticmethod
+    def mutate_batch(parents):
+        """
+        Batched equivalent of `mutate` for many parents at once. Every
+        random decision is one array draw across the batch, and weights are
+        mutated in preallocated blocks padded to the widest brain; each child
+        gets a compact copy of its own slice, so no child keeps the block alive.
+        """
+        k = len(parents)
+        n_in, n_out = BRAIN_SETTINGS["input_size"], BRAIN_SETTINGS["output_size"]
+        max_h = BRAIN_SETTINGS["max_hidden"]
+        rate, power = BRAIN_SETTINGS["mutation_rate"], BRAIN_SETTINGS["mutation_power"]
+        mutation = rng.stream("mutation")
+
+        # --- Neurogenesis / Atrophy (Brain Resizing) ---
+        old_h = np.array([p.dna["W1"].shape[1] for p in parents], dtype=np.int64)
+        resize = mutation.rand(k) < rate
+        step = np.where(mutation.rand(k) < 0.5, -1, 1)
+        new_h = np.where(resize, np.clip(old_h + step, BRAIN_SETTINGS["min_hidden"], max_h), old_h)
+
+        # Parents born under a larger max_hidden (overrides, migrants) keep their width
+        width = int(old_h.max(initial=max_h))
+        dtype = brain_dtype()
+        W1 = np.zeros((k, n_in, width), dtype=dtype)
+        W2 = np.zeros((k, width, n_out), dtype=dtype)
+        for j, parent in enumerate(parents):
+            h = min(old_h[j], new_h[j])
+            W1[j, :, :h] = parent.dna["W1"][:, :h]
+            W2[j, :h, :] = parent.dna["W2"][:h, :]
+        grown = np.flatnonzero(new_h > old_h)
+        W1[grown, :, old_h[grown]] = mutation.randn(len(grown), n_in)
+        W2[grown, old_h[grown], :] = mutation.randn(len(grown), n_out)
+
+        # Standard noise mutation (padding beyond each child's width is never read)
+        W1 += np.where(mutation.rand(*W1.shape) < rate, mutation.randn(*W1.shape) * power, 0.0)
+        W2 += np.where(mutation.rand(*W2.shape) < rate, mutation.randn(*W2.shape) * power, 0.0)
+
+        # --- Trait Mutation ---
+        trait_names = ["w_reptilian", "w_hebb", "w_memetic", "w_rl", "creativity", "learning_rate"]
+        traits = np.array([[p.dna[t] for t in trait_names] for p in parents])
+        shift = mutation.uniform(-0.1, 0.1, traits.shape)
+        traits = np.maximum(0.0, np.where(mutation.rand(*traits.shape) < rate, traits + shift, traits))
+
+        memory = np.array([p.dna["memory_capacity"] for p in parents])
+        change = mutation.integers(-2, 3, k)
+        memory = np.where(
+            mutation.rand(k) < rate,
+            np.clip(memory + change, BRAIN_SETTINGS["min_memory"], BRAIN_SETTINGS["max_memory"]),
+            memory
+        )
+
+        # --- Identity Mutation ---
+        id_rate = IDENTITY_SETTINGS["mutation_rate"]
+        genetic = np.array([p.dna["genetic_signature"] for p in parents], dtype=dtype)
+        genetic += (mutation.rand(k) < id_rate)[:, None] * mutation.randn(*genetic.shape) * 0.1
+
+        # Inherit Culture (Cultural Transmission from Parent's Current State)
+        culture = np.array([p.cultural_signature for p in parents])
+        drift = mutation.uniform(-0.1, 0.1, culture.shape)
+        culture = np.where((mutation.rand(k) < id_rate)[:, None], np.clip(culture + drift, 0, 1), culture).astype(dtype)
+
+        traits = traits.tolist()
+        new_h = new_h.tolist()
+        memory = memory.tolist()
+        genomes = []
+        for j in range(k):
+            h = new_h[j]
+            dna = dict(zip(trait_names, traits[j]))
+            dna.update({
+                "hidden_size": h,
+                "W1": W1[j, :, :h].copy(),
+                "W2": W2[j, :h, :].copy(),
+                "memory_capacity": memory[j],
+                "genetic_signature": genetic[j],
+                "starting_culture": culture[j]
+            })
+            genomes.append(dna)
+        return genomes
+
     def update_memory(self, opponent_id, move):
         """Adds a move to private memory."""
         if opponent_id not in self.private_memory:
@@ -180,10 +324,11 @@ class Agent:
         
         self.cultural_signature = np.clip(self.cultural_signature, 0, 1)
 
-    def decide(self, opponent_id, opponent_fame, neighbors=None):
+    def decide(self, opponent_id, opponent_fame, neighbors=None, trace=None):
         """
         The Layered Brain Forward Pass.
         Combines Instinct, Habit, Social Pressure, Value, and Creativity.
+        `trace` (a DecisionTracer, for sampled agents only) records each layer's contribution.
         """
         # --- 1. PREPARE INPUTS ---
         in_points = min(self.points / 1000.0, 1.0)
@@ -209,10 +354,11 @@ class Agent:
         in_cult_prox = 1.0 / (1.0 + cult_dist)
         
         # Shape: (1, 7)
-        inputs = np.array([in_points, in_age, in_fame, in_history, in_bias, in_kin_prox, in_cult_prox])
+        dtype = brain_dtype()
+        inputs = np.array([in_points, in_age, in_fame, in_history, in_bias, in_kin_prox, in_cult_prox], dtype=dtype)
         
         # --- 2. MULTI-LAYER PROCESSING ---
-        logits = np.zeros(BRAIN_SETTINGS["output_size"])
+        logits = np.zeros(BRAIN_SETTINGS["output_size"], dtype=dtype)
         
         # Layer 1: Reptilian (Instinct) - DNA Static
         # ReLU(Input @ W1) @ W2
@@ -234,7 +380,7 @@ class Agent:
         # Average of neighbors' last moves, weighted by their wealth relative to me
         # We assume neighbors have a 'last_action_index' property public
         if neighbors and self.dna["w_memetic"] > 0:
-            social_vector = np.zeros(BRAIN_SETTINGS["output_size"])
+            social_vector = np.zeros(BRAIN_SETTINGS["output_size"], dtype=dtype)
             valid_neighbors = 0
             for n in neighbors:
                 if n.points > self.points and hasattr(n, 'last_action_index') and n.last_action_index is not None:
@@ -249,7 +395,7 @@ class Agent:
                 logits += self.dna["w_memetic"] * social_vector
 
         # Layer 5: Perturbative (Creativity) - Noise
-        noise = np.random.randn(BRAIN_SETTINGS["output_size"]) * self.dna["creativity"]
+        noise = rng.stream("decision").randn(BRAIN_SETTINGS["output_size"]) * self.dna["creativity"]
         logits += noise
         
         # --- 3. SELECTION ---
@@ -259,6 +405,16 @@ class Agent:
         # --- 4. STORAGE FOR LEARNING ---
         self.last_input = inputs
         self.last_action_index = action_index
+
+        if trace is not None:
+            if neighbors and self.dna["w_memetic"] > 0:
+                memetic = self.dna["w_memetic"] * social_vector
+            else:
+                memetic = np.zeros(BRAIN_SETTINGS["output_size"], dtype=dtype)
+            trace.record(self, inputs, [
+                self.dna["w_reptilian"] * reptilian_logits, self.dna["w_hebb"] * hebbian_logits,
+                self.dna["w_rl"] * rl_logits, memetic, noise
+            ], action_index)
         
         return choices[action_index]
 
@@ -271,7 +427,7 @@ class Agent:
 
         # Hebbian Update: Strengthen connection between State and Action
         # W_hebb += rate * (ActionVec * InputVec)
-        action_vec = np.zeros(BRAIN_SETTINGS["output_size"])
+        action_vec = np.zeros(BRAIN_SETTINGS["output_size"], dtype=self.W_hebb.dtype)
         action_vec[self.last_action_index] = 1.0
         
         # Outer product to get matrix of changes
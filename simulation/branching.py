@@ -0,0 +1,131 @@
+"""
+simulation/branching.py
+What-if branching of a running simulation. `fork_branches` forks the
+current process once per branch (os.fork via multiprocessing's "fork"
+start method), so every child starts from the parent engine exactly as it
+is, sharing its memory pages copy-on-write: no pickling of the population,
+and the burn-in is paid once. Each child applies its branch's config
+overrides and intervention, runs on and sends back its per-tick stats and
+a summary; the parent engine is left untouched.
+
+By default branches continue the parent's random streams, so they differ
+only by their intervention (common random numbers); give a branch a seed
+to decorrelate it. Overrides only affect settings read while ticking
+(payoffs, taxes, rates); ones used at construction, like grid_size, do not
+apply to a running engine. Requires a platform with fork (not Windows).
+"""
+import multiprocessing as mp
+import multiprocessing.connection
+import traceback
+import numpy as np
+import config
+from config import BRANCH_SETTINGS
+from simulation import rng
+
+
+class Branch:
+    """One experiment arm: config overrides, an optional intervention fn(engine), an optional new seed."""
+    def __init__(self, name, overrides=None, intervene=None, seed=None):
+        self.name = name
+        self.overrides = overrides or {}
+        self.intervene = intervene
+        self.seed = seed
+
+
+def cull(engine, predicate):
+    """Removes every agent for which predicate(agent) holds (e.g. one tribe). Returns how many went."""
+    doomed = [a for a in engine.agents if predicate(a)]
+    gone = {a.id for a in doomed}
+    engine.agents = [a for a in engine.agents if a.id not in gone]
+    for agent in doomed:
+        engine.world.remove_agent(agent)
+    engine.social_ledger.forget(gone)
+    if engine.lineage is not None:
+        engine.lineage.record_deaths(doomed, engine.tick)
+    return len(doomed)
+
+
+def summarize(engine):
+    """Default end-of-branch summary."""
+    if not engine.agents:
+        return {"tick": engine.tick, "pop": 0}
+    return {
+        "tick": engine.tick,
+        "pop": len(engine.agents),
+        "avg_pts": float(np.mean([a.points for a in engine.agents])),
+        "culture": np.array([a.cultural_signature for a in engine.agents]).mean(axis=0),
+    }
+
+
+def _run_branch(conn, engine, branch, ticks, collect):
+    """Child process: everything here happens on copy-on-write pages of the parent."""
+    from utils.metrics import default_registry
+    try:
+        # Sidecar outputs belong to the parent run
+        engine.publisher = None
+        engine.recorder = None
+        config.apply_settings(branch.overrides)
+        if branch.seed is not None:
+            engine.rng.seed(branch.seed)
+        if branch.intervene is not None:
+            with rng.using(engine.rng):
+                branch.intervene(engine)
+
+        metrics = default_registry()
+        stats = []
+        for _ in range(ticks):
+            if not engine.agents:
+                break
+            engine.run_tick()
+            row = metrics.collect(engine)
+            if row:
+                stats.append(row)
+        conn.send(("ok", {"name": branch.name, "stats": stats, "summary": (collect or summarize)(engine)}))
+    except BaseException:
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def fork_branches(engine, branches, ticks=None, collect=None, processes=None):
+    """
+    Runs every branch for `ticks` ticks from the engine's current state, at
+    most `processes` at a time, and returns their results in branch order:
+    {"name", "stats" (per-tick metrics), "summary" (collect(engine) or summarize)}.
+    """
+    if "fork" not in mp.get_all_start_methods():
+        raise RuntimeError("Branching needs the fork start method (not available on this platform)")
+    ctx = mp.get_context("fork")
+    ticks = ticks or BRANCH_SETTINGS["ticks"]
+    processes = processes or BRANCH_SETTINGS["processes"] or mp.cpu_count()
+    branches = [b if isinstance(b, Branch) else Branch(f"branch_{k}", overrides=b) for k, b in enumerate(branches)]
+
+    results = [None] * len(branches)
+    pending = list(enumerate(branches))
+    running = []
+    while pending or running:
+        while pending and len(running) < processes:
+            k, branch = pending.pop(0)
+            parent_end, child_end = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=_run_branch, args=(child_end, engine, branch, ticks, collect),
+                               name=f"branch-{branch.name}", daemon=True)
+            proc.start()
+            child_end.close()
+            running.append((k, branch, proc, parent_end))
+
+        # Collect whichever branch finishes first
+        ready = mp.connection.wait([conn for _, _, _, conn in running])
+        for entry in [r for r in running if r[3] in ready]:
+            k, branch, proc, conn = entry
+            try:
+                status, payload = conn.recv()
+            except EOFError:
+                status, payload = "error", f"exited with code {proc.exitcode} before reporting"
+            proc.join()
+            running.remove(entry)
+            if status == "error":
+                for _, _, other, _ in running:
+                    other.terminate()
+                raise RuntimeError(f"Branch {branch.name!r} failed:\n{payload}")
+            results[k] = payload
+    return results
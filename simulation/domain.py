@@ -0,0 +1,250 @@
+"""
+simulation/domain.py
+Multi-process spatial domain decomposition. The grid is cut into vertical
+strips, each owned by a worker process running its own TileEngine. Border
+columns are exchanged as read-only ghosts every tick, agents that move or are
+born across a strip border migrate to the owning worker, and per-tick
+counters are reduced globally by the coordinator.
+"""
+import bisect
+import multiprocessing as mp
+import numpy as np
+import config
+from config import WORLD_SETTINGS, POPULATION_SETTINGS, DOMAIN_SETTINGS, RNG_SETTINGS
+from simulation.engine import SimulationEngine
+from simulation.world import SparseWorld
+from simulation.agent import Agent
+from simulation import rng
+
+# Counters summed across tiles each tick
+REDUCED_COUNTERS = [
+    "deaths_this_tick", "coops_this_tick", "defects_this_tick",
+    "moves_this_tick", "ignores_this_tick", "total_fog", "interactions_this_tick"
+]
+
+
+class TileEngine(SimulationEngine):
+    """
+    A SimulationEngine that owns the columns [x0, x1) of the global grid.
+    It keeps global coordinates in a SparseWorld, so the halo columns on
+    either side simply hold ghost copies of the neighboring tiles' border
+    agents. Ghosts are visible to perception (memetic layer, blocked cells)
+    but are never played with or displaced.
+    """
+    def __init__(self, x0, x1, initial_agents, seed=None):
+        self.x0, self.x1 = x0, x1
+        self.initial_agents = initial_agents
+        self.ghost_ids = set()
+        self.ghosts = []
+        self.lost_migrants = 0
+        super().__init__(world=SparseWorld(), seed=seed)
+        # Lineage ids are per-engine counters and would collide across tiles
+        self.lineage = None
+
+    def owns(self, x):
+        return self.x0 <= x < self.x1
+
+    def _seed_population(self):
+        positions = self.world.sample_empty_cells(self.initial_agents, rng.stream("genesis"), columns=(self.x0, self.x1))
+        for agent in Agent.spawn_batch(positions):
+            self.world.place_agent(agent, *agent.position)
+            self.agents.append(agent)
+
+    def _local_neighbors(self, neighbors):
+        return [n for n in neighbors if n.id not in self.ghost_ids]
+
+    def set_ghosts(self, ghosts):
+        """Replaces last tick's halo with fresh copies of the neighbors' border agents."""
+        for ghost in self.ghosts:
+            self.world.remove_agent(ghost)
+        self.ghosts = [g for g in ghosts if self.world.place_agent(g, *g.position)]
+        self.ghost_ids = {g.id for g in self.ghosts}
+
+    def admit(self, migrants):
+        """
+        Takes ownership of agents that crossed into this strip. A neighbor may
+        have claimed the same cell in the same tick; the newcomer then settles
+        on a free owned cell next to it, or is lost if there is none.
+        """
+        with rng.using(self.rng):   # find_empty_adjacent draws from the movement stream
+            for agent, record in migrants:
+                x, y = agent.position
+                if not self.world.is_empty(x, y):
+                    cell = self.world.find_empty_adjacent(x, y)
+                    if cell is None or not self.owns(cell[0]):
+                        self.lost_migrants += 1
+                        continue
+                    agent.position = cell
+                self.world.place_agent(agent, *agent.position)
+                self.agents.append(agent)
+                if record is not None:
+                    self.social_ledger.registry[agent.id] = record
+
+    def emigrate(self):
+        """Removes and returns (agent, ledger record) for agents now outside the strip."""
+        leaving, staying = [], []
+        for agent in self.agents:
+            (staying if self.owns(agent.position[0]) else leaving).append(agent)
+        self.agents = staying
+
+        migrants = []
+        for agent in leaving:
+            self.world.remove_agent(agent)
+            migrants.append((agent, self.social_ledger.registry.pop(agent.id, None)))
+        return migrants
+
+    def border_agents(self):
+        """Owned agents in the two border columns: (left column, right column)."""
+        left = [a for a in self.agents if a.position[0] == self.x0]
+        right = [a for a in self.agents if a.position[0] == self.x1 - 1]
+        return left, right
+
+    def summary(self):
+        counters = {name: getattr(self, name, 0) for name in REDUCED_COUNTERS}
+        counters["deaths_this_tick"] += self.lost_migrants
+        counters["pop"] = len(self.agents)
+        counters["sum_pts"] = sum(a.points for a in self.agents)
+        self.lost_migrants = 0
+        return counters
+
+
+def _tile_worker(conn, settings, x0, x1, initial_agents, seed):
+    """Worker process loop: owns one TileEngine and serves coordinator commands."""
+    config.apply_settings(settings)
+    engine = TileEngine(x0, x1, initial_agents, seed=seed)
+    conn.send((engine.summary(), [], engine.border_agents()))
+
+    while True:
+        command, payload = conn.recv()
+        if command == "tick":
+            migrants, ghosts = payload
+            engine.set_ghosts(ghosts)
+            engine.admit(migrants)
+            engine.run_tick()
+            emigrants = engine.emigrate()
+            conn.send((engine.summary(), emigrants, engine.border_agents()))
+        elif command == "gather":
+            conn.send(engine.agents)
+        elif command == "close":
+            break
+    conn.close()
+
+
+class DomainDecomposedEngine:
+    """
+    Coordinator for a strip-decomposed grid. Mirrors the SimulationEngine
+    tick API and per-tick counters, but the agents live in the workers.
+
+    Interactions stay strictly local: an agent only plays with neighbors
+    owned by its own tile, while ghosts across the border still count for
+    perception. Gossip is unaffected since fame is looked up by position.
+    """
+    def __init__(self, workers=None, seed=None):
+        self.width, self.height = WORLD_SETTINGS["grid_size"]
+        self.geometry = WORLD_SETTINGS["geometry"]
+        self.tick = 0
+
+        n = workers or DOMAIN_SETTINGS["workers"]
+        n = max(1, min(n, self.width // DOMAIN_SETTINGS["min_strip_width"]))
+        self.bounds = [int(b) for b in np.linspace(0, self.width, n + 1)]
+        self.n_tiles = n
+
+        # One independent child seed per tile
+        tile_seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed if seed is not None else RNG_SETTINGS["seed"]).spawn(n)]
+        settings = config.snapshot_settings()
+        total = POPULATION_SETTINGS["initial_agents"]
+
+        self.conns, self.procs = [], []
+        for i in range(n):
+            x0, x1 = self.bounds[i], self.bounds[i + 1]
+            share = round(total * x1 / self.width) - round(total * x0 / self.width)
+            parent_conn, child_conn = mp.Pipe()
+            proc = mp.Process(
+                target=_tile_worker,
+                args=(child_conn, settings, x0, x1, share, tile_seeds[i]),
+                daemon=True
+            )
+            proc.start()
+            child_conn.close()  # Only the worker holds it now, so its exit shows up as EOFError
+            self.conns.append(parent_conn)
+            self.procs.append(proc)
+
+        self._inbox = [([], []) for _ in range(n)]
+        self._collect()
+
+    # --- Topology ---
+    def _owner(self, x):
+        return bisect.bisect_right(self.bounds, x) - 1
+
+    def _left(self, i):
+        if i > 0:
+            return i - 1
+        return self.n_tiles - 1 if self.geometry == "torus" and self.n_tiles > 1 else None
+
+    def _right(self, i):
+        if i < self.n_tiles - 1:
+            return i + 1
+        return 0 if self.geometry == "torus" and self.n_tiles > 1 else None
+
+    # --- Tick ---
+    def _recv(self, i):
+        try:
+            return self.conns[i].recv()
+        except (EOFError, OSError):     # The worker died: its end of the pipe closed
+            self.procs[i].join(timeout=5)
+            raise RuntimeError(f"Tile worker {i} exited with code {self.procs[i].exitcode}") from None
+
+    def _collect(self):
+        """Receives every tile's reply, reduces counters and routes migrants and ghosts."""
+        replies = [self._recv(i) for i in range(self.n_tiles)]
+        self._inbox = [([], []) for _ in range(self.n_tiles)]
+
+        totals = {}
+        for i, (summary, emigrants, (left, right)) in enumerate(replies):
+            for key, value in summary.items():
+                totals[key] = totals.get(key, 0) + value
+
+            for agent, record in emigrants:
+                self._inbox[self._owner(agent.position[0])][0].append((agent, record))
+
+            # My left border is my left neighbor's right halo, and vice versa
+            left_tile, right_tile = self._left(i), self._right(i)
+            if left_tile is not None:
+                self._inbox[left_tile][1].extend(left)
+            if right_tile is not None:
+                self._inbox[right_tile][1].extend(right)
+
+        for name in REDUCED_COUNTERS:
+            setattr(self, name, totals.get(name, 0))
+        self.population = totals.get("pop", 0)
+        self.avg_points = totals["sum_pts"] / self.population if self.population else 0.0
+
+    def run_tick(self):
+        for conn, payload in zip(self.conns, self._inbox):
+            conn.send(("tick", payload))
+        self._collect()
+        self.tick += 1
+
+    def gather_agents(self):
+        """Pulls a copy of the full population from every tile (expensive; for inspection)."""
+        agents = []
+        for conn in self.conns:
+            conn.send(("gather", None))
+        for i in range(self.n_tiles):
+            agents.extend(self._recv(i))
+        return agents
+
+    def close(self):
+        for conn in self.conns:
+            try:
+                conn.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self.procs:
+            proc.join(timeout=5)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
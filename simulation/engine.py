@@ -2,15 +2,28 @@
 simulation/engine.py
 The Orchestrator. Manages the simulation loop, taxes, and life cycles.
 """
-import random
-from config import WORLD_SETTINGS, GAME_PHYSICS, POPULATION_SETTINGS, BRAIN_COSTS
-from simulation.world import World
+import numpy as np
+from config import (WORLD_SETTINGS, GAME_PHYSICS, POPULATION_SETTINGS, BRAIN_COSTS, LINEAGE_SETTINGS, NETWORK_SETTINGS,
+                    RNG_SETTINGS, TRACER_SETTINGS, TERRITORY_SETTINGS)
+from simulation import rng
+from simulation.world import create_world
 from simulation.social import SocialLedger
 from simulation.agent import Agent
+from simulation.kernels import create_kernel
+from simulation.lineage import LineageTracker
+from simulation.network import InteractionNetwork
+from simulation.tracer import DecisionTracer
+from simulation.territory import TerritoryMap
 
 class SimulationEngine:
-    def __init__(self):
-        self.world = World()
+    def __init__(self, world=None, kernel=None, seed=None):
+        # Every engine is one reproducible run with its own random streams, so other
+        # engines in the same process never shift the numbers it draws
+        self.rng = rng.RandomService(seed if seed is not None else RNG_SETTINGS["seed"])
+        self.seed = self.rng.entropy
+
+        self.world = world if world is not None else create_world()
+        self.kernel = kernel if kernel is not None else create_kernel()
         self.social_ledger = SocialLedger()
         self.agents = []
         self.tick = 0
@@ -22,19 +35,38 @@ class SimulationEngine:
         self.moves_this_tick = 0
         self.ignores_this_tick = 0
         
-        self._seed_population()
+        # Optional sidecar feed (see simulation/snapshot.py)
+        self.publisher = None
+        # Optional replay recording (see utils/recorder.py)
+        self.recorder = None
+
+        # Optional phylogeny (see simulation/lineage.py)
+        self.lineage = LineageTracker() if LINEAGE_SETTINGS["enabled"] else None
+        # Optional social graph (see simulation/network.py)
+        self.network = InteractionNetwork() if NETWORK_SETTINGS["enabled"] else None
+        # Optional territory labeling (see simulation/territory.py)
+        self.territories = TerritoryMap() if TERRITORY_SETTINGS["enabled"] else None
+        # Optional sampled decision tracing (see simulation/tracer.py)
+        self.tracer = DecisionTracer() if TRACER_SETTINGS["enabled"] else None
+        self.kernel.tracer = self.tracer
+        
+        with rng.using(self.rng):
+            self._seed_population()
 
     def _seed_population(self):
-        count = 0
-        while count < POPULATION_SETTINGS["initial_agents"]:
-            x = random.randint(0, self.world.width - 1)
-            y = random.randint(0, self.world.height - 1)
-            if self.world.grid[x, y] is None:
-                new_agent = Agent(position=(x, y))
-                self.world.place_agent(new_agent, x, y)
-                self.agents.append(new_agent)
-                count += 1
+        positions = self.world.sample_empty_cells(POPULATION_SETTINGS["initial_agents"], rng.stream("genesis"))
+        founders = Agent.spawn_batch(positions)
+        for agent in founders:
+            self.world.place_agent(agent, *agent.position)
+            self.agents.append(agent)
+        if self.lineage is not None:
+            self.lineage.record_births(founders, None, self.tick)
+
     def run_tick(self):
+        with rng.using(self.rng):
+            self._run_tick()
+
+    def _run_tick(self):
         # Reset counters for the new tick
         self.deaths_this_tick = 0
         self.coops_this_tick = 0
@@ -43,6 +75,8 @@ class SimulationEngine:
         self.ignores_this_tick = 0
         self.total_fog = 0.0
         self.interactions_this_tick = 0
+        if self.tracer is not None:
+            self.tracer.tick = self.tick
         
         # 1. Perception & Interaction
         self._process_turn()
@@ -57,23 +91,42 @@ class SimulationEngine:
         self.social_ledger.apply_fame_decay()
         self.tick += 1
 
+        if self.lineage is not None and self.tick % LINEAGE_SETTINGS["prune_every"] == 0:
+            self.lineage.prune()
+        if self.network is not None and self.tick % NETWORK_SETTINGS["compact_every"] == 0:
+            self.network.compact(self.tick)
+        if self.territories is not None and self.tick % TERRITORY_SETTINGS["every"] == 0:
+            self.territories.update(self.world, self.agents)
+        if self.tick % POPULATION_SETTINGS["memory_prune_every"] == 0:
+            self._prune_memories()
+
+        # 5. Publish for out-of-process consumers
+        if self.publisher is not None:
+            self.publisher.publish(self)
+        if self.recorder is not None:
+            self.recorder.record(self)
+
     def _process_turn(self):
-        active_agents = list(self.agents)
-        random.shuffle(active_agents)
+        if self.kernel.batched:
+            self._process_turn_batched()
+            return
+
+        active_agents, lonely = self._split_isolated()
+        rng.stream("matching").shuffle(active_agents)
         played_this_turn = set()
+        movers = []     # Moves are resolved together at the end of the turn
 
         for agent in active_agents:
             if agent.id in played_this_turn or not agent.is_alive():
                 continue
                 
+            # Nobody moves until the end of the turn: active agents keep their neighbors
             neighbors = self.world.get_neighbors(*agent.position)
-            if not neighbors:
-                # If lonely, check for independent movement decision
-                if random.random() < 0.1: # Fixed mobility chance for now
-                    self._handle_movement(agent)
+            partners = self._local_neighbors(neighbors)
+            if not partners:
                 continue
 
-            neighbor = random.choice(neighbors)
+            neighbor = rng.stream("matching").choice(partners)
             if neighbor.id in played_this_turn:
                 continue
 
@@ -93,20 +146,23 @@ class SimulationEngine:
             neighbors_a = neighbors 
             neighbors_b = self.world.get_neighbors(*neighbor.position)
 
-            move_a = agent.decide(neighbor, fame_b_perceived_by_a, neighbors=neighbors_a)
-            move_b = neighbor.decide(agent, fame_a_perceived_by_b, neighbors=neighbors_b)
+            tracer = self.tracer
+            move_a = agent.decide(neighbor, fame_b_perceived_by_a, neighbors=neighbors_a,
+                                  trace=tracer if tracer is not None and tracer.follows(agent) else None)
+            move_b = neighbor.decide(agent, fame_a_perceived_by_b, neighbors=neighbors_b,
+                                     trace=tracer if tracer is not None and tracer.follows(neighbor) else None)
 
             # --- RESOLUTION PHASE ---
             # Handle Avoidance (Ignore or Move)
             if "IGNORE" in [move_a, move_b] or "MOVE" in [move_a, move_b]:
                 if move_a == "MOVE": 
-                    self._handle_movement(agent)
+                    movers.append(agent)
                     self.moves_this_tick += 1
                 elif move_a == "IGNORE":
                     self.ignores_this_tick += 1
                     
                 if move_b == "MOVE": 
-                    self._handle_movement(neighbor)
+                    movers.append(neighbor)
                     self.moves_this_tick += 1
                 elif move_b == "IGNORE":
                     self.ignores_this_tick += 1
@@ -137,6 +193,10 @@ class SimulationEngine:
             neighbor.update_memory(agent.id, move_a)
             self.social_ledger.record_action(agent.id, move_a)
             self.social_ledger.record_action(neighbor.id, move_b)
+            if self.network is not None:
+                self.network.record(agent, neighbor, move_a, move_b, self.tick)
+            if self.territories is not None:
+                self.territories.record_game(agent, neighbor)
             
             # Learn from interaction (Culture Update)
             agent.update_culture(move_b, neighbor.cultural_signature)
@@ -144,11 +204,157 @@ class SimulationEngine:
 
             played_this_turn.update([agent.id, neighbor.id])
 
-    def _handle_movement(self, agent):
-        new_pos = self.world.find_empty_adjacent(*agent.position)
-        if new_pos:
-            if self.world.move_agent(agent, new_pos):
-                agent.points -= GAME_PHYSICS["movement_tax"]
+        movers += self._wanderers([a for a in lonely if a.id not in played_this_turn])
+        self._move_all(movers)
+
+    def _process_turn_batched(self):
+        """
+        Phase-split turn for batched kernels. Each round matches pairs first,
+        then perceives, decides, learns and drifts culture once over all of
+        them. As in the sequential loop, every agent initiates once: agents
+        picked as a partner before their own turn, who did not end up
+        playing, initiate in the next round. Within a round agents decide
+        from the state at the start of that round.
+        """
+        pending, lonely = self._split_isolated()
+        rng.stream("matching").shuffle(pending)
+        played = set()
+        movers = []
+
+        while pending:
+            matched = set()
+            pairs, deferred = [], []
+
+            # --- MATCHING PHASE ---
+            for agent in pending:
+                if agent.id in played or not agent.is_alive():
+                    continue
+                if agent.id in matched:
+                    deferred.append(agent)
+                    continue
+                neighbors = self.world.get_neighbors(*agent.position)
+                partners = self._local_neighbors(neighbors)
+                if not partners:
+                    continue
+                neighbor = rng.stream("matching").choice(partners)
+                if neighbor.id in played or neighbor.id in matched:
+                    continue
+                matched.update([agent.id, neighbor.id])
+                pairs.append((agent, neighbor, neighbors))
+
+            if pairs:
+                self._resolve_pairs(pairs, played, movers)
+            pending = deferred
+
+        movers += self._wanderers([a for a in lonely if a.id not in played])
+        self._move_all(movers)
+
+    def _resolve_pairs(self, pairs, played, movers):
+        """Runs one batched round of perception, decision and resolution (MOVEs go to `movers`)."""
+        side_a = [p[0] for p in pairs]
+        side_b = [p[1] for p in pairs]
+        n = len(pairs)
+
+        # --- PERCEPTION PHASE ---
+        # Row k of each side: how the *other* member of pair k sees this one
+        perceived = self.kernel.perceived_fame(self.social_ledger, side_b + side_a, side_a + side_b)
+        true = self.kernel.perceived_fame(self.social_ledger, [None] * (2 * n), side_a + side_b)
+        self.total_fog += float(abs(true - perceived).sum())
+        self.interactions_this_tick += 2 * n
+
+        # --- DECISION PHASE ---
+        neighbors_b = [self.world.get_neighbors(*b.position) for b in side_b]
+        moves = self.kernel.decide(
+            side_a + side_b, side_b + side_a,
+            list(perceived[n:]) + list(perceived[:n]),
+            [p[2] for p in pairs] + neighbors_b
+        )
+
+        # --- RESOLUTION PHASE ---
+        players, rewards, seen_moves, seen_cultures = [], [], [], []
+        for k, (agent, neighbor, _) in enumerate(pairs):
+            move_a, move_b = moves[k], moves[n + k]
+            if "IGNORE" in [move_a, move_b] or "MOVE" in [move_a, move_b]:
+                for who, move in ((agent, move_a), (neighbor, move_b)):
+                    if move == "MOVE":
+                        movers.append(who)
+                        self.moves_this_tick += 1
+                    elif move == "IGNORE":
+                        self.ignores_this_tick += 1
+                continue
+
+            agent.points -= GAME_PHYSICS["interaction_cost"]
+            neighbor.points -= GAME_PHYSICS["interaction_cost"]
+            payoff_a = GAME_PHYSICS["payoff_matrix"][(move_a, move_b)]
+            payoff_b = GAME_PHYSICS["payoff_matrix"][(move_b, move_a)]
+            agent.points += payoff_a
+            neighbor.points += payoff_b
+
+            self.coops_this_tick += (move_a == "C") + (move_b == "C")
+            self.defects_this_tick += (move_a == "D") + (move_b == "D")
+
+            agent.update_memory(neighbor.id, move_b)
+            neighbor.update_memory(agent.id, move_a)
+            self.social_ledger.record_action(agent.id, move_a)
+            self.social_ledger.record_action(neighbor.id, move_b)
+            if self.network is not None:
+                self.network.record(agent, neighbor, move_a, move_b, self.tick)
+            if self.territories is not None:
+                self.territories.record_game(agent, neighbor)
+
+            players += [agent, neighbor]
+            rewards += [payoff_a, payoff_b]
+            seen_moves += [move_b, move_a]
+            seen_cultures += [neighbor.cultural_signature, agent.cultural_signature]
+            played.update([agent.id, neighbor.id])
+
+        # --- LEARNING PHASE ---
+        if players:
+            self.kernel.learn(players, rewards)
+            self.kernel.update_culture(players, seen_moves, seen_cultures)
+
+    def _split_isolated(self):
+        """
+        (agents with at least one neighbor, isolated agents), read off the
+        world's incrementally kept neighbor index. Only the former need a
+        turn in the interaction loop.
+        """
+        isolated = self.world.isolated([a.position for a in self.agents])
+        active, lonely = [], []
+        for agent, alone in zip(self.agents, isolated.tolist()):
+            (lonely if alone else active).append(agent)
+        return active, lonely
+
+    def _wanderers(self, lonely):
+        """The lonely agents that wander this turn: a fixed 10% chance, drawn for all of them in one pass."""
+        lonely = [a for a in lonely if a.is_alive()]
+        if not lonely:
+            return []
+        draws = rng.stream("movement").rand(len(lonely))
+        return [lonely[k] for k in np.flatnonzero(draws < 0.1).tolist()]
+
+    def _local_neighbors(self, neighbors):
+        """Filters neighbors down to the agents this engine may play with or displace."""
+        return neighbors
+
+    def _move_all(self, movers):
+        """
+        Resolves every move of the turn at once. Each mover claims a random
+        empty neighboring cell; a cell claimed twice goes to the claimant with
+        the lower random priority and the others stay put. An agent moves at
+        most once per turn, and only agents that moved pay the movement tax.
+        """
+        movers = list({a.id: a for a in movers}.values())
+        if not movers:
+            return
+        movement = rng.stream("movement")
+        n = len(movers)
+        winners, targets = self.world.claim_adjacent([a.position for a in movers], movement.rand(n), movement.rand(n))
+        moved = [movers[k] for k in winners.tolist()]
+        self.world.move_agents(moved, targets)
+        tax = GAME_PHYSICS["movement_tax"]
+        for agent in moved:
+            agent.points -= tax
 
     def _apply_taxes(self):
         for agent in self.agents:
@@ -176,40 +382,92 @@ class SimulationEngine:
             agent.points -= tax
 
     def _manage_lifecycle(self):
-        for agent in self.agents[:]:
-            # Death Check (Bankruptcy OR Old Age)
+        # Death Check (Bankruptcy OR Old Age)
+        survivors, dead = [], []
+        for agent in self.agents:
             if not agent.is_alive() or agent.age > POPULATION_SETTINGS["max_age"]:
-                self.world.grid[agent.position[0], agent.position[1]] = None
-                try:
-                    self.agents.remove(agent)
-                    self.deaths_this_tick += 1
-                except ValueError:
-                    pass # Agent was already removed (e.g., displaced)
-                continue
-            
-            # Reproduction Check
-            if agent.points >= POPULATION_SETTINGS["reproduction_threshold"]:
-                self._reproduce(agent)
+                self.world.remove_agent(agent)
+                dead.append(agent)
+            else:
+                survivors.append(agent)
+        self.agents = survivors
+        self.deaths_this_tick += len(dead)
+        self.social_ledger.forget(a.id for a in dead)
+        if self.lineage is not None:
+            self.lineage.record_deaths(dead, self.tick)
+
+        # Reproduction Check
+        parents = [a for a in self.agents if a.points >= POPULATION_SETTINGS["reproduction_threshold"]]
+        if parents:
+            self._reproduce(parents)
+
+    def _prune_memories(self):
+        """Removes dead opponents from private memories (they can never be met again)."""
+        live = {a.id for a in self.agents}
+        for agent in self.agents:
+            stale = [k for k in agent.private_memory if k not in live]
+            for key in stale:
+                del agent.private_memory[key]
 
-    def _reproduce(self, parent):
+    def _reproduce(self, parents):
+        """
+        Reproduction stage for every eligible parent of the tick. Birth cells
+        are resolved first, in parent order, with each claimed cell reserved
+        so two parents never target the same one; all child genomes are then
+        generated in one batched mutation.
+        """
         protocol = POPULATION_SETTINGS.get("birth_protocol", "stay")
+        reserved = set()
+        displaced = set()
+        births = []
+
+        for parent in parents:
+            if parent.id in displaced:
+                continue
+            target_pos = self._birth_target(parent, protocol, reserved, displaced)
+            if target_pos:
+                reserved.add(target_pos)
+                births.append((parent, target_pos))
+
+        if displaced:
+            if self.lineage is not None:
+                self.lineage.record_deaths([a for a in self.agents if a.id in displaced], self.tick)
+            self.agents = [a for a in self.agents if a.id not in displaced]
+            self.social_ledger.forget(displaced)
+        if not births:
+            return
+
+        # --- Create Children ---
+        for parent, _ in births:
+            parent.points /= 2
+        genomes = Agent.mutate_batch([parent for parent, _ in births])
+        children = []
+        for (_, target_pos), dna in zip(births, genomes):
+            child = Agent(position=target_pos, dna=dna)
+            child.points = 50
+            self.world.place_agent(child, *target_pos)
+            children.append(child)
+        self.agents.extend(children)
+        if self.lineage is not None:
+            self.lineage.record_births(children, [parent for parent, _ in births], self.tick)
+
+    def _free_adjacent(self, position, reserved):
+        candidates = [c for c in self.world.empty_adjacent(*position) if c not in reserved]
+        return rng.stream("movement").choice(candidates) if candidates else None
+
+    def _birth_target(self, parent, protocol, reserved, displaced):
+        """Picks the birth cell for one parent under the birth protocol (or None)."""
         target_pos = None
 
         # --- Protocol: STAY (Strict Local) ---
         if protocol == "stay":
-             target_pos = self.world.find_empty_adjacent(*parent.position)
+            target_pos = self._free_adjacent(parent.position, reserved)
 
         # --- Protocol: LAUNCH (Global Spores) ---
         elif protocol == "launch":
-            # Search for *any* empty spot (Global search, ignoring local neighbors)
-            best_launch_spot = None
-            for _ in range(10): # Try 10 random spots
-                lx = random.randint(0, self.world.width - 1)
-                ly = random.randint(0, self.world.height - 1)
-                if self.world.grid[lx, ly] is None:
-                    best_launch_spot = (lx, ly)
-                    break
-            
+            # Any empty spot on the map (global, ignoring local neighbors); fails only on a full map
+            best_launch_spot = self.world.random_empty_cell(rng.stream("movement"), exclude=reserved)
+
             if best_launch_spot:
                 migration_tax = GAME_PHYSICS.get("migration_tax", 20)
                 if parent.points > (migration_tax + 50): # Check affordability
@@ -219,27 +477,18 @@ class SimulationEngine:
         # --- Protocol: DISPLACE (Aggressive Local) ---
         elif protocol == "displace":
             # 1. Try empty spot first (Path of least resistance)
-            target_pos = self.world.find_empty_adjacent(*parent.position)
+            target_pos = self._free_adjacent(parent.position, reserved)
             
             # 2. If full, try Aggressive Displacement
             if not target_pos:
-                neighbors = self.world.get_neighbors(*parent.position)
+                neighbors = self._local_neighbors(self.world.get_neighbors(*parent.position))
                 if neighbors:
                     weakest = min(neighbors, key=lambda a: a.points)
                     # If parent is significantly stronger, displace
                     if parent.points > weakest.points * 1.2:
-                        self.world.grid[weakest.position[0], weakest.position[1]] = None
-                        self.agents.remove(weakest)
+                        self.world.remove_agent(weakest)
+                        displaced.add(weakest.id)
                         self.deaths_this_tick += 1
                         target_pos = weakest.position
 
-        # --- Create Child if Target Found ---
-        if target_pos:
-            child_points = 50 
-            parent.points /= 2
-            
-            child = Agent(position=target_pos, dna=parent.mutate())
-            child.points = child_points
-            
-            self.world.place_agent(child, *target_pos)
-            self.agents.append(child)
\ No newline at end of file
+        return target_pos
\ No newline at end of file
@@ -0,0 +1,280 @@
+"""
+simulation/islands.py
+Island-model evolution. N independent SimulationEngines run in worker
+processes, each with its own seed and optional config overrides. Every
+`migrate_every` ticks a fraction of each island's agents (full DNA,
+culture and plastic weights) emigrates to its neighbours along a ring or
+fully connected topology. Islands only synchronise at migrations, so one
+experiment uses every core without a per-tick barrier. The coordinator
+keeps every island's per-tick stats and tracks whether the islands'
+strategy mixes and cultures converge or drift apart.
+
+Usage: python -m simulation.islands [ticks]
+"""
+import multiprocessing as mp
+import sys
+import numpy as np
+import config
+from config import ISLAND_SETTINGS, RNG_SETTINGS
+from simulation.engine import SimulationEngine
+
+LAYERS = ("w_reptilian", "w_hebb", "w_memetic", "w_rl")
+
+
+class IslandEngine(SimulationEngine):
+    """A SimulationEngine that can send agents to, and take them from, other islands."""
+    def __init__(self, seed=None):
+        super().__init__(seed=seed)
+        # Lineage ids are per-engine counters and would collide across islands
+        self.lineage = None
+        self.lost_migrants = 0
+
+    def emigrate(self, fraction):
+        """Removes a random `fraction` of the population and returns it."""
+        n = int(round(fraction * len(self.agents)))
+        if n == 0:
+            return []
+        picks = set(self.rng.stream("migration").permutation(len(self.agents))[:n].tolist())
+        leaving = [a for k, a in enumerate(self.agents) if k in picks]
+        self.agents = [a for k, a in enumerate(self.agents) if k not in picks]
+        for agent in leaving:
+            self.world.remove_agent(agent)
+        # Reputation is local: it stays behind with the society that formed it
+        self.social_ledger.forget(a.id for a in leaving)
+        return leaving
+
+    def admit(self, migrants):
+        """Settles newcomers on random empty cells; migrants arriving on a full island are lost."""
+        migration = self.rng.stream("migration")
+        for agent in migrants:
+            cell = self.world.random_empty_cell(migration)
+            if cell is None:
+                self.lost_migrants += 1
+                continue
+            agent.position = cell
+            self.world.place_agent(agent, *cell)
+            self.agents.append(agent)
+
+    def summary(self):
+        """Island-level state used to compare islands: size, mean layer mix and culture centroid."""
+        if not self.agents:
+            return {"pop": 0, "mix": None, "culture": None, "lost_migrants": self.lost_migrants}
+        return {
+            "pop": len(self.agents),
+            "mix": np.array([[a.dna[w] for w in LAYERS] for a in self.agents]).mean(axis=0),
+            "culture": np.array([a.cultural_signature for a in self.agents]).mean(axis=0),
+            "lost_migrants": self.lost_migrants,
+        }
+
+
+def _island_worker(conn, settings, overrides, seed):
+    """Worker process loop: owns one IslandEngine and serves coordinator commands."""
+    from utils.metrics import default_registry
+
+    config.apply_settings(settings)
+    config.apply_settings(overrides)
+    engine = IslandEngine(seed=seed)
+    metrics = default_registry()
+    conn.send(engine.summary())
+
+    while True:
+        command, payload = conn.recv()
+        if command == "run":
+            immigrants, ticks, fraction = payload
+            engine.admit(immigrants)
+            stats = []
+            for _ in range(ticks):
+                if not engine.agents:
+                    break
+                engine.run_tick()
+                stats.append(metrics.collect(engine))
+            emigrants = engine.emigrate(fraction) if fraction else []
+            conn.send((stats, engine.summary(), emigrants))
+        elif command == "gather":
+            conn.send(engine.agents)
+        elif command == "close":
+            break
+    conn.close()
+
+
+def _mean_pairwise_distance(points):
+    points = [p for p in points if p is not None]
+    if len(points) < 2:
+        return 0.0
+    points = np.array(points)
+    distances = np.linalg.norm(points[:, None, :] - points[None, :, :], axis=-1)
+    return float(distances.sum() / (len(points) * (len(points) - 1)))
+
+
+class IslandModel:
+    """
+    Coordinator for N islands. `overrides` is a list of {group: {key: value}}
+    dicts, one per island; without an explicit count there is one island per
+    override (or ISLAND_SETTINGS["islands"]), and islands past the end of the
+    list run the base config.py.
+    """
+    def __init__(self, islands=None, overrides=None, seed=None, topology=None,
+                 migrate_every=None, migration_fraction=None):
+        overrides = list(overrides if overrides is not None else ISLAND_SETTINGS["overrides"])
+        n = islands or len(overrides) or ISLAND_SETTINGS["islands"]
+        overrides += [{}] * (n - len(overrides))
+
+        self.n_islands = n
+        self.topology = topology or ISLAND_SETTINGS["topology"]
+        if self.topology not in ("ring", "full"):
+            raise ValueError(f"Unknown island topology: {self.topology}")
+        self.migrate_every = migrate_every or ISLAND_SETTINGS["migrate_every"]
+        self.migration_fraction = ISLAND_SETTINGS["migration_fraction"] if migration_fraction is None else migration_fraction
+        self.tick = 0
+
+        # Per-island results, kept centrally
+        self.history = [[] for _ in range(n)]   # Per-tick metric rows
+        self.summaries = [None] * n             # Latest island summary
+        self.divergence_history = []            # (tick, strategy divergence, culture divergence)
+        self.migrants_sent = 0
+
+        # One independent child seed per island; routing draws use the coordinator's own
+        root = np.random.SeedSequence(seed if seed is not None else RNG_SETTINGS["seed"])
+        self.seed = root.entropy
+        children = root.spawn(n + 1)
+        island_seeds = [int(s.generate_state(1)[0]) for s in children[:n]]
+        self._routing = np.random.Generator(np.random.PCG64(children[n]))
+        settings = config.snapshot_settings()
+
+        self.conns, self.procs = [], []
+        for i in range(n):
+            parent_conn, child_conn = mp.Pipe()
+            proc = mp.Process(
+                target=_island_worker,
+                args=(child_conn, settings, overrides[i], island_seeds[i]),
+                daemon=True
+            )
+            proc.start()
+            child_conn.close()  # Only the worker holds it now, so its exit shows up as EOFError
+            self.conns.append(parent_conn)
+            self.procs.append(proc)
+
+        self.summaries = [self._recv(i) for i in range(n)]
+        self._inbox = [[] for _ in range(n)]
+        self._record_divergence()
+
+    # --- Topology ---
+    def destinations(self, i):
+        """Islands that island i sends migrants to."""
+        if self.n_islands < 2:
+            return []
+        if self.topology == "ring":
+            return [(i + 1) % self.n_islands]
+        return [j for j in range(self.n_islands) if j != i]
+
+    def _route(self, i, migrants):
+        """Splits island i's emigrants evenly (in random order) over its destinations."""
+        targets = self.destinations(i)
+        if not targets:
+            return
+        order = self._routing.permutation(len(migrants)).tolist()
+        for k, m in enumerate(order):
+            self._inbox[targets[k % len(targets)]].append(migrants[m])
+        self.migrants_sent += len(migrants)
+
+    # --- Running ---
+    def _recv(self, i):
+        try:
+            return self.conns[i].recv()
+        except (EOFError, OSError):     # The worker died: its end of the pipe closed
+            self.procs[i].join(timeout=5)
+            raise RuntimeError(f"Island worker {i} exited with code {self.procs[i].exitcode}") from None
+
+    def run_epoch(self, ticks=None):
+        """Runs every island for `ticks` (default: up to the next migration), then migrates."""
+        ticks = ticks or self.migrate_every - self.tick % self.migrate_every
+        migrate = (self.tick + ticks) % self.migrate_every == 0 and self.n_islands > 1
+        fraction = self.migration_fraction if migrate else 0.0
+        for conn, immigrants in zip(self.conns, self._inbox):
+            conn.send(("run", (immigrants, ticks, fraction)))
+
+        self._inbox = [[] for _ in range(self.n_islands)]
+        for i in range(self.n_islands):
+            stats, summary, emigrants = self._recv(i)
+            self.history[i].extend(s for s in stats if s is not None)
+            self.summaries[i] = summary
+            self._route(i, emigrants)
+        self.tick += ticks
+        self._record_divergence()
+
+    def run(self, ticks):
+        end = self.tick + ticks
+        while self.tick < end:
+            self.run_epoch(min(end - self.tick, self.migrate_every - self.tick % self.migrate_every))
+        return self.report()
+
+    # --- Aggregation ---
+    def divergence(self):
+        """
+        Mean pairwise distance between islands' average layer mix
+        (w_reptilian, w_hebb, w_memetic, w_rl) and between their culture
+        centroids. Shrinking values mean the islands converge.
+        """
+        return {
+            "strategy": _mean_pairwise_distance([s["mix"] for s in self.summaries]),
+            "culture": _mean_pairwise_distance([s["culture"] for s in self.summaries]),
+        }
+
+    def _record_divergence(self):
+        d = self.divergence()
+        self.divergence_history.append((self.tick, d["strategy"], d["culture"]))
+
+    def aggregate(self, key):
+        """Population-weighted mean of one metric across islands at their latest tick."""
+        rows = [h[-1] for h in self.history if h and key in h[-1]]
+        weights = np.array([row["pop"] for row in rows], dtype=float)
+        if not rows or weights.sum() == 0:
+            return None
+        return float(np.dot(weights, [row[key] for row in rows]) / weights.sum())
+
+    def report(self):
+        return {
+            "tick": self.tick,
+            "islands": [
+                {"pop": s["pop"], "mix": None if s["mix"] is None else dict(zip(LAYERS, s["mix"].tolist()))}
+                for s in self.summaries
+            ],
+            "population": sum(s["pop"] for s in self.summaries),
+            "avg_pts": self.aggregate("avg_pts"),
+            "divergence": self.divergence(),
+            "migrants_sent": self.migrants_sent,
+            "migrants_lost": sum(s["lost_migrants"] for s in self.summaries),
+        }
+
+    def gather_agents(self):
+        """Pulls a copy of every island's population (expensive; for inspection)."""
+        for conn in self.conns:
+            conn.send(("gather", None))
+        return [self._recv(i) for i in range(self.n_islands)]
+
+    def close(self):
+        for conn in self.conns:
+            try:
+                conn.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for proc in self.procs:
+            proc.join(timeout=5)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    with IslandModel() as model:
+        print(f"Island model: {model.n_islands} islands, {model.topology} topology, seed {model.seed}")
+        while model.tick < ticks:
+            model.run_epoch(min(ticks - model.tick, model.migrate_every - model.tick % model.migrate_every))
+            report = model.report()
+            pops = " ".join(f"{island['pop']:>5}" for island in report["islands"])
+            print(f"Tick {model.tick:>6} | Pops {pops} | Strategy div {report['divergence']['strategy']:.3f} "
+                  f"| Culture div {report['divergence']['culture']:.3f} | Migrants {report['migrants_sent']}")
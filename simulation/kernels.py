@@ -0,0 +1,281 @@
+"""
+simulation/kernels.py
+Compute kernels for the hot per-interaction math: perceived fame, the
+layered decision, learning and cultural drift. The reference backend defers
+to the readable scalar methods on Agent and SocialLedger; other backends
+must reproduce their semantics (checked by `compare_backends`).
+"""
+import numpy as np
+from config import KERNEL_SETTINGS, BRAIN_SETTINGS, POPULATION_SETTINGS, IDENTITY_SETTINGS, WORLD_SETTINGS
+from simulation import rng
+from simulation.agent import brain_dtype
+
+ACTIONS = ["C", "D", "MOVE", "IGNORE"]
+
+
+def create_kernel(backend=None):
+    """Builds the kernel selected by KERNEL_SETTINGS['backend']."""
+    backend = backend or KERNEL_SETTINGS["backend"]
+    if backend == "reference":
+        return ReferenceKernel()
+    if backend == "numpy":
+        return NumpyKernel()
+    raise ValueError(f"Unknown kernel backend: {backend}")
+
+
+class ReferenceKernel:
+    """
+    Scalar, one-agent-at-a-time semantics. `batched = False` tells the engine
+    to keep its sequential interaction loop, so a run with this kernel is the
+    model exactly as written in agent.py and social.py.
+    """
+    name = "reference"
+    batched = False
+    tracer = None   # Optional DecisionTracer (see simulation/tracer.py), set by the engine
+
+    def perceived_fame(self, ledger, observers, targets):
+        return np.array([ledger.get_fame(observer=o, target=t) for o, t in zip(observers, targets)])
+
+    def decide(self, agents, opponents, fames, neighbor_lists):
+        tracer = self.tracer
+        return [a.decide(o, f, neighbors=n, trace=tracer if tracer is not None and tracer.follows(a) else None)
+                for a, o, f, n in zip(agents, opponents, fames, neighbor_lists)]
+
+    def learn(self, agents, rewards):
+        for agent, reward in zip(agents, rewards):
+            agent.learn(reward)
+
+    def update_culture(self, agents, opponent_moves, opponent_cultures):
+        for agent, move, culture in zip(agents, opponent_moves, opponent_cultures):
+            agent.update_culture(move, culture)
+
+
+class NumpyKernel(ReferenceKernel):
+    """
+    Batched backend: each operation runs once per tick over every pair,
+    stacking agent state into arrays. Brains of different widths are
+    zero-padded to the widest one, which leaves the ReLU layer unchanged.
+    """
+    name = "numpy"
+    batched = True
+
+    def perceived_fame(self, ledger, observers, targets):
+        n = len(targets)
+        fame = np.empty(n)
+        distorted = np.zeros(n, dtype=bool)
+        for k, target in enumerate(targets):
+            data = ledger.registry.get(target.id)
+            if data is None:
+                fame[k] = ledger.initial_fame
+                continue
+            total = data["C"] + data["D"]
+            if total == 0:
+                fame[k] = 0.5
+                continue
+            fame[k] = data["C"] / total
+            distorted[k] = observers[k] is not None
+
+        idx = np.flatnonzero(distorted)
+        if len(idx) == 0:
+            return fame
+        obs = [observers[k] for k in idx]
+        tgt = [targets[k] for k in idx]
+
+        # Geographic filter
+        radius = WORLD_SETTINGS["fame_radius"]
+        dist = np.linalg.norm(
+            np.array([o.position for o in obs], dtype=float) - np.array([t.position for t in tgt], dtype=float), axis=1
+        )
+        geo_clarity = np.where(dist > radius, np.exp(-(dist - radius) / 5.0), 1.0)
+
+        # Identity filter
+        gen_dist = np.linalg.norm(
+            np.array([o.dna["genetic_signature"] for o in obs]) - np.array([t.dna["genetic_signature"] for t in tgt]), axis=1
+        )
+        kin_prox = 1.0 / (1.0 + gen_dist)
+        cult_dist = np.linalg.norm(
+            np.array([o.cultural_signature for o in obs]) - np.array([t.cultural_signature for t in tgt]), axis=1
+        )
+        cult_prox = 1.0 / (1.0 + cult_dist)
+
+        clarity = ledger.transparency * geo_clarity * (0.5 + 0.5 * cult_prox)
+        perceived = 0.5 + (fame[idx] - 0.5) * clarity
+
+        # Identity bias noise (strangers hear the most distorted gossip)
+        noise_range = WORLD_SETTINGS.get("identity_gossip_bias", 0.4) * (1.0 - kin_prox)
+        perceived += rng.stream("gossip").uniform(-1.0, 1.0, len(idx)) * noise_range
+
+        fame[idx] = np.clip(perceived, 0.0, 1.0)
+        return fame
+
+    def decide(self, agents, opponents, fames, neighbor_lists):
+        n = len(agents)
+        n_in, n_out = BRAIN_SETTINGS["input_size"], BRAIN_SETTINGS["output_size"]
+        dtype = brain_dtype()
+
+        # --- 1. PREPARE INPUTS ---
+        inputs = np.empty((n, n_in), dtype=dtype)
+        inputs[:, 0] = np.minimum(np.array([a.points for a in agents]) / 1000.0, 1.0)
+        inputs[:, 1] = np.minimum(np.array([a.age for a in agents]) / POPULATION_SETTINGS["max_age"], 1.0)
+        inputs[:, 2] = fames
+        for k, (agent, opponent) in enumerate(zip(agents, opponents)):
+            hist = agent.private_memory.get(opponent)
+            inputs[k, 3] = hist.count("C") / len(hist) if hist else 0.5
+        inputs[:, 4] = 1.0
+        inputs[:, 5] = 1.0 / (1.0 + np.linalg.norm(
+            np.array([a.dna["genetic_signature"] for a in agents])
+            - np.array([o.dna["genetic_signature"] for o in opponents]), axis=1))
+        inputs[:, 6] = 1.0 / (1.0 + np.linalg.norm(
+            np.array([a.cultural_signature for a in agents])
+            - np.array([o.cultural_signature for o in opponents]), axis=1))
+
+        # --- 2. MULTI-LAYER PROCESSING ---
+        widest = max(a.dna["W1"].shape[1] for a in agents)
+        W1 = np.zeros((n, n_in, widest), dtype=dtype)
+        W2 = np.zeros((n, widest, n_out), dtype=dtype)
+        for k, agent in enumerate(agents):
+            h = agent.dna["W1"].shape[1]
+            W1[k, :, :h] = agent.dna["W1"]
+            W2[k, :h, :] = agent.dna["W2"]
+        traits = np.array([
+            [a.dna["w_reptilian"], a.dna["w_hebb"], a.dna["w_rl"], a.dna["w_memetic"], a.dna["creativity"]]
+            for a in agents
+        ], dtype=dtype)
+
+        hidden = np.maximum(np.einsum("bi,bih->bh", inputs, W1), 0)
+        reptilian = traits[:, 0:1] * np.einsum("bh,bho->bo", hidden, W2)
+        hebbian = traits[:, 1:2] * np.einsum("bi,bio->bo", inputs, np.array([a.W_hebb for a in agents]))
+        rl = traits[:, 2:3] * np.einsum("bi,bio->bo", inputs, np.array([a.W_rl for a in agents]))
+        logits = reptilian + hebbian
+        logits += rl
+
+        # Memetic layer: prestige-weighted vote of richer neighbors' last moves
+        memetic = np.zeros((n, n_out), dtype=dtype)
+        for k, (agent, neighbors) in enumerate(zip(agents, neighbor_lists)):
+            if not neighbors or traits[k, 3] <= 0:
+                continue
+            votes = [n.last_action_index for n in neighbors
+                     if n.points > agent.points and getattr(n, "last_action_index", None) is not None]
+            if votes:
+                memetic[k] = traits[k, 3] * np.bincount(votes, minlength=n_out) / len(votes)
+                logits[k] += memetic[k]
+
+        noise = rng.stream("decision").randn(n, n_out) * traits[:, 4:5]
+        logits += noise
+
+        # --- 3. SELECTION & STORAGE FOR LEARNING ---
+        chosen = np.argmax(logits, axis=1)
+        for k, agent in enumerate(agents):
+            agent.last_input = inputs[k]
+            agent.last_action_index = int(chosen[k])
+
+        if self.tracer is not None:
+            rows = np.flatnonzero(self.tracer.sample_mask(agents))
+            if len(rows):
+                layers = np.stack([reptilian[rows], hebbian[rows], rl[rows], memetic[rows], noise[rows]], axis=1)
+                self.tracer.record_batch([agents[k] for k in rows], inputs[rows], layers, chosen[rows])
+        return [ACTIONS[i] for i in chosen]
+
+    def learn(self, agents, rewards):
+        pairs = [(a, r) for a, r in zip(agents, rewards)
+                 if a.last_input is not None and a.last_action_index is not None]
+        if not pairs:
+            return
+        agents = [a for a, _ in pairs]
+        dtype = brain_dtype()
+        rewards = np.array([r for _, r in pairs], dtype=dtype)
+        rates = np.array([a.dna["learning_rate"] for a in agents], dtype=dtype)
+
+        one_hot = np.zeros((len(agents), BRAIN_SETTINGS["output_size"]), dtype=dtype)
+        one_hot[np.arange(len(agents)), [a.last_action_index for a in agents]] = 1.0
+        delta = np.einsum("bi,bo->bio", np.array([a.last_input for a in agents]), one_hot)
+        delta *= rates[:, None, None]
+
+        W_hebb = (np.array([a.W_hebb for a in agents]) + delta) * 0.99
+        W_rl = (np.array([a.W_rl for a in agents]) + delta * rewards[:, None, None]) * 0.99
+        for k, agent in enumerate(agents):
+            agent.W_hebb = W_hebb[k]
+            agent.W_rl = W_rl[k]
+
+    def update_culture(self, agents, opponent_moves, opponent_cultures):
+        # Signed shift: toward the partner after C, away after D
+        shift = np.array([
+            IDENTITY_SETTINGS["hybridization_rate"] if m == "C"
+            else -IDENTITY_SETTINGS["polarization_rate"] if m == "D" else 0.0
+            for m in opponent_moves
+        ], dtype=brain_dtype())
+        own = np.array([a.cultural_signature for a in agents])
+        updated = np.clip(own + shift[:, None] * (np.array(opponent_cultures) - own), 0, 1)
+        for k, agent in enumerate(agents):
+            agent.cultural_signature = updated[k]
+
+
+def run_trajectory(backend, seed, ticks, precision=None):
+    """Runs a fresh engine with the given kernel; returns per-tick population and C/D counts."""
+    from simulation.engine import SimulationEngine
+
+    saved = BRAIN_SETTINGS["precision"]
+    BRAIN_SETTINGS["precision"] = precision or saved
+    try:
+        engine = SimulationEngine(kernel=create_kernel(backend), seed=seed)
+        rows = []
+        for _ in range(ticks):
+            engine.run_tick()
+            rows.append((len(engine.agents), engine.coops_this_tick, engine.defects_this_tick))
+    finally:
+        BRAIN_SETTINGS["precision"] = saved
+    return np.array(rows, dtype=float)
+
+
+def _equivalence(base, cand, n_seeds):
+    """
+    Accepts the candidate runs when their mean population and cooperation
+    share differ from the baseline's by less than the seed-to-seed spread
+    (plus a small floor). Returns (passed, report dict).
+    """
+    def summarize(runs):
+        pop = runs[:, :, 0].mean(axis=1)
+        coop = runs[:, :, 1].sum(axis=1) / np.maximum(runs[:, :, 1:].sum(axis=(1, 2)), 1)
+        return pop, coop
+
+    report = {}
+    passed = True
+    for label, b, c, floor in zip(("pop", "coop_share"), summarize(base), summarize(cand), (0.05, 0.05)):
+        spread = max(b.std(ddof=1), c.std(ddof=1)) if n_seeds > 1 else 0.0
+        tolerance = 3 * spread / np.sqrt(n_seeds) + floor * abs(b.mean())
+        diff = abs(b.mean() - c.mean())
+        report[label] = {"baseline": b.mean(), "candidate": c.mean(), "diff": diff, "tolerance": tolerance}
+        passed &= bool(diff <= tolerance)
+    return passed, report
+
+
+def compare_backends(candidate="numpy", baseline="reference", seeds=(0, 1, 2), ticks=60):
+    """
+    Statistical equivalence check between two kernels on the same seeds
+    (see `_equivalence`). Returns (passed, report dict).
+    """
+    base = np.array([run_trajectory(baseline, s, ticks) for s in seeds])
+    cand = np.array([run_trajectory(candidate, s, ticks) for s in seeds])
+    return _equivalence(base, cand, len(seeds))
+
+
+def compare_precision(candidate="float32", baseline="float64", backend=None, seeds=(0, 1, 2), ticks=60):
+    """
+    Validation run for BRAIN_SETTINGS['precision']: the same seeds at both
+    precisions must reach statistically equivalent outcomes. Trajectories
+    diverge after the first rounding-sensitive argmax, so this is the same
+    spread-based test as `compare_backends`, not an exact comparison.
+    """
+    backend = backend or KERNEL_SETTINGS["backend"]
+    base = np.array([run_trajectory(backend, s, ticks, precision=baseline) for s in seeds])
+    cand = np.array([run_trajectory(backend, s, ticks, precision=candidate) for s in seeds])
+    return _equivalence(base, cand, len(seeds))
+
+
+if __name__ == "__main__":
+    # python -m simulation.kernels: validate the numpy backend and float32 precision
+    for label, (passed, report) in (("numpy backend", compare_backends()), ("float32 precision", compare_precision())):
+        print(f"{label}: {'PASSED' if passed else 'FAILED'}")
+        for metric, row in report.items():
+            print(f"  {metric:<10} baseline {row['baseline']:.3f} | candidate {row['candidate']:.3f} | "
+                  f"diff {row['diff']:.3f} (tolerance {row['tolerance']:.3f})")
@@ -0,0 +1,171 @@
+"""
+simulation/lineage.py
+Optional phylogeny tracking. Every agent gets a small integer lineage id;
+parent links, birth/death ticks, founder and a few key traits are stored in
+append-only NumPy columns. Periodic coalescence pruning drops extinct
+branches and splices out dead ancestors with a single surviving child, so
+the stored tree stays proportional to the living population however long
+the run. Exports to Newick.
+"""
+import numpy as np
+from config import LINEAGE_SETTINGS
+
+NO_PARENT = -1
+ALIVE = -1
+
+
+class LineageTracker:
+    def __init__(self, traits=None, capacity=1024):
+        self.traits = list(traits or LINEAGE_SETTINGS["traits"])
+        self.size = 0
+        self.next_id = 0
+        self.pruned = 0  # Nodes removed so far
+
+        # Columns. `ids` is strictly increasing (append-only, pruning keeps order)
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.parent = np.empty(capacity, dtype=np.int64)
+        self.founder = np.empty(capacity, dtype=np.int64)
+        self.birth = np.empty(capacity, dtype=np.int32)
+        self.death = np.empty(capacity, dtype=np.int32)
+        self.values = np.empty((capacity, len(self.traits)), dtype=np.float32)
+
+    # --- Recording ---
+    def _grow(self, extra):
+        need = self.size + extra
+        if need <= len(self.ids):
+            return
+        capacity = max(need, 2 * len(self.ids))
+        for name in ("ids", "parent", "founder", "birth", "death", "values"):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def _rows(self, lineage_ids):
+        return np.searchsorted(self.ids[:self.size], lineage_ids)
+
+    def record_births(self, children, parents, tick):
+        """Appends children (parents=None for founders) and tags them with lineage ids."""
+        k = len(children)
+        if k == 0:
+            return
+        self._grow(k)
+        sl = slice(self.size, self.size + k)
+        new_ids = np.arange(self.next_id, self.next_id + k)
+        self.ids[sl] = new_ids
+        self.birth[sl] = tick
+        self.death[sl] = ALIVE
+        self.values[sl] = [[child.dna[t] for t in self.traits] for child in children]
+
+        if parents is None:
+            self.parent[sl] = NO_PARENT
+            self.founder[sl] = new_ids
+        else:
+            parent_ids = np.array([p.lineage_id for p in parents], dtype=np.int64)
+            self.parent[sl] = parent_ids
+            self.founder[sl] = self.founder[self._rows(parent_ids)]
+
+        for child, lineage_id in zip(children, new_ids.tolist()):
+            child.lineage_id = lineage_id
+        self.size += k
+        self.next_id += k
+
+    def record_deaths(self, agents, tick):
+        ids = [a.lineage_id for a in agents if a.lineage_id is not None]
+        if ids:
+            self.death[self._rows(ids)] = tick
+
+    # --- Coalescence Pruning ---
+    def prune(self):
+        """
+        Keeps only the living and their ancestors, then splices out dead
+        ancestors with exactly one retained child (their child inherits
+        their parent). Founders of surviving lineages are always kept.
+        """
+        n = self.size
+        if n == 0:
+            return 0
+        ids, parent = self.ids[:n], self.parent[:n]
+        has_parent = parent != NO_PARENT
+        parent_row = np.full(n, -1)
+        parent_row[has_parent] = self._rows(parent[has_parent])
+
+        # 1. Mark the living and walk up to their ancestors
+        keep = self.death[:n] == ALIVE
+        frontier = np.flatnonzero(keep)
+        while len(frontier):
+            up = parent_row[frontier]
+            up = np.unique(up[up >= 0])
+            frontier = up[~keep[up]]
+            keep[frontier] = True
+
+        # 2. Splice dead, single-child ancestors out of the kept tree
+        kept_children = np.bincount(parent_row[keep & has_parent], minlength=n)
+        splice = keep & (self.death[:n] != ALIVE) & (kept_children == 1) & has_parent
+
+        target = parent_row.copy()
+        chained = splice[np.maximum(target, 0)] & (target >= 0)
+        while chained.any():
+            target[chained] = parent_row[target[chained]]
+            chained = splice[np.maximum(target, 0)] & (target >= 0)
+        new_parent = np.where(target >= 0, ids[np.maximum(target, 0)], NO_PARENT)
+
+        survivors = keep & ~splice
+        count = int(survivors.sum())
+        for name in ("ids", "founder", "birth", "death", "values"):
+            column = getattr(self, name)
+            column[:count] = column[:n][survivors]
+        self.parent[:count] = new_parent[survivors]
+
+        removed = n - count
+        self.size = count
+        self.pruned += removed
+        return removed
+
+    # --- Queries & Export ---
+    def living_founders(self):
+        """{founder lineage id: living descendants}, largest first."""
+        alive = self.death[:self.size] == ALIVE
+        founders, counts = np.unique(self.founder[:self.size][alive], return_counts=True)
+        order = np.argsort(-counts)
+        return dict(zip(founders[order].tolist(), counts[order].tolist()))
+
+    def trait_history(self, trait):
+        """(birth ticks, trait values) of every stored node, for sweep analysis."""
+        col = self.traits.index(trait)
+        return self.birth[:self.size].copy(), self.values[:self.size, col].copy()
+
+    def to_newick(self):
+        """
+        Newick string of the stored tree. Nodes are labelled n<lineage id>,
+        branch lengths are ticks between births, founders hang off one root.
+        """
+        n = self.size
+        ids, parent, birth = self.ids[:n], self.parent[:n], self.birth[:n]
+        children = {}
+        for row in range(n):
+            children.setdefault(int(parent[row]), []).append(row)
+
+        def label(row):
+            length = birth[row] - (birth[self._rows(parent[row])] if parent[row] != NO_PARENT else 0)
+            return f"n{ids[row]}:{length}"
+
+        # Iterative post-order (trees can be deeper than the recursion limit)
+        rendered = {}
+        stack = [(row, False) for row in children.get(NO_PARENT, [])]
+        while stack:
+            row, expanded = stack.pop()
+            kids = children.get(int(ids[row]), [])
+            if kids and not expanded:
+                stack.append((row, True))
+                stack.extend((k, False) for k in kids)
+                continue
+            if kids:
+                rendered[row] = "(" + ",".join(rendered.pop(k) for k in kids) + ")" + label(row)
+            else:
+                rendered[row] = label(row)
+        return "(" + ",".join(rendered[r] for r in children.get(NO_PARENT, [])) + ");"
+
+    def save_newick(self, path):
+        with open(path, "w") as f:
+            f.write(self.to_newick() + "\n")
@@ -0,0 +1,205 @@
+"""
+simulation/network.py
+Optional interaction network: who played whom and how it went. Every game
+appends two directed events (actor -> partner, C or D) to flat NumPy
+buffers; compaction folds them into a sorted sparse edge list (row-major,
+i.e. CSR order), applies exponential decay and drops faded edges. Queries
+run on the compacted arrays, so the recorder scales to millions of
+interactions without per-pair Python objects.
+"""
+import numpy as np
+from config import NETWORK_SETTINGS
+
+# Compacted edge columns
+PLAYS, COOPS, TRIBE_PLAYS, TRIBE_COOPS = range(4)
+_STRIDE = np.int64(1) << 32   # Edge key = src * _STRIDE + dst
+
+
+class InteractionNetwork:
+    def __init__(self, decay=None, min_weight=None, tribe_radius=None, buffer_size=None):
+        self.decay = NETWORK_SETTINGS["decay"] if decay is None else decay                  # Per tick
+        self.min_weight = NETWORK_SETTINGS["min_weight"] if min_weight is None else min_weight
+        self.tribe_radius = NETWORK_SETTINGS["tribe_radius"] if tribe_radius is None else tribe_radius
+        capacity = buffer_size or NETWORK_SETTINGS["buffer_size"]
+
+        # Node labels: agent id <-> dense integer index (relabelled on compaction)
+        self.node_of = {}
+        self.node_ids = []
+
+        # Append buffer (one row per directed event)
+        self._src = np.empty(capacity, dtype=np.int64)
+        self._dst = np.empty(capacity, dtype=np.int64)
+        self._tick = np.empty(capacity, dtype=np.int64)
+        self._coop = np.empty(capacity, dtype=bool)
+        self._tribe = np.empty(capacity, dtype=bool)
+        self._n = 0
+
+        # Compacted sparse edges, sorted by key
+        self.keys = np.empty(0, dtype=np.int64)
+        self.weights = np.empty((0, 4))
+        self.compacted_tick = 0
+        self.events_recorded = 0
+
+    # --- Recording ---
+    def _node(self, agent):
+        index = self.node_of.get(agent.id)
+        if index is None:
+            index = self.node_of[agent.id] = len(self.node_ids)
+            self.node_ids.append(agent.id)
+        return index
+
+    def same_tribe(self, a, b):
+        return np.linalg.norm(a.cultural_signature - b.cultural_signature) <= self.tribe_radius
+
+    def record(self, a, b, move_a, move_b, tick):
+        """Logs one played game as the two directed events a -> b and b -> a."""
+        if self._n + 2 > len(self._src):
+            self.compact(tick)
+        i, j = self._node(a), self._node(b)
+        tribe = self.same_tribe(a, b)
+        n = self._n
+        self._src[n], self._dst[n], self._coop[n] = i, j, move_a == "C"
+        self._src[n + 1], self._dst[n + 1], self._coop[n + 1] = j, i, move_b == "C"
+        self._tick[n:n + 2] = tick
+        self._tribe[n:n + 2] = tribe
+        self._n += 2
+        self.events_recorded += 2
+
+    # --- Compaction ---
+    def compact(self, tick):
+        """Folds the buffer into the edge list, decays everything to `tick` and relabels nodes."""
+        n = self._n
+        old = self.weights * self.decay ** (tick - self.compacted_tick)
+
+        fresh = np.zeros((n, 4))
+        age_weight = self.decay ** (tick - self._tick[:n])
+        fresh[:, PLAYS] = age_weight
+        fresh[:, COOPS] = age_weight * self._coop[:n]
+        fresh[:, TRIBE_PLAYS] = age_weight * self._tribe[:n]
+        fresh[:, TRIBE_COOPS] = fresh[:, COOPS] * self._tribe[:n]
+
+        keys = np.concatenate([self.keys, self._src[:n] * _STRIDE + self._dst[:n]])
+        keys, inverse = np.unique(keys, return_inverse=True)
+        stacked = np.concatenate([old, fresh])
+        weights = np.stack([np.bincount(inverse, stacked[:, c], minlength=len(keys)) for c in range(4)], axis=1)
+
+        alive = weights[:, PLAYS] >= self.min_weight
+        keys, weights = keys[alive], weights[alive]
+
+        # Relabel so node indices stay dense over the nodes that still have edges
+        nodes, labels = np.unique(np.concatenate([keys // _STRIDE, keys % _STRIDE]), return_inverse=True)
+        src, dst = np.split(labels, 2)
+        self.node_ids = [self.node_ids[k] for k in nodes.tolist()]
+        self.node_of = {agent_id: k for k, agent_id in enumerate(self.node_ids)}
+
+        # Monotone relabelling keeps the key order
+        self.keys = src * _STRIDE + dst
+        self.weights = weights
+        self.compacted_tick = tick
+        self._n = 0
+
+    # --- Queries (on the compacted graph; call compact() first for up-to-date results) ---
+    @property
+    def n_nodes(self):
+        return len(self.node_ids)
+
+    def edges(self):
+        """(src, dst, weights) of the directed edges, in CSR order."""
+        return self.keys // _STRIDE, self.keys % _STRIDE, self.weights
+
+    def csr(self, column=PLAYS):
+        """(indptr, indices, data) of the directed adjacency matrix."""
+        src, dst, weights = self.edges()
+        indptr = np.searchsorted(src, np.arange(self.n_nodes + 1))
+        return indptr, dst, weights[:, column]
+
+    def _undirected(self):
+        """Sorted unique undirected pairs (lo, hi)."""
+        src, dst, _ = self.edges()
+        lo, hi = np.minimum(src, dst), np.maximum(src, dst)
+        pairs = np.unique(lo * _STRIDE + hi)
+        return pairs // _STRIDE, pairs % _STRIDE
+
+    def degrees(self):
+        """Distinct partners per node."""
+        lo, hi = self._undirected()
+        return np.bincount(np.concatenate([lo, hi]), minlength=self.n_nodes)
+
+    def degree_distribution(self):
+        """Histogram: entry k is the number of nodes with k distinct partners."""
+        return np.bincount(self.degrees())
+
+    def reciprocity(self):
+        """
+        Weighted reciprocity of cooperation: sum_ij min(c_ij, c_ji) / sum_ij c_ij,
+        where c_ij is the (decayed) number of times i cooperated with j.
+        1 means cooperation is always returned in kind, 0 that it never is.
+        """
+        coops = self.weights[:, COOPS]
+        total = coops.sum()
+        if total == 0:
+            return 0.0
+        src, dst, _ = self.edges()
+        reverse = np.searchsorted(self.keys, dst * _STRIDE + src)
+        reverse = np.minimum(reverse, len(self.keys) - 1)
+        back = np.where(self.keys[reverse] == dst * _STRIDE + src, coops[reverse], 0.0)
+        return float(np.minimum(coops, back).sum() / total)
+
+    def tribe_cooperation(self):
+        """Cooperation share of moves made toward the same tribe vs other tribes."""
+        plays, coops, tribe_plays, tribe_coops = self.weights.sum(axis=0) if len(self.weights) else np.zeros(4)
+        out_plays, out_coops = plays - tribe_plays, coops - tribe_coops
+        return {
+            "in_tribe": tribe_coops / tribe_plays if tribe_plays > 0 else None,
+            "out_tribe": out_coops / out_plays if out_plays > 0 else None,
+        }
+
+    def clustering(self):
+        """Local clustering coefficient of every node on the undirected partner graph."""
+        n = self.n_nodes
+        lo, hi = self._undirected()
+        if len(lo) == 0:
+            return np.zeros(n)
+
+        # Symmetric CSR
+        rows = np.concatenate([lo, hi])
+        cols = np.concatenate([hi, lo])
+        order = np.lexsort((cols, rows))
+        rows, cols = rows[order], cols[order]
+        deg = np.bincount(rows, minlength=n)
+        indptr = np.concatenate([[0], np.cumsum(deg)])
+
+        # Enumerate wedges a - v - b (a < b) by pairing every edge with its row-mates
+        per_edge = deg[rows]
+        p = np.repeat(np.arange(len(rows)), per_edge)
+        q = np.repeat(indptr[rows], per_edge) + (np.arange(per_edge.sum()) - np.repeat(np.cumsum(per_edge) - per_edge, per_edge))
+        a, b = cols[p], cols[q]
+        wedge = a < b
+        centre, a, b = rows[p][wedge], a[wedge], b[wedge]
+
+        # A wedge is closed if (a, b) is an edge
+        edge_keys = lo * _STRIDE + hi
+        probe = a * _STRIDE + b
+        found = np.searchsorted(edge_keys, probe)
+        closed = edge_keys[np.minimum(found, len(edge_keys) - 1)] == probe
+
+        triangles = np.bincount(centre[closed], minlength=n)
+        possible = deg * (deg - 1) / 2
+        return np.divide(triangles, possible, out=np.zeros(n), where=possible > 0)
+
+    def average_clustering(self):
+        """Mean local clustering (nodes with fewer than two partners count as 0)."""
+        return float(self.clustering().mean()) if self.n_nodes else 0.0
+
+    def summary(self):
+        degrees = self.degrees()
+        tribes = self.tribe_cooperation()
+        return {
+            "nodes": self.n_nodes,
+            "edges": len(self.keys),
+            "mean_degree": float(degrees.mean()) if len(degrees) else 0.0,
+            "reciprocity": self.reciprocity(),
+            "clustering": self.average_clustering(),
+            "in_tribe_coop": tribes["in_tribe"],
+            "out_tribe_coop": tribes["out_tribe"],
+        }
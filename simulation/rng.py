@@ -0,0 +1,178 @@
+"""
+simulation/rng.py
+Central randomness. Every subsystem draws from its own named stream, each
+an independently seeded numpy Generator derived from one root seed, so a
+run is bit-reproducible from that seed and adding draws to one subsystem
+does not shift the numbers another one sees. Scalar and small-array draws
+are served from pre-drawn blocks, turning millions of tiny calls into a
+few bulk ones.
+
+Every SimulationEngine owns a RandomService seeded from its own seed and
+routes the module-level `stream()` to it while it runs (see `using`), so
+engines in one process never draw from each other's streams. Code running
+outside any engine draws from the module default service.
+
+    from simulation import rng
+    rng.stream("matching").shuffle(agents)
+"""
+import threading
+import uuid
+import zlib
+from contextlib import contextmanager
+import numpy as np
+from config import RNG_SETTINGS
+
+# Streams used by the model (any other name works too)
+STREAMS = ("genesis", "matching", "decision", "gossip", "mutation", "movement", "identity", "migration")
+
+
+class RandomStream:
+    """
+    A numpy Generator with block-buffered uniforms and normals. Small array
+    draws are copied out of the block, so results never alias it.
+    """
+    def __init__(self, generator, block_size):
+        self.generator = generator
+        self.block_size = block_size
+        self._small = block_size // 8   # Larger array draws bypass the blocks
+        self._uniform, self._uniform_list, self._u = None, None, block_size
+        self._normal, self._z = None, block_size
+
+    # --- Blocks ---
+    def _take_uniform(self, count):
+        if self._u + count > self.block_size:
+            self._uniform = self.generator.random(self.block_size)
+            self._uniform_list = self._uniform.tolist()
+            self._u = 0
+        start = self._u
+        self._u += count
+        return start
+
+    def _take_normal(self, count):
+        if self._z + count > self.block_size:
+            self._normal = self.generator.standard_normal(self.block_size)
+            self._z = 0
+        start = self._z
+        self._z += count
+        return self._normal[start:start + count].copy()
+
+    # --- Scalars (random-module style) ---
+    def random(self):
+        """Uniform float in [0, 1)."""
+        start = self._take_uniform(1)
+        return self._uniform_list[start]
+
+    def uniform(self, low, high, size=None):
+        if size is None:
+            return low + (high - low) * self.random()
+        return low + (high - low) * self.rand(*np.atleast_1d(size))
+
+    def randint(self, low, high):
+        """Integer in [low, high], both inclusive."""
+        return low + int(self.random() * (high - low + 1))
+
+    def choice(self, seq):
+        return seq[int(self.random() * len(seq))]
+
+    def shuffle(self, items):
+        """Shuffles a list in place with one permutation draw."""
+        order = self.generator.permutation(len(items)).tolist()
+        items[:] = [items[k] for k in order]
+
+    # --- Arrays (numpy style) ---
+    def rand(self, *shape):
+        count = int(np.prod(shape))
+        if count == 0 or count > self._small:
+            return self.generator.random(shape)
+        start = self._take_uniform(count)
+        return self._uniform[start:start + count].reshape(shape).copy()
+
+    def randn(self, *shape):
+        count = int(np.prod(shape))
+        if count == 0 or count > self._small:
+            return self.generator.standard_normal(shape)
+        return self._take_normal(count).reshape(shape)
+
+    def integers(self, low, high, size=None):
+        """Integers in [low, high) (numpy convention)."""
+        return self.generator.integers(low, high, size)
+
+    def permutation(self, n):
+        return self.generator.permutation(n)
+
+    def uuids(self, n):
+        """n version-4 UUIDs from this stream's bits."""
+        raw = self.generator.bytes(16 * n)
+        return [uuid.UUID(bytes=raw[16 * k:16 * (k + 1)], version=4) for k in range(n)]
+
+    def uuid4(self):
+        return self.uuids(1)[0]
+
+
+class RandomService:
+    def __init__(self, seed=None, block_size=None):
+        self.seed(seed, block_size)
+
+    def seed(self, seed=None, block_size=None):
+        """Resets every stream. seed=None draws fresh OS entropy (see `entropy`)."""
+        self.root = np.random.SeedSequence(seed)
+        self.block_size = block_size or RNG_SETTINGS["block_size"]
+        self.streams = {}
+
+    @property
+    def entropy(self):
+        """Root seed in use; seeding with it replays the run."""
+        return self.root.entropy
+
+    def stream(self, name):
+        found = self.streams.get(name)
+        if found is None:
+            # Keyed by name, not creation order, so streams stay stable as subsystems come and go
+            child = np.random.SeedSequence(self.root.entropy, spawn_key=(zlib.crc32(name.encode()),))
+            found = self.streams[name] = RandomStream(np.random.Generator(np.random.PCG64(child)), self.block_size)
+        return found
+
+
+_service = RandomService(RNG_SETTINGS["seed"])
+# Service of the engine running on this thread (see `using`)
+_local = threading.local()
+
+
+def current():
+    """The service `stream()` draws from: the running engine's, else the module default."""
+    return getattr(_local, "service", None) or _service
+
+
+@contextmanager
+def using(service):
+    """Routes this thread's `stream()` calls to `service` for the duration of the block."""
+    previous = getattr(_local, "service", None)
+    _local.service = service
+    try:
+        yield service
+    finally:
+        _local.service = previous
+
+
+def seed(value=None, block_size=None):
+    """Reseeds the module default service (engines keep their own)."""
+    _service.seed(value, block_size)
+
+
+def entropy():
+    return _service.entropy
+
+
+def get_state():
+    """The default service itself, every stream mid-block (an engine pickles its own with it)."""
+    return _service
+
+
+def set_state(service):
+    """Resumes the streams from a `get_state` checkpoint."""
+    global _service
+    _service = service
+
+
+def stream(name):
+    return current().stream(name)
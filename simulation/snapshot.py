@@ -0,0 +1,185 @@
+"""
+simulation/snapshot.py
+Per-tick population snapshots as flat NumPy arrays. `capture` builds a
+private copy for in-process consumers; `SnapshotPublisher` writes the same
+arrays into double-buffered shared memory so sidecar processes (dashboards,
+analytics) can attach with `SnapshotReader` and read them without copying
+and without ever locking the simulation.
+"""
+import numpy as np
+from multiprocessing import shared_memory
+from config import IDENTITY_SETTINGS, SNAPSHOT_SETTINGS
+
+ACTIONS = ["C", "D", "MOVE", "IGNORE"]
+NO_ACTION = -1
+
+# Header slots (int64): layout description + seqlock counters + per-buffer metadata
+_H_MAGIC, _H_CAPACITY, _H_GEN_DIM, _H_CULT_DIM, _H_STARTED, _H_COMPLETED = range(6)
+_H_COUNT, _H_TICK, _H_POP = 6, 8, 10  # Two slots each (one per buffer)
+_HEADER_SLOTS = 12
+_MAGIC = 0x4D555141  # "MUQA"
+
+
+def snapshot_fields(gen_dim=None, cult_dim=None):
+    """Field name -> (dtype, per-agent shape)."""
+    gen_dim = gen_dim or IDENTITY_SETTINGS["genetic_dim"]
+    cult_dim = cult_dim or IDENTITY_SETTINGS["cultural_dim"]
+    return {
+        "position": (np.int32, (2,)),
+        "points": (np.float64, ()),
+        "age": (np.int32, ()),
+        "last_action": (np.int8, ()),
+        "genetic_signature": (np.float64, (gen_dim,)),
+        "cultural_signature": (np.float64, (cult_dim,)),
+    }
+
+
+def fill(agents, arrays):
+    """Writes the agents' state into preallocated field arrays. Returns the count written."""
+    n = min(len(agents), len(arrays["points"]))
+    agents = agents[:n]
+    if n == 0:
+        return 0
+    arrays["position"][:n] = [a.position for a in agents]
+    arrays["points"][:n] = [a.points for a in agents]
+    arrays["age"][:n] = [a.age for a in agents]
+    arrays["last_action"][:n] = [
+        NO_ACTION if getattr(a, "last_action_index", None) is None else a.last_action_index
+        for a in agents
+    ]
+    arrays["genetic_signature"][:n] = [a.dna["genetic_signature"] for a in agents]
+    arrays["cultural_signature"][:n] = [a.cultural_signature for a in agents]
+    return n
+
+
+def capture(engine):
+    """Returns a private, immutable-by-convention snapshot of the population."""
+    n = len(engine.agents)
+    arrays = {
+        name: np.empty((n,) + shape, dtype=dtype)
+        for name, (dtype, shape) in snapshot_fields().items()
+    }
+    fill(engine.agents, arrays)
+    arrays["tick"] = engine.tick
+    return arrays
+
+
+def _layout(capacity, gen_dim, cult_dim):
+    """Byte offsets of (header, buffer 0 fields, buffer 1 fields) inside the segment."""
+    offset = _HEADER_SLOTS * 8
+    buffers = []
+    for _ in range(2):
+        fields = {}
+        for name, (dtype, shape) in snapshot_fields(gen_dim, cult_dim).items():
+            offset = -(-offset // 8) * 8  # Keep every field 8-byte aligned
+            fields[name] = (dtype, (capacity,) + shape, offset)
+            offset += capacity * int(np.prod(shape, dtype=int)) * np.dtype(dtype).itemsize
+        buffers.append(fields)
+    return buffers, offset
+
+
+def _views(buf, buffers):
+    return [
+        {name: np.ndarray(shape, dtype=dtype, buffer=buf, offset=off)
+         for name, (dtype, shape, off) in fields.items()}
+        for fields in buffers
+    ]
+
+
+class SnapshotPublisher:
+    """
+    Writer side. Publish number s goes into buffer s % 2, so readers keep a
+    complete previous snapshot while the next one is being written. The
+    `started`/`completed` counters form a seqlock: a reader holding snapshot
+    c is still valid as long as no more than c + 1 publishes have started.
+    """
+    def __init__(self, name=None, capacity=None):
+        self.capacity = capacity or SNAPSHOT_SETTINGS["capacity"]
+        gen_dim = IDENTITY_SETTINGS["genetic_dim"]
+        cult_dim = IDENTITY_SETTINGS["cultural_dim"]
+        buffers, size = _layout(self.capacity, gen_dim, cult_dim)
+
+        self.shm = shared_memory.SharedMemory(
+            name=name or SNAPSHOT_SETTINGS["name"], create=True, size=size
+        )
+        self.name = self.shm.name
+        self.header = np.ndarray((_HEADER_SLOTS,), dtype=np.int64, buffer=self.shm.buf)
+        self.header[:] = 0
+        self.header[[_H_MAGIC, _H_CAPACITY, _H_GEN_DIM, _H_CULT_DIM]] = [
+            _MAGIC, self.capacity, gen_dim, cult_dim
+        ]
+        self.buffers = _views(self.shm.buf, buffers)
+
+    def publish(self, engine):
+        """Writes the engine's population into the back buffer and flips it to the front."""
+        seq = int(self.header[_H_STARTED]) + 1
+        self.header[_H_STARTED] = seq
+        slot = seq % 2
+
+        n = fill(engine.agents, self.buffers[slot])
+        self.header[_H_COUNT + slot] = n
+        self.header[_H_TICK + slot] = engine.tick
+        self.header[_H_POP + slot] = len(engine.agents)  # > count when truncated
+        self.header[_H_COMPLETED] = seq
+
+    def close(self):
+        self.buffers = None
+        self.header = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SnapshotReader:
+    """
+    Reader side, for a separate process. `latest()` returns zero-copy views
+    into the front buffer plus a token; call `still_valid(token)` after using
+    them to know whether the writer lapped you. `copy()` does the retry loop
+    for consumers that prefer a private copy.
+    """
+    def __init__(self, name=None):
+        self.shm = shared_memory.SharedMemory(name=name or SNAPSHOT_SETTINGS["name"])
+        # Python < 3.13 registers attached segments for cleanup at exit, which
+        # would destroy the writer's segment when a reader quits.
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        except Exception:
+            pass
+
+        self.header = np.ndarray((_HEADER_SLOTS,), dtype=np.int64, buffer=self.shm.buf)
+        if self.header[_H_MAGIC] != _MAGIC:
+            raise ValueError(f"{self.shm.name} is not a population snapshot segment")
+        capacity, gen_dim, cult_dim = (int(v) for v in self.header[[_H_CAPACITY, _H_GEN_DIM, _H_CULT_DIM]])
+        buffers, _ = _layout(capacity, gen_dim, cult_dim)
+        self.buffers = _views(self.shm.buf, buffers)
+
+    def latest(self):
+        """Returns (views, token). Views are None until the first publish."""
+        seq = int(self.header[_H_COMPLETED])
+        if seq == 0:
+            return None, seq
+        slot = seq % 2
+        n = int(self.header[_H_COUNT + slot])
+        views = {name: arr[:n] for name, arr in self.buffers[slot].items()}
+        views["tick"] = int(self.header[_H_TICK + slot])
+        views["population"] = int(self.header[_H_POP + slot])
+        return views, seq
+
+    def still_valid(self, token):
+        return int(self.header[_H_STARTED]) <= token + 1
+
+    def copy(self, retries=100):
+        """Returns a private copy of the latest complete snapshot (or None)."""
+        for _ in range(retries):
+            views, token = self.latest()
+            if views is None:
+                return None
+            snap = {k: (v.copy() if isinstance(v, np.ndarray) else v) for k, v in views.items()}
+            if self.still_valid(token):
+                return snap
+        raise RuntimeError("Snapshot writer kept lapping the reader")
+
+    def close(self):
+        self.buffers = None
+        self.header = None
+        self.shm.close()
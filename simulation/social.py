@@ -2,9 +2,10 @@
 simulation/social.py
 Manages the global 'Social Fame' ledger, reputation decay, and gossip.
 """
-import random
+from collections import deque
 import numpy as np
 from config import WORLD_SETTINGS
+from simulation import rng
 
 class SocialLedger:
     def __init__(self):
@@ -15,6 +16,7 @@ class SocialLedger:
         self.decay_rate = WORLD_SETTINGS["fame_decay"]
         self.transparency = WORLD_SETTINGS["transparency"]
         self.initial_fame = WORLD_SETTINGS["initial_fame"]
+        self.history_length = WORLD_SETTINGS["ledger_history"]
 
     def register_agent(self, agent_id):
         """Initializes a new agent in the social records."""
@@ -22,7 +24,7 @@ class SocialLedger:
             self.registry[agent_id] = {
                 "C": 0,
                 "D": 0,
-                "history": [] # Recent moves for decay calculation
+                "history": deque(maxlen=self.history_length) # Recent moves for decay calculation
             }
 
     def record_action(self, agent_id, action):
@@ -33,6 +35,11 @@ class SocialLedger:
         self.registry[agent_id][action] += 1
         self.registry[agent_id]["history"].append(action)
 
+    def forget(self, agent_ids):
+        """Drops the records of agents that have died."""
+        for agent_id in agent_ids:
+            self.registry.pop(agent_id, None)
+
     def get_fame(self, observer, target):
         """
         Calculates the 'Relational Fame' of a target as perceived by an observer.
@@ -85,8 +92,7 @@ class SocialLedger:
         noise_range = max_bias * (1.0 - kin_prox)
         
         if noise_range > 0:
-            import random
-            noise = random.uniform(-noise_range, noise_range)
+            noise = rng.stream("gossip").uniform(-noise_range, noise_range)
             perceived_fame += noise
         
         # Clamp to [0, 1]
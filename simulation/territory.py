@@ -0,0 +1,259 @@
+"""
+simulation/territory.py
+Optional territory analytics. A territory is a connected group of occupied
+cells (Moore neighbourhood) whose adjacent occupants are culturally (or
+genetically) within `threshold` of each other. Labeling works on the
+occupied cells only, as sorted cell keys with vectorised union-find, so it
+costs the same on dense and sparse worlds of any size.
+
+Labels persist between ticks, so territories can be followed as they move.
+After the first tick only the territories touched by a change (a vacated
+cell or a similarity link that broke) are relabeled; new links merge
+territories into the oldest label. If the change is too large the whole
+map is relabeled.
+"""
+import numpy as np
+from config import TERRITORY_SETTINGS
+
+# Each undirected Moore link once
+_FORWARD = ((1, 0), (0, 1), (1, 1), (1, -1))
+# Cell sides for border length
+_SIDES = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+
+def components(n, u, v):
+    """Root (smallest member) of every node's component, from the links u[k] - v[k]."""
+    parent = np.arange(n)
+    while len(u):
+        ru, rv = parent[u], parent[v]
+        linked = ru != rv
+        u, v, ru, rv = u[linked], v[linked], ru[linked], rv[linked]
+        if not len(u):
+            break
+        # Hook the larger root under the smaller, then jump pointers to the roots
+        np.minimum.at(parent, np.maximum(ru, rv), np.minimum(ru, rv))
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+    return parent
+
+
+class TerritoryMap:
+    def __init__(self, trait=None, threshold=None, min_area=None, full_relabel=None):
+        self.trait = trait or TERRITORY_SETTINGS["trait"]
+        self.threshold = TERRITORY_SETTINGS["threshold"] if threshold is None else threshold
+        self.min_area = min_area or TERRITORY_SETTINGS["min_area"]
+        self.full_relabel = TERRITORY_SETTINGS["full_relabel"] if full_relabel is None else full_relabel
+
+        # Labeling of the last update, sorted by cell key
+        self.keys = np.empty(0, dtype=np.int64)
+        self.labels = np.empty(0, dtype=np.int64)
+        self.links = np.empty(0, dtype=np.int64)     # Link codes: key * 4 + forward offset
+        self.centroids = {}
+        self.next_label = 0
+        self.height = None
+        self.width = None
+        self.torus = False
+
+        # Games recorded since the last update (cell keys of both players)
+        self._games = []
+        self.stats = {}
+        self.relabeled = 0      # Cells relabeled by the last update
+        self.full_updates = 0
+
+    # --- Recording ---
+    def record_game(self, a, b):
+        """Notes a played game; frontier rates use the territories at the start of the tick."""
+        self._games.append((a.position, b.position))
+
+    # --- Cell keys ---
+    def _key(self, x, y):
+        return x * self.height + y
+
+    def _neighbor_keys(self, xs, ys, dx, dy):
+        """Keys of the cells at (x+dx, y+dy), -1 off the grid."""
+        nx, ny = xs + dx, ys + dy
+        if self.torus:
+            return self._key(nx % self.width, ny % self.height)
+        valid = (nx >= 0) & (nx < self.width) & (ny >= 0) & (ny < self.height)
+        return np.where(valid, self._key(nx, ny), -1)
+
+    def _lookup(self, keys, query):
+        """Index of each queried key in the sorted `keys`, -1 where the cell is empty."""
+        idx = np.searchsorted(keys, query)
+        idx = np.minimum(idx, len(keys) - 1)
+        return np.where((query >= 0) & (keys[idx] == query), idx, -1)
+
+    def _traits(self, agents):
+        if self.trait == "genetic":
+            return np.array([a.dna["genetic_signature"] for a in agents], dtype=float)
+        return np.array([a.cultural_signature for a in agents], dtype=float)
+
+    # --- Update ---
+    def update(self, world, agents):
+        """Relabels the map for the current population and returns this tick's stats."""
+        self.width, self.height = world.width, world.height
+        self.torus = world.geometry == "torus"
+        frontier = self._frontier_rate()
+
+        n = len(agents)
+        if n == 0:
+            self.keys = self.labels = self.links = np.empty(0, dtype=np.int64)
+            self.centroids = {}
+            self.stats = self._summary(np.empty(0, dtype=np.int64), np.empty(0), np.empty(0), frontier, 0.0)
+            return self.stats
+        pos = np.array([a.position for a in agents], dtype=np.int64)
+        keys = self._key(pos[:, 0], pos[:, 1])
+        order = np.argsort(keys)
+        keys, xs, ys = keys[order], pos[order, 0], pos[order, 1]
+        traits = self._traits(agents)[order]
+
+        # Similarity links to occupied forward neighbours
+        us, vs, codes = [], [], []
+        for k, (dx, dy) in enumerate(_FORWARD):
+            nbr = self._lookup(keys, self._neighbor_keys(xs, ys, dx, dy))
+            cell = np.flatnonzero(nbr >= 0)
+            cell = cell[np.linalg.norm(traits[cell] - traits[nbr[cell]], axis=1) <= self.threshold]
+            us.append(cell)
+            vs.append(nbr[cell])
+            codes.append(keys[cell] * 4 + k)
+        u, v = np.concatenate(us), np.concatenate(vs)
+        links = np.concatenate(codes)
+        links_order = np.argsort(links)
+        links, u, v = links[links_order], u[links_order], v[links_order]
+
+        labels = self._relabel(keys, u, v, links)
+        self.keys, self.labels, self.links = keys, labels, links
+
+        # Territory areas, borders and movement
+        ids, inverse, areas = np.unique(labels, return_inverse=True, return_counts=True)
+        held = areas[inverse] >= self.min_area
+        border = self._border(xs, ys, keys, labels, held)
+        cx = np.bincount(inverse, weights=xs, minlength=len(ids)) / areas
+        cy = np.bincount(inverse, weights=ys, minlength=len(ids)) / areas
+        big = areas >= self.min_area
+        centroids = dict(zip(ids[big].tolist(), zip(cx[big].tolist(), cy[big].tolist())))
+        moved = [np.hypot(x - self.centroids[t][0], y - self.centroids[t][1])
+                 for t, (x, y) in centroids.items() if t in self.centroids]
+        self.centroids = centroids
+
+        self.stats = self._summary(areas[big], held, border, frontier, float(np.mean(moved)) if moved else 0.0)
+        return self.stats
+
+    def _relabel(self, keys, u, v, links):
+        """Labels that carry over the previous update's labels wherever the territory survived."""
+        n = len(keys)
+        carried = np.full(n, -1, dtype=np.int64)
+        if len(self.keys):
+            old = self._lookup(self.keys, keys)
+            carried[old >= 0] = self.labels[old[old >= 0]]
+
+            # Territories hit by a broken link or a vacated cell may have split
+            broken = np.setdiff1d(self.links, links, assume_unique=True)
+            touched = self.labels[np.searchsorted(self.keys, broken // 4)]
+            vacated = self._lookup(keys, self.keys) < 0
+            touched = np.union1d(touched, self.labels[vacated])
+            dirty = np.isin(carried, touched) | (carried < 0)
+        else:
+            dirty = np.ones(n, dtype=bool)
+
+        if dirty.sum() > self.full_relabel * n:
+            dirty[:] = True
+            self.full_updates += 1
+        self.relabeled = int(dirty.sum())
+
+        labels = carried.copy()
+        if dirty.any():
+            # Components among the dirty cells, then hand the old labels back (biggest piece keeps it)
+            cells = np.flatnonzero(dirty)
+            local = np.full(n, -1, dtype=np.int64)
+            local[cells] = np.arange(len(cells))
+            inner = dirty[u] & dirty[v]
+            roots = components(len(cells), local[u[inner]], local[v[inner]])
+            labels[cells] = self._assign(roots, carried[cells])
+
+        # New links join territories: every merged group takes its oldest (smallest) label
+        cross = labels[u] != labels[v]
+        if cross.any():
+            ids, inverse = np.unique(np.concatenate([labels[u[cross]], labels[v[cross]]]), return_inverse=True)
+            m = cross.sum()
+            roots = components(len(ids), inverse[:m], inverse[m:])
+            labels = self._remap(labels, ids, ids[roots])
+        return labels
+
+    @staticmethod
+    def _remap(labels, old, new):
+        """Replaces every label found in the sorted `old` with its `new` counterpart."""
+        idx = np.searchsorted(old, labels).clip(0, len(old) - 1)
+        return np.where(old[idx] == labels, new[idx], labels)
+
+    def _assign(self, roots, carried):
+        """Label per component root: the old label most of it carried, or a fresh one."""
+        out = np.full(len(roots), -1, dtype=np.int64)
+        known = carried >= 0
+        if known.any():
+            pairs, counts = np.unique(np.stack([roots[known], carried[known]], axis=1), axis=0, return_counts=True)
+            pairs = pairs[np.argsort(-counts, kind="stable")]
+            # Each old label goes to its largest piece, each piece takes at most one label
+            pairs = pairs[np.sort(np.unique(pairs[:, 1], return_index=True)[1])]
+            pairs = pairs[np.sort(np.unique(pairs[:, 0], return_index=True)[1])]
+            named = np.full(len(roots), -1, dtype=np.int64)
+            named[pairs[:, 0]] = pairs[:, 1]
+            out = named[roots]
+        fresh_roots = np.unique(roots[out < 0])
+        fresh = np.full(len(roots), -1, dtype=np.int64)
+        fresh[fresh_roots] = self.next_label + np.arange(len(fresh_roots))
+        self.next_label += len(fresh_roots)
+        return np.where(out < 0, fresh[roots], out)
+
+    def _border(self, xs, ys, keys, labels, held):
+        """Cell sides between a territory cell and a cell outside that territory."""
+        border = np.zeros(len(keys), dtype=np.int64)
+        for dx, dy in _SIDES:
+            nbr = self._lookup(keys, self._neighbor_keys(xs, ys, dx, dy))
+            same = (nbr >= 0) & (labels[np.maximum(nbr, 0)] == labels)
+            border += held & ~same
+        return border
+
+    def _frontier_rate(self):
+        """Share of the recorded games between players from different territories."""
+        games, self._games = self._games, []
+        if not games or not len(self.keys):
+            return 0.0
+        cells = np.array(games, dtype=np.int64)                  # (games, 2 players, xy)
+        idx = self._lookup(self.keys, self._key(cells[..., 0], cells[..., 1]))
+        ids, inverse, areas = np.unique(self.labels, return_inverse=True, return_counts=True)
+        held = np.where(idx >= 0, areas[inverse][np.maximum(idx, 0)] >= self.min_area, False)
+        label = np.where(held, self.labels[np.maximum(idx, 0)], -1)
+        inside = held.any(axis=1)
+        if not inside.any():
+            return 0.0
+        return float((label[inside, 0] != label[inside, 1]).mean())
+
+    def _summary(self, areas, held, border, frontier, drift):
+        return {
+            "territories": int(len(areas)),
+            "mean_area": float(areas.mean()) if len(areas) else 0.0,
+            "max_area": int(areas.max()) if len(areas) else 0,
+            "covered": float(held.mean()) if len(held) else 0.0,
+            "border": int(border.sum()),
+            "frontier_rate": frontier,
+            "drift": drift,
+        }
+
+    def territory_of(self, x, y):
+        """Label of the territory holding cell (x, y), or None."""
+        idx = self._lookup(self.keys, np.array([self._key(x, y)]))[0]
+        if idx < 0 or np.count_nonzero(self.labels == self.labels[idx]) < self.min_area:
+            return None
+        return int(self.labels[idx])
+
+    def report(self):
+        s = self.stats
+        if not s:
+            return "Territories: not computed"
+        return (f"Territories: {s['territories']} (mean area {s['mean_area']:.1f}, largest {s['max_area']}, "
+                f"{100 * s['covered']:.0f}% of agents) | border {s['border']} | "
+                f"frontier games {100 * s['frontier_rate']:.0f}% | drift {s['drift']:.2f} cells/update")
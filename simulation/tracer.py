@@ -0,0 +1,136 @@
+"""
+simulation/tracer.py
+Sampled decision tracer. Follows a fixed random subset of agents (chosen
+by id, so an agent is traced for its whole life) or an explicit set of
+ids, and records each of their decisions into preallocated ring buffers:
+the inputs, every layer's contribution to the four logits and the chosen
+action. Untraced agents cost one integer comparison per decision.
+
+`dominance()` turns the records into per-layer influence: how often each
+layer moved the chosen action furthest ahead of the alternatives, how
+often the choice would flip without it, and how large its contributions
+are. That is actual influence, as opposed to the DNA trust weights.
+"""
+import numpy as np
+from config import TRACER_SETTINGS, BRAIN_SETTINGS
+
+LAYERS = ("reptilian", "hebbian", "rl", "memetic", "creative")
+ACTIONS = ("C", "D", "MOVE", "IGNORE")
+_ID_SPACE = 1 << 32
+
+
+class DecisionTracer:
+    def __init__(self, rate=None, agent_ids=None, capacity=None):
+        self.rate = TRACER_SETTINGS["rate"] if rate is None else rate
+        self.agent_ids = set(agent_ids) if agent_ids is not None else None   # Overrides the rate
+        self._threshold = int(self.rate * _ID_SPACE)
+        capacity = capacity or TRACER_SETTINGS["capacity"]
+        n_in, n_out = BRAIN_SETTINGS["input_size"], BRAIN_SETTINGS["output_size"]
+
+        # Ring buffers (one row per traced decision)
+        self.ticks = np.zeros(capacity, dtype=np.int64)
+        self.agents = np.zeros(capacity, dtype=np.uint64)   # Low 64 bits of the agent id
+        self.inputs = np.zeros((capacity, n_in), dtype=np.float32)
+        self.contributions = np.zeros((capacity, len(LAYERS), n_out), dtype=np.float32)
+        self.actions = np.zeros(capacity, dtype=np.int8)
+        self.recorded = 0       # Decisions ever recorded (older rows are overwritten past capacity)
+        self.tick = 0           # Set by the engine at the start of every tick
+
+    @property
+    def capacity(self):
+        return len(self.ticks)
+
+    # --- Sampling ---
+    def follows(self, agent):
+        """True if this agent's decisions are traced."""
+        if self.agent_ids is not None:
+            return agent.id in self.agent_ids
+        return (agent.id.int & (_ID_SPACE - 1)) < self._threshold
+
+    def sample_mask(self, agents):
+        return np.fromiter((self.follows(a) for a in agents), dtype=bool, count=len(agents))
+
+    # --- Recording ---
+    def record(self, agent, inputs, contributions, action_index):
+        """One decision: contributions is a (layers, actions) array-like in LAYERS order."""
+        row = self.recorded % self.capacity
+        self.ticks[row] = self.tick
+        self.agents[row] = agent.id.int & 0xFFFFFFFFFFFFFFFF
+        self.inputs[row] = inputs
+        self.contributions[row] = contributions
+        self.actions[row] = action_index
+        self.recorded += 1
+
+    def record_batch(self, agents, inputs, contributions, actions):
+        """Many decisions at once (batched kernels): contributions is (n, layers, actions)."""
+        n = len(agents)
+        if n == 0:
+            return
+        rows = (self.recorded + np.arange(n)) % self.capacity
+        self.ticks[rows] = self.tick
+        self.agents[rows] = [a.id.int & 0xFFFFFFFFFFFFFFFF for a in agents]
+        self.inputs[rows] = inputs
+        self.contributions[rows] = contributions
+        self.actions[rows] = actions
+        self.recorded += n
+
+    # --- Analysis ---
+    def _valid(self):
+        """Row indices of the stored records, oldest first."""
+        if self.recorded <= self.capacity:
+            return np.arange(self.recorded)
+        return (self.recorded + np.arange(self.capacity)) % self.capacity
+
+    def records(self):
+        """Stored records as arrays, oldest first."""
+        rows = self._valid()
+        return {
+            "tick": self.ticks[rows], "agent": self.agents[rows], "inputs": self.inputs[rows],
+            "contributions": self.contributions[rows], "action": self.actions[rows],
+        }
+
+    def dominance(self, since_tick=None):
+        """
+        Per-layer influence over the stored decisions (optionally only those
+        from `since_tick` on):
+          dominant: share of decisions where the layer added the most to the
+                    chosen action's margin over the mean of the other actions
+          pivotal:  share of decisions that would change without the layer
+          magnitude: mean absolute contribution to the logits
+        """
+        rec = self.records()
+        keep = slice(None) if since_tick is None else rec["tick"] >= since_tick
+        contrib = rec["contributions"][keep].astype(np.float64)
+        actions = rec["action"][keep].astype(np.int64)
+        n = len(actions)
+        if n == 0:
+            return {"decisions": 0}
+
+        n_out = contrib.shape[2]
+        chosen = contrib[np.arange(n), :, actions]                       # (n, layers)
+        others = (contrib.sum(axis=2) - chosen) / (n_out - 1)
+        margin = chosen - others
+        dominant = np.bincount(margin.argmax(axis=1), minlength=len(LAYERS)) / n
+
+        logits = contrib.sum(axis=1)                                     # (n, actions)
+        pivotal = [(np.argmax(logits - contrib[:, k, :], axis=1) != actions).mean() for k in range(len(LAYERS))]
+
+        return {
+            "decisions": n,
+            "dominant": dict(zip(LAYERS, dominant.tolist())),
+            "pivotal": dict(zip(LAYERS, map(float, pivotal))),
+            "magnitude": dict(zip(LAYERS, np.abs(contrib).mean(axis=(0, 2)).tolist())),
+            "actions": dict(zip(ACTIONS, (np.bincount(actions, minlength=len(ACTIONS)) / n).tolist())),
+        }
+
+    def report(self):
+        stats = self.dominance()
+        if not stats["decisions"]:
+            return "Decision tracer: no decisions recorded"
+        rows = ", ".join(f"{layer} {100 * stats['dominant'][layer]:.0f}%/{100 * stats['pivotal'][layer]:.0f}%"
+                         for layer in LAYERS)
+        return f"Layer influence over {stats['decisions']} traced decisions (dominant/pivotal): {rows}"
+
+    def export(self, path):
+        """Writes the stored records to a .npz file."""
+        np.savez_compressed(path, layers=np.array(LAYERS), **self.records())
@@ -2,17 +2,154 @@
 simulation/world.py
 Manages the spatial grid, agent placement, and neighborhood logic.
 """
+from array import array
 import numpy as np
 from config import WORLD_SETTINGS
+from simulation import rng
+
+# Moore neighborhood offsets (8 surrounding cells); offset 7 - k is the reverse of offset k
+MOORE_OFFSETS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if not (dx == 0 and dy == 0)]
+
+# Free-neighbor mask (bit k = cell at MOORE_OFFSETS[k] is empty) -> offsets set, in offset order
+_MASK_OFFSETS = [[k for k in range(8) if mask >> k & 1] for mask in range(256)]
+# The same as arrays for bulk lookups: free-neighbor count, and k-th free offset (-1 past the last)
+_MASK_COUNT = np.array([len(offsets) for offsets in _MASK_OFFSETS], dtype=np.int64)
+_MASK_TABLE = np.array([offsets + [-1] * (8 - len(offsets)) for offsets in _MASK_OFFSETS], dtype=np.int64)
+_OFFSET_ARRAY = np.array(MOORE_OFFSETS, dtype=np.int64)
+
+
+def create_world():
+    """Builds the World backend selected by WORLD_SETTINGS['backend']."""
+    backend = WORLD_SETTINGS.get("backend", "dense")
+    if backend == "dense":
+        return World()
+    if backend == "sparse":
+        return SparseWorld()
+    raise ValueError(f"Unknown world backend: {backend}")
+
 
 class World:
+    """
+    Dense grid with a free-cell index kept up to date by every placement,
+    move and removal: a swap-remove array of the empty cells (random empty
+    cell in O(1)) and a per-cell 8-bit mask of empty neighbors (random empty
+    neighbor in O(1); no neighbors at all when it equals the cell's on-map
+    mask). Cells are indexed flat as x * height + y.
+    """
     def __init__(self):
         self.width, self.height = WORLD_SETTINGS["grid_size"]
         self.geometry = WORLD_SETTINGS["geometry"]
         
         # The grid stores Agent objects. None represents an empty cell.
         self.grid = np.empty((self.width, self.height), dtype=object)
-        
+
+        # Free-cell index (stdlib arrays: compact, and fast for the scalar updates below)
+        cells = self.width * self.height
+        self._free = array("q", range(cells))      # Empty cells; the first n_free entries are live
+        self._free_slot = array("q", range(cells))  # Cell -> its slot in _free (-1 when occupied)
+        self.n_free = cells
+
+        mask = np.zeros((self.width, self.height), dtype=np.uint8)
+        for k, (dx, dy) in enumerate(MOORE_OFFSETS):
+            if self.geometry == "torus":
+                mask |= np.uint8(1 << k)
+            else:
+                xs = slice(max(0, -dx), self.width - max(0, dx))
+                ys = slice(max(0, -dy), self.height - max(0, dy))
+                mask[xs, ys] |= np.uint8(1 << k)
+        self._free_mask = bytearray(mask.tobytes())
+        self._open_mask = mask.ravel()              # Neighbors on the map: the mask of an empty world
+
+    def _wrap(self, nx, ny):
+        """Applies geometry logic to a cell. Returns None if it falls off the map."""
+        if self.geometry == "torus":
+            # Wrap around
+            return nx % self.width, ny % self.height
+        # "square" or "l-shape" (bounds checking)
+        if not (0 <= nx < self.width and 0 <= ny < self.height):
+            return None
+        return nx, ny
+
+    # --- Free-Cell Index ---
+    def _occupy(self, x, y):
+        cell = x * self.height + y
+        slot = self._free_slot[cell]
+        self.n_free -= 1
+        last = self._free[self.n_free]
+        self._free[slot] = last
+        self._free_slot[last] = slot
+        self._free_slot[cell] = -1
+        self._flag_neighbors(x, y, False)
+
+    def _vacate(self, x, y):
+        cell = x * self.height + y
+        self._free[self.n_free] = cell
+        self._free_slot[cell] = self.n_free
+        self.n_free += 1
+        self._flag_neighbors(x, y, True)
+
+    def _flag_neighbors(self, x, y, free):
+        """(x, y) sits at offset 7 - k of its neighbor at offset k."""
+        for k, (dx, dy) in enumerate(MOORE_OFFSETS):
+            cell = self._wrap(x + dx, y + dy)
+            if cell is not None:
+                flat = cell[0] * self.height + cell[1]
+                if free:
+                    self._free_mask[flat] |= 1 << (7 - k)
+                else:
+                    self._free_mask[flat] &= ~(1 << (7 - k)) & 0xFF
+
+    def free_neighbors(self, x, y):
+        """Number of empty cells around (x, y)."""
+        return len(_MASK_OFFSETS[self._free_mask[x * self.height + y]])
+
+    def has_neighbors(self, x, y):
+        cell = x * self.height + y
+        return self._free_mask[cell] != self._open_mask[cell]
+
+    def isolated(self, positions):
+        """Boolean per (x, y) position: True where no neighboring cell is occupied."""
+        if not positions:
+            return np.zeros(0, dtype=bool)
+        pos = np.array(positions, dtype=np.int64)
+        cells = pos[:, 0] * self.height + pos[:, 1]
+        return np.frombuffer(self._free_mask, dtype=np.uint8)[cells] == self._open_mask[cells]
+
+    def random_empty_cell(self, stream, exclude=()):
+        """
+        A uniformly random empty cell, skipping `exclude` (empty cells already
+        claimed, e.g. reserved births). None only when no such cell exists.
+        """
+        if self.n_free <= len(exclude):
+            return None
+        while True:
+            cell = divmod(self._free[int(stream.random() * self.n_free)], self.height)
+            if cell not in exclude:
+                return cell
+
+    def sample_empty_cells(self, n, stream, columns=None):
+        """Up to n distinct empty cells, uniformly at random (within the columns [x0, x1) if given)."""
+        free = np.frombuffer(self._free, dtype=np.int64)[:self.n_free]
+        if columns is not None:
+            free = free[(free >= columns[0] * self.height) & (free < columns[1] * self.height)]
+        n = min(n, len(free))
+        flat = free[stream.permutation(len(free))[:n]]
+        xs, ys = np.divmod(flat, self.height)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    # --- Cells ---
+    def get_agent(self, x, y):
+        """Returns the agent at (x, y) or None."""
+        return self.grid[x, y]
+
+    def is_empty(self, x, y):
+        return self.grid[x, y] is None
+
+    def iter_agents(self):
+        """Yields (x, y, agent) for every occupied cell."""
+        for x, y in zip(*np.nonzero(self.grid != None)):  # noqa: E711 (element-wise)
+            yield int(x), int(y), self.grid[x, y]
+
     def get_neighbors(self, x, y):
         """
         Returns a list of agents in the Moore neighborhood (8 surrounding cells).
@@ -42,26 +179,92 @@ class World:
                     
         return neighbors
 
+    def empty_adjacent(self, x, y):
+        """Lists the empty cells neighboring (x, y), read off the free-neighbor mask."""
+        offsets = _MASK_OFFSETS[self._free_mask[x * self.height + y]]
+        return [self._wrap(x + MOORE_OFFSETS[k][0], y + MOORE_OFFSETS[k][1]) for k in offsets]
+
     def find_empty_adjacent(self, x, y):
         """Finds a random empty cell neighboring (x, y). Returns None if full."""
-        import random
-        candidates = []
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx == 0 and dy == 0: continue
-                
-                nx, ny = x + dx, y + dy
-                
-                # Wrap or Bound check
+        offsets = _MASK_OFFSETS[self._free_mask[x * self.height + y]]
+        if not offsets:
+            return None
+        dx, dy = MOORE_OFFSETS[rng.stream("movement").choice(offsets)]
+        return self._wrap(x + dx, y + dy)
+
+    def claim_adjacent(self, positions, draws, priority):
+        """
+        Bulk find_empty_adjacent for many movers at once. Mover k proposes the
+        empty neighbor picked by draws[k] in [0, 1); a cell claimed by several
+        movers goes to the one with the lowest priority[k]. Returns (indices of
+        the movers that got a cell, their target cells as an (n, 2) array).
+        """
+        pos = np.array(positions, dtype=np.int64).reshape(-1, 2)
+        masks = np.frombuffer(self._free_mask, dtype=np.uint8)[pos[:, 0] * self.height + pos[:, 1]]
+        counts = _MASK_COUNT[masks]
+        room = np.flatnonzero(counts > 0)
+        picks = _MASK_TABLE[masks[room], (draws[room] * counts[room]).astype(np.int64)]
+        targets = pos[room] + _OFFSET_ARRAY[picks]
+        if self.geometry == "torus":
+            targets %= (self.width, self.height)
+        return self._settle_claims(room, targets, priority[room])
+
+    def _settle_claims(self, movers, targets, priority):
+        """One winner per claimed cell: sort claims by (cell, priority) and keep the first of each cell."""
+        if not len(movers):
+            return movers, targets
+        cells = targets[:, 0] * self.height + targets[:, 1]
+        order = np.lexsort((priority, cells))
+        cells = cells[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = cells[1:] != cells[:-1]
+        won = order[first]
+        return movers[won], targets[won]
+
+    def move_agents(self, agents, targets):
+        """
+        Moves many agents at once to distinct empty cells (as settled by
+        claim_adjacent). The grid, free-cell list and neighbor masks are
+        updated in array passes rather than one cell at a time.
+        """
+        n = len(agents)
+        if n == 0:
+            return
+        targets = np.asarray(targets, dtype=np.int64).reshape(-1, 2)
+        sources = np.array([a.position for a in agents], dtype=np.int64)
+        movers = np.empty(n, dtype=object)
+        movers[:] = agents
+        self.grid[sources[:, 0], sources[:, 1]] = None
+        self.grid[targets[:, 0], targets[:, 1]] = movers
+        for agent, cell in zip(agents, targets.tolist()):
+            agent.position = tuple(cell)
+
+        vacated = sources[:, 0] * self.height + sources[:, 1]
+        occupied = targets[:, 0] * self.height + targets[:, 1]
+        free = np.frombuffer(self._free, dtype=np.int64)
+        slot = np.frombuffer(self._free_slot, dtype=np.int64)
+
+        # Free list: every vacated cell takes the slot of a newly occupied one
+        slots = slot[occupied]
+        free[slots] = vacated
+        slot[vacated] = slots
+        slot[occupied] = -1
+
+        # Neighbor masks: a cell is at offset 7 - k of its neighbor at offset k
+        mask = np.frombuffer(self._free_mask, dtype=np.uint8)
+        for cells, xy, is_free in ((vacated, sources, True), (occupied, targets, False)):
+            for k, (dx, dy) in enumerate(MOORE_OFFSETS):
+                nx, ny = xy[:, 0] + dx, xy[:, 1] + dy
                 if self.geometry == "torus":
-                    nx %= self.width; ny %= self.height
-                elif not (0 <= nx < self.width and 0 <= ny < self.height):
-                    continue
-                
-                if self.grid[nx, ny] is None:
-                    candidates.append((nx, ny))
-        
-        return random.choice(candidates) if candidates else None
+                    nx, ny = nx % self.width, ny % self.height
+                else:
+                    valid = (nx >= 0) & (nx < self.width) & (ny >= 0) & (ny < self.height)
+                    nx, ny = nx[valid], ny[valid]
+                flat = nx * self.height + ny
+                if is_free:
+                    mask[flat] |= np.uint8(1 << (7 - k))
+                else:
+                    mask[flat] &= np.uint8(~(1 << (7 - k)) & 0xFF)
 
     def move_agent(self, agent, new_pos):
         """Updates the grid state when an agent moves."""
@@ -70,7 +273,9 @@ class World:
         
         if self.grid[new_x, new_y] is None:
             self.grid[old_x, old_y] = None
+            self._vacate(old_x, old_y)
             self.grid[new_x, new_y] = agent
+            self._occupy(new_x, new_y)
             agent.position = (new_x, new_y)
             return True
         return False
@@ -79,5 +284,194 @@ class World:
         """Initial placement of an agent."""
         if self.grid[x, y] is None:
             self.grid[x, y] = agent
+            self._occupy(x, y)
             return True
-        return False
\ No newline at end of file
+        return False
+
+    def remove_agent(self, agent):
+        """Clears the agent's cell (death or displacement)."""
+        x, y = agent.position
+        if self.grid[x, y] is agent:
+            self.grid[x, y] = None
+            self._vacate(x, y)
+
+
+class _SparseGridView:
+    """
+    Dict-backed stand-in for the dense object array, so `world.grid[x, y]`
+    reads and writes keep working against a SparseWorld.
+    """
+    def __init__(self, world):
+        self.world = world
+        self.shape = (world.width, world.height)
+
+    def __getitem__(self, cell):
+        return self.world.get_agent(*cell)
+
+    def __setitem__(self, cell, agent):
+        x, y = cell
+        if agent is None:
+            self.world._clear(x, y)
+        else:
+            self.world._set(x, y, agent)
+
+
+class SparseWorld(World):
+    """
+    Chunked spatial hash: only occupied cells are stored, bucketed into
+    square chunks of `chunk_size` cells. Memory scales with the number of
+    agents, not with width x height, which makes huge sparse maps viable.
+    Empty chunks are dropped so dispersal does not leave a trail behind.
+    There is no free-cell index (it would cost memory per cell): empty cells
+    are found by sampling, which is cheap while the map is mostly empty.
+    Occupied-neighbor counts are kept only for cells next to an agent.
+    """
+    def __init__(self):
+        self.width, self.height = WORLD_SETTINGS["grid_size"]
+        self.geometry = WORLD_SETTINGS["geometry"]
+        self.chunk_size = WORLD_SETTINGS.get("chunk_size", 64)
+
+        # { (chunk_x, chunk_y): { (x, y): agent } }
+        self.chunks = {}
+        self.population = 0
+        self._crowd = {}    # (x, y) -> occupied neighbors, for cells with at least one
+        self.grid = _SparseGridView(self)
+
+    def _chunk_key(self, x, y):
+        return (x // self.chunk_size, y // self.chunk_size)
+
+    def _set(self, x, y, agent):
+        chunk = self.chunks.setdefault(self._chunk_key(x, y), {})
+        if (x, y) not in chunk:
+            self.population += 1
+            self._count_neighbors(x, y, 1)
+        chunk[(x, y)] = agent
+
+    def _clear(self, x, y):
+        key = self._chunk_key(x, y)
+        chunk = self.chunks.get(key)
+        if chunk is not None and chunk.pop((x, y), None) is not None:
+            self.population -= 1
+            self._count_neighbors(x, y, -1)
+            if not chunk:
+                del self.chunks[key]
+
+    def _count_neighbors(self, x, y, delta):
+        crowd = self._crowd
+        for dx, dy in MOORE_OFFSETS:
+            cell = self._wrap(x + dx, y + dy)
+            if cell is not None:
+                count = crowd.get(cell, 0) + delta
+                if count:
+                    crowd[cell] = count
+                else:
+                    del crowd[cell]
+
+    def get_agent(self, x, y):
+        chunk = self.chunks.get(self._chunk_key(x, y))
+        if chunk is None:
+            return None
+        return chunk.get((x, y))
+
+    def is_empty(self, x, y):
+        return self.get_agent(x, y) is None
+
+    def iter_agents(self):
+        for chunk in list(self.chunks.values()):
+            for (x, y), agent in list(chunk.items()):
+                yield x, y, agent
+
+    def get_neighbors(self, x, y):
+        neighbors = []
+        for dx, dy in MOORE_OFFSETS:
+            cell = self._wrap(x + dx, y + dy)
+            if cell is None:
+                continue
+            agent = self.get_agent(*cell)
+            if agent is not None:
+                neighbors.append(agent)
+        return neighbors
+
+    def empty_adjacent(self, x, y):
+        candidates = []
+        for dx, dy in MOORE_OFFSETS:
+            cell = self._wrap(x + dx, y + dy)
+            if cell is not None and self.get_agent(*cell) is None:
+                candidates.append(cell)
+        return candidates
+
+    def find_empty_adjacent(self, x, y):
+        candidates = self.empty_adjacent(x, y)
+        return rng.stream("movement").choice(candidates) if candidates else None
+
+    def claim_adjacent(self, positions, draws, priority):
+        movers, targets = [], []
+        for k, (x, y) in enumerate(positions):
+            candidates = self.empty_adjacent(x, y)
+            if candidates:
+                movers.append(k)
+                targets.append(candidates[int(draws[k] * len(candidates))])
+        movers = np.array(movers, dtype=np.int64)
+        targets = np.array(targets, dtype=np.int64).reshape(-1, 2)
+        return self._settle_claims(movers, targets, priority[movers])
+
+    # --- Free Cells (by sampling) ---
+    @property
+    def n_free(self):
+        return self.width * self.height - self.population
+
+    def free_neighbors(self, x, y):
+        return len(self.empty_adjacent(x, y))
+
+    def has_neighbors(self, x, y):
+        return (x, y) in self._crowd
+
+    def isolated(self, positions):
+        crowd = self._crowd
+        return np.fromiter((tuple(p) not in crowd for p in positions), dtype=bool, count=len(positions))
+
+    def random_empty_cell(self, stream, exclude=()):
+        if self.n_free <= len(exclude):
+            return None
+        while True:
+            cell = (stream.randint(0, self.width - 1), stream.randint(0, self.height - 1))
+            if cell not in exclude and self.get_agent(*cell) is None:
+                return cell
+
+    def sample_empty_cells(self, n, stream, columns=None):
+        """Oversamples flat indices instead of permuting every cell of a huge map."""
+        x0, x1 = columns if columns is not None else (0, self.width)
+        taken = sum(1 for x, _, _ in self.iter_agents() if x0 <= x < x1) if columns is not None else self.population
+        n = min(n, (x1 - x0) * self.height - taken)
+        flat = np.empty(0, dtype=np.int64)
+        while len(flat) < n:
+            draw = stream.integers(x0 * self.height, x1 * self.height, 2 * (n - len(flat)))
+            draw = np.array([f for f in draw.tolist() if self.is_empty(*divmod(f, self.height))], dtype=np.int64)
+            flat = np.unique(np.concatenate([flat, draw]))
+        flat = flat[stream.permutation(len(flat))[:n]]
+        xs, ys = np.divmod(flat, self.height)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def move_agent(self, agent, new_pos):
+        new_x, new_y = new_pos
+        if self.get_agent(new_x, new_y) is None:
+            self._clear(*agent.position)
+            self._set(new_x, new_y, agent)
+            agent.position = (new_x, new_y)
+            return True
+        return False
+
+    def move_agents(self, agents, targets):
+        for agent, cell in zip(agents, np.asarray(targets).tolist()):
+            self.move_agent(agent, tuple(cell))
+
+    def place_agent(self, agent, x, y):
+        if self.get_agent(x, y) is None:
+            self._set(x, y, agent)
+            return True
+        return False
+
+    def remove_agent(self, agent):
+        x, y = agent.position
+        if self.get_agent(x, y) is agent:
+            self._clear(x, y)
\ No newline at end of file
@@ -0,0 +1,67 @@
+import random
+from simulation.world import World, SparseWorld
+from simulation.engine import SimulationEngine
+from config import WORLD_SETTINGS, POPULATION_SETTINGS
+
+class _Dummy:
+    def __init__(self, position):
+        self.position = position
+
+def test_isolated_tracks_grid():
+    print("Checking the neighbor index against get_neighbors...")
+    saved = dict(WORLD_SETTINGS)
+    try:
+        for geometry in ("square", "torus"):
+            WORLD_SETTINGS.update({"geometry": geometry, "grid_size": (9, 6)})
+            for world in (World(), SparseWorld()):
+                random.seed(2)
+                agents = []
+                for _ in range(1000):
+                    op = random.random()
+                    if op < 0.3:
+                        x, y = random.randrange(9), random.randrange(6)
+                        a = _Dummy((x, y))
+                        if world.place_agent(a, x, y):
+                            agents.append(a)
+                    elif op < 0.7 and agents:
+                        a = random.choice(agents)
+                        target = world.find_empty_adjacent(*a.position)
+                        if target:
+                            world.move_agent(a, target)
+                    elif agents:
+                        world.remove_agent(agents.pop(random.randrange(len(agents))))
+                    cells = [(x, y) for x in range(9) for y in range(6)]
+                    expected = [not world.get_neighbors(x, y) for x, y in cells]
+                    assert world.isolated(cells).tolist() == expected
+                    assert [not world.has_neighbors(x, y) for x, y in cells] == expected
+                print(f"{geometry}/{type(world).__name__}: consistent with {len(agents)} agents")
+    finally:
+        WORLD_SETTINGS.clear()
+        WORLD_SETTINGS.update(saved)
+
+def test_isolated_agents_only_wander():
+    saved_world, saved_pop = dict(WORLD_SETTINGS), dict(POPULATION_SETTINGS)
+    WORLD_SETTINGS.update({"grid_size": (200, 200), "backend": "sparse"})
+    POPULATION_SETTINGS["initial_agents"] = 400
+    try:
+        engine = SimulationEngine(seed=6)
+        active, lonely = engine._split_isolated()
+        assert len(active) + len(lonely) == len(engine.agents) and len(lonely) > len(active)
+        before = {a.id: a.position for a in lonely}
+        engine.total_fog, engine.interactions_this_tick = 0.0, 0
+        engine._process_turn()
+        moved = sum(a.position != before[a.id] for a in lonely)
+        # About 10% of the isolated agents wander, and none of them played
+        assert 0 < moved < 0.25 * len(lonely)
+        still_alone = [a for a in lonely if not engine.world.has_neighbors(*a.position)]
+        assert still_alone and not any(a.private_memory for a in still_alone)
+        print(f"{len(active)} active, {len(lonely)} isolated, {moved} wandered")
+    finally:
+        WORLD_SETTINGS.clear()
+        WORLD_SETTINGS.update(saved_world)
+        POPULATION_SETTINGS.clear()
+        POPULATION_SETTINGS.update(saved_pop)
+
+if __name__ == "__main__":
+    test_isolated_tracks_grid()
+    test_isolated_agents_only_wander()
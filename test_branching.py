@@ -0,0 +1,82 @@
+import numpy as np
+from simulation.engine import SimulationEngine
+from simulation.branching import Branch, fork_branches, cull
+from config import WORLD_SETTINGS, POPULATION_SETTINGS, GAME_PHYSICS
+
+def _engine():
+    WORLD_SETTINGS["grid_size"] = (20, 20)
+    POPULATION_SETTINGS["initial_agents"] = 150
+    engine = SimulationEngine(seed=11)
+    for _ in range(10):
+        engine.run_tick()
+    return engine
+
+def test_branches_share_the_burn_in():
+    print("Forking a running engine into what-if branches...")
+    saved = dict(WORLD_SETTINGS), dict(POPULATION_SETTINGS)
+    try:
+        engine = _engine()
+        tick, pop = engine.tick, len(engine.agents)
+        harsh = {"GAME_PHYSICS": {"payoff_matrix": {**GAME_PHYSICS["payoff_matrix"], ("C", "D"): -50}}}
+        results = fork_branches(engine, [
+            Branch("control"),
+            Branch("control_again"),
+            Branch("harsh", overrides=harsh),
+            Branch("no_tribe", intervene=lambda e: cull(e, lambda a: a.cultural_signature[0] > 0.5)),
+            Branch("reseeded", seed=5),
+        ], ticks=15, processes=3)
+
+        by_name = {r["name"]: r for r in results}
+        assert [r["name"] for r in results] == ["control", "control_again", "harsh", "no_tribe", "reseeded"]
+        # Same state, same random streams: identical futures
+        assert by_name["control"]["stats"] == by_name["control_again"]["stats"]
+        assert by_name["control"]["stats"][0]["tick"] == tick + 1
+        assert by_name["harsh"]["stats"] != by_name["control"]["stats"]
+        assert by_name["reseeded"]["stats"] != by_name["control"]["stats"]
+        assert by_name["no_tribe"]["stats"][0]["pop"] < by_name["control"]["stats"][0]["pop"]
+        for r in results:
+            print(f"{r['name']}: pop {r['summary']['pop']}")
+
+        # The parent run and its config are untouched
+        assert engine.tick == tick and len(engine.agents) == pop
+        assert GAME_PHYSICS["payoff_matrix"][("C", "D")] == -5
+    finally:
+        for group, values in zip((WORLD_SETTINGS, POPULATION_SETTINGS), saved):
+            group.clear()
+            group.update(values)
+
+def test_failing_branch_reports_its_error():
+    saved = dict(WORLD_SETTINGS), dict(POPULATION_SETTINGS)
+    try:
+        engine = _engine()
+        def broken(e):
+            raise ValueError("bad intervention")
+        try:
+            fork_branches(engine, [Branch("broken", intervene=broken)], ticks=2)
+        except RuntimeError as exc:
+            assert "bad intervention" in str(exc)
+        else:
+            raise AssertionError("expected the branch failure to propagate")
+    finally:
+        for group, values in zip((WORLD_SETTINGS, POPULATION_SETTINGS), saved):
+            group.clear()
+            group.update(values)
+
+def test_cull():
+    saved = dict(WORLD_SETTINGS), dict(POPULATION_SETTINGS)
+    try:
+        engine = _engine()
+        n = len(engine.agents)
+        gone = cull(engine, lambda a: a.cultural_signature[0] > 0.5)
+        assert len(engine.agents) == n - gone
+        assert all(engine.world.get_agent(*a.position) is a for a in engine.agents)
+        assert sum(1 for _ in engine.world.iter_agents()) == len(engine.agents)
+    finally:
+        for group, values in zip((WORLD_SETTINGS, POPULATION_SETTINGS), saved):
+            group.clear()
+            group.update(values)
+
+if __name__ == "__main__":
+    test_branches_share_the_burn_in()
+    test_failing_branch_reports_its_error()
+    test_cull()
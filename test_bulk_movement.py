@@ -0,0 +1,97 @@
+import numpy as np
+from simulation.world import World, SparseWorld
+from simulation.engine import SimulationEngine
+from simulation import rng
+from config import WORLD_SETTINGS, POPULATION_SETTINGS, GAME_PHYSICS
+
+class _Dummy:
+    def __init__(self, position):
+        self.position = position
+
+def _adjacent(world, a, b):
+    dx, dy = abs(a[0] - b[0]), abs(a[1] - b[1])
+    if world.geometry == "torus":
+        dx, dy = min(dx, world.width - dx), min(dy, world.height - dy)
+    return max(dx, dy) == 1
+
+def test_bulk_moves_keep_the_index_consistent():
+    print("Moving crowds in bulk...")
+    saved = dict(WORLD_SETTINGS)
+    try:
+        for geometry in ("square", "torus"):
+            WORLD_SETTINGS.update({"geometry": geometry, "grid_size": (12, 9)})
+            for world in (World(), SparseWorld()):
+                rng.seed(3)
+                stream = rng.stream("movement")
+                agents = [_Dummy(c) for c in world.sample_empty_cells(70, stream)]
+                for a in agents:
+                    world.place_agent(a, *a.position)
+                for _ in range(20):
+                    movers = [agents[k] for k in stream.permutation(len(agents))[:30].tolist()]
+                    before = {id(a): a.position for a in agents}
+                    won, targets = world.claim_adjacent([a.position for a in movers], stream.rand(30), stream.rand(30))
+                    assert len(set(map(tuple, targets.tolist()))) == len(won)
+                    assert all(world.is_empty(*t) for t in targets.tolist())
+                    world.move_agents([movers[k] for k in won.tolist()], targets)
+                    for k in won.tolist():
+                        assert _adjacent(world, before[id(movers[k])], movers[k].position)
+                    assert sum(a.position != before[id(a)] for a in agents) == len(won)
+
+                    cells = [(x, y) for x in range(12) for y in range(9)]
+                    assert sorted(a.position for a in agents) == sorted(c for c in cells if not world.is_empty(*c))
+                    assert all(world.get_agent(*a.position) is a for a in agents)
+                    assert world.n_free == len(cells) - len(agents)
+                    if isinstance(world, SparseWorld):
+                        continue
+                    assert {divmod(c, 9) for c in world._free[:world.n_free]} == {c for c in cells if world.is_empty(*c)}
+                    for x, y in cells:
+                        expected = [c for c in (world._wrap(x + dx, y + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                                                if (dx, dy) != (0, 0)) if c is not None and world.is_empty(*c)]
+                        assert sorted(world.empty_adjacent(x, y)) == sorted(expected)
+                print(f"{geometry}/{type(world).__name__}: consistent")
+    finally:
+        WORLD_SETTINGS.clear()
+        WORLD_SETTINGS.update(saved)
+
+def test_contested_cell_goes_to_lowest_priority():
+    saved = dict(WORLD_SETTINGS)
+    WORLD_SETTINGS.update({"geometry": "square", "grid_size": (3, 1)})
+    try:
+        for world in (World(), SparseWorld()):
+            left, right = _Dummy((0, 0)), _Dummy((2, 0))
+            world.place_agent(left, 0, 0)
+            world.place_agent(right, 2, 0)
+            draws = np.array([0.5, 0.5])
+            won, targets = world.claim_adjacent([(0, 0), (2, 0)], draws, np.array([0.7, 0.2]))
+            assert won.tolist() == [1] and targets.tolist() == [[1, 0]]
+            won, targets = world.claim_adjacent([(0, 0), (2, 0)], draws, np.array([0.1, 0.2]))
+            assert won.tolist() == [0]
+    finally:
+        WORLD_SETTINGS.clear()
+        WORLD_SETTINGS.update(saved)
+
+def test_only_movers_that_moved_pay_tax():
+    saved_world, saved_pop = dict(WORLD_SETTINGS), dict(POPULATION_SETTINGS)
+    WORLD_SETTINGS["grid_size"] = (10, 10)
+    POPULATION_SETTINGS["initial_agents"] = 95
+    try:
+        engine = SimulationEngine(seed=1)
+        points = {a.id: a.points for a in engine.agents}
+        before = {a.id: a.position for a in engine.agents}
+        movers = engine.agents[:40]
+        engine._move_all(movers + movers[:10])   # Repeated movers still move once
+        moved = [a for a in engine.agents if a.position != before[a.id]]
+        assert 0 < len(moved) <= 5
+        for a in engine.agents:
+            expected = points[a.id] - (GAME_PHYSICS["movement_tax"] if a in moved else 0)
+            assert a.points == expected
+    finally:
+        WORLD_SETTINGS.clear()
+        WORLD_SETTINGS.update(saved_world)
+        POPULATION_SETTINGS.clear()
+        POPULATION_SETTINGS.update(saved_pop)
+
+if __name__ == "__main__":
+    test_bulk_moves_keep_the_index_consistent()
+    test_contested_cell_goes_to_lowest_priority()
+    test_only_movers_that_moved_pay_tax()
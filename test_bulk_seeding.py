@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+import numpy as np
+from config import BRAIN_SETTINGS, POPULATION_SETTINGS, IDENTITY_SETTINGS
+from simulation.engine import SimulationEngine
+from simulation.agent import brain_dtype
+
+def _check_population(engine):
+    dtype = brain_dtype()
+    positions = [a.position for a in engine.agents]
+    assert len(engine.agents) == POPULATION_SETTINGS["initial_agents"]
+    assert len(set(positions)) == len(positions), "Two founders share a cell"
+    assert len({a.id for a in engine.agents}) == len(engine.agents)
+    for agent in engine.agents:
+        assert engine.world.get_agent(*agent.position) is agent
+        dna, h = agent.dna, agent.dna["hidden_size"]
+        assert BRAIN_SETTINGS["min_hidden"] <= h <= BRAIN_SETTINGS["max_hidden"]
+        assert dna["W1"].shape == (BRAIN_SETTINGS["input_size"], h)
+        assert dna["W2"].shape == (h, BRAIN_SETTINGS["output_size"])
+        assert dna["genetic_signature"].shape == (IDENTITY_SETTINGS["genetic_dim"],)
+        for key in ("W1", "W2", "genetic_signature", "starting_culture"):
+            assert dna[key].dtype == dtype, f"{key} is {dna[key].dtype}, not {dtype}"
+        assert np.asarray(agent.cultural_signature).dtype == dtype
+
+def test_bulk_seeded_population():
+    print("Checking the bulk-seeded founders...")
+    _check_population(SimulationEngine(seed=11))
+
+def test_bulk_seeded_population_float32():
+    print("Checking the founders at float32 precision...")
+    saved = BRAIN_SETTINGS["precision"]
+    BRAIN_SETTINGS["precision"] = "float32"
+    try:
+        engine = SimulationEngine(seed=11)
+        _check_population(engine)
+        engine.run_tick()
+    finally:
+        BRAIN_SETTINGS["precision"] = saved
+
+def test_headless_import_skips_matplotlib():
+    print("Importing main without a dashboard...")
+    probe = "import sys, main; sys.exit('matplotlib' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True,
+                            timeout=120, cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert result.returncode == 0, f"Importing main pulled in matplotlib\n{result.stderr}"
+
+if __name__ == "__main__":
+    test_bulk_seeded_population()
+    test_bulk_seeded_population_float32()
+    test_headless_import_skips_matplotlib()
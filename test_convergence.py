@@ -0,0 +1,49 @@
+import numpy as np
+from utils.convergence import SteadyStateDetector
+
+def _feed(detector, pops, coop=0.5):
+    rng = np.random.default_rng(0)
+    for t, pop in enumerate(pops):
+        c = int(100 * coop)
+        status = detector.update({"tick": t, "pop": pop + rng.normal(0, 5), "total_C": c, "total_D": 100 - c})
+        if status != "running":
+            return t
+    return None
+
+def test_detects_plateau_after_growth():
+    print("Checking steady-state detection on a logistic curve...")
+    ticks = np.arange(2000)
+    pops = 1000 / (1 + np.exp(-(ticks - 300) / 40))
+    detector = SteadyStateDetector(criteria={"pop": 0.02, "coop_share": 0.05}, window=100, patience=2, check_every=10)
+    stopped = _feed(detector, pops)
+    print(detector.report())
+    assert detector.status == "steady"
+    assert 400 < detector.converged_tick < 800 and stopped < 1000
+
+def test_no_false_positive_while_trending():
+    detector = SteadyStateDetector(criteria={"pop": 0.02}, window=100, patience=2, check_every=10)
+    assert _feed(detector, np.linspace(100, 2000, 1500)) is None
+    assert detector.status == "running"
+
+def test_windows_stay_aligned_when_nobody_plays():
+    print("Feeding ticks on which nobody plays...")
+    detector = SteadyStateDetector(criteria={"pop": 0.02, "coop_share": 0.05}, window=50, patience=1, check_every=10)
+    for t in range(300):
+        plays = 100 if t % 2 == 0 else 0     # coop_share only exists on every other tick
+        if detector.update({"tick": t, "pop": 500, "total_C": plays // 2, "total_D": plays - plays // 2}) != "running":
+            break
+    print(detector.report())
+    assert detector.status == "steady"
+    assert detector.detected_tick == 99 and detector.converged_tick == 0
+
+def test_extinction():
+    detector = SteadyStateDetector(criteria={"pop": 0.02}, window=10)
+    detector.update({"tick": 1, "pop": 5})
+    assert detector.update({"tick": 2, "pop": 0}) == "extinct"
+    assert "tick 2" in detector.report()
+
+if __name__ == "__main__":
+    test_detects_plateau_after_growth()
+    test_no_false_positive_while_trending()
+    test_windows_stay_aligned_when_nobody_plays()
+    test_extinction()
@@ -0,0 +1,60 @@
+import threading
+from simulation.domain import DomainDecomposedEngine, TileEngine
+from config import WORLD_SETTINGS
+
+def test_domain_decomposition():
+    print("Starting strip-decomposed engine test...")
+    saved = dict(WORLD_SETTINGS)
+    WORLD_SETTINGS["geometry"] = "torus"
+    try:
+        with DomainDecomposedEngine(workers=3, seed=7) as engine:
+            for t in range(20):
+                engine.run_tick()
+            agents = engine.gather_agents()
+            positions = [a.position for a in agents]
+            print(f"Tick {engine.tick}: Pop={engine.population} | C={engine.coops_this_tick} | D={engine.defects_this_tick}")
+
+            assert len(agents) == engine.population
+            assert len(set(positions)) == len(positions), "Two agents share a cell"
+            assert len({a.id for a in agents}) == len(agents), "Agent duplicated across tiles"
+            for a in agents:
+                owner = engine._owner(a.position[0])
+                assert engine.bounds[owner] <= a.position[0] < engine.bounds[owner + 1]
+    finally:
+        WORLD_SETTINGS.clear()
+        WORLD_SETTINGS.update(saved)
+
+def test_tile_seeds_inside_its_strip():
+    print("Seeding one tile...")
+    tile = TileEngine(10, 20, 150, seed=3)
+    positions = [a.position for a in tile.agents]
+    assert len(tile.agents) == 150 and len(set(positions)) == 150
+    assert all(10 <= x < 20 for x, _ in positions)
+
+def test_crashed_worker_raises():
+    print("Killing a tile worker mid-tick...")
+    engine = DomainDecomposedEngine(workers=2, seed=7)
+    errors = []
+
+    def collect():
+        try:
+            engine._collect()
+        except RuntimeError as error:
+            errors.append(error)
+
+    try:
+        engine.procs[1].kill()
+        engine.procs[1].join()
+        engine.conns[0].send(("tick", engine._inbox[0]))
+        waiter = threading.Thread(target=collect, daemon=True)
+        waiter.start()
+        waiter.join(timeout=30)
+        assert not waiter.is_alive(), "Coordinator hangs on a dead worker"
+        print(f"Coordinator noticed: {errors[0]}")
+    finally:
+        engine.close()
+
+if __name__ == "__main__":
+    test_domain_decomposition()
+    test_tile_seeds_inside_its_strip()
+    test_crashed_worker_raises()
@@ -0,0 +1,87 @@
+import random
+from simulation.world import World, SparseWorld
+from simulation.engine import SimulationEngine
+from simulation import rng
+from config import WORLD_SETTINGS, POPULATION_SETTINGS
+
+class _Dummy:
+    def __init__(self, position):
+        self.position = position
+
+def _brute_empty_adjacent(world, x, y):
+    cells = [world._wrap(x + dx, y + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)]
+    return [c for c in cells if c is not None and world.grid[c] is None]
+
+def test_index_tracks_grid():
+    print("Checking the free-cell index against the grid...")
+    saved = dict(WORLD_SETTINGS)
+    try:
+        for geometry in ("square", "torus"):
+            WORLD_SETTINGS.update({"geometry": geometry, "grid_size": (7, 5)})
+            world = World()
+            random.seed(1)
+            agents = []
+            for _ in range(1500):
+                op = random.random()
+                if op < 0.4:
+                    x, y = random.randrange(7), random.randrange(5)
+                    a = _Dummy((x, y))
+                    if world.place_agent(a, x, y):
+                        agents.append(a)
+                elif op < 0.7 and agents:
+                    a = random.choice(agents)
+                    target = world.find_empty_adjacent(*a.position)
+                    if target:
+                        assert world.move_agent(a, target)
+                elif agents:
+                    world.remove_agent(agents.pop(random.randrange(len(agents))))
+
+            empties = {(x, y) for x in range(7) for y in range(5) if world.grid[x, y] is None}
+            assert world.n_free == len(empties)
+            assert {divmod(c, 5) for c in world._free[:world.n_free]} == empties
+            for x in range(7):
+                for y in range(5):
+                    assert world.empty_adjacent(x, y) == _brute_empty_adjacent(world, x, y)
+                    assert world.free_neighbors(x, y) == len(world.empty_adjacent(x, y))
+            print(f"{geometry}: index consistent with {len(agents)} agents")
+    finally:
+        WORLD_SETTINGS.clear()
+        WORLD_SETTINGS.update(saved)
+
+def test_random_empty_cell_never_fails_while_space_remains():
+    rng.seed(4)
+    for world in (World(), SparseWorld()):
+        # Fill all but three cells
+        cells = [(x, y) for x in range(world.width) for y in range(world.height)]
+        for x, y in cells[:-3]:
+            world.place_agent(_Dummy((x, y)), x, y)
+        assert world.n_free == 3
+        stream = rng.stream("movement")
+        assert world.random_empty_cell(stream) in cells[-3:]
+        assert world.random_empty_cell(stream, exclude={cells[-1], cells[-2]}) == cells[-3]
+        assert world.random_empty_cell(stream, exclude=set(cells[-3:])) is None
+        assert sorted(world.sample_empty_cells(10, stream)) == sorted(cells[-3:])
+
+def test_launch_births_on_a_dense_grid():
+    saved_world, saved_pop = dict(WORLD_SETTINGS), dict(POPULATION_SETTINGS)
+    WORLD_SETTINGS["grid_size"] = (20, 20)
+    POPULATION_SETTINGS.update({"initial_agents": 390, "birth_protocol": "launch"})
+    try:
+        engine = SimulationEngine(seed=9)
+        assert engine.world.n_free == 10
+        for a in engine.agents[:5]:
+            a.points = 1000
+        engine._reproduce(engine.agents[:5])
+        # Ten free cells, five parents: every launch finds a spot
+        assert len(engine.agents) == 395
+        assert engine.world.n_free == 5
+    finally:
+        WORLD_SETTINGS.clear()
+        WORLD_SETTINGS.update(saved_world)
+        POPULATION_SETTINGS.clear()
+        POPULATION_SETTINGS.update(saved_pop)
+
+if __name__ == "__main__":
+    test_index_tracks_grid()
+    test_random_empty_cell_never_fails_while_space_remains()
+    test_launch_births_on_a_dense_grid()
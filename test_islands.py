@@ -0,0 +1,67 @@
+import threading
+from simulation.islands import IslandModel
+
+SMALL = {"WORLD_SETTINGS": {"grid_size": (20, 20)}, "POPULATION_SETTINGS": {"initial_agents": 80}}
+
+def run_islands(topology, seed=3):
+    # The last island runs a different reproduction threshold on top of the small world
+    overrides = [SMALL, SMALL, {**SMALL, "POPULATION_SETTINGS": {"initial_agents": 80, "reproduction_threshold": 150}}]
+    with IslandModel(overrides=overrides, seed=seed, topology=topology, migrate_every=10, migration_fraction=0.1) as model:
+        report = model.run(30)
+        islands = model.gather_agents()
+    return model, report, islands
+
+def test_island_model():
+    print("Starting island model test...")
+    model, report, islands = run_islands("ring")
+    print(f"Tick {report['tick']}: Pops={[i['pop'] for i in report['islands']]} | "
+          f"Migrants={report['migrants_sent']} | Divergence={report['divergence']}")
+
+    assert report["tick"] == 30
+    assert model.n_islands == 3
+    assert report["migrants_sent"] > 0
+    assert [len(agents) for agents in islands] == [i["pop"] for i in report["islands"]]
+    for agents in islands:
+        positions = [a.position for a in agents]
+        assert len(set(positions)) == len(positions), "Two agents share a cell"
+    ids = [a.id for agents in islands for a in agents]
+    assert len(set(ids)) == len(ids), "Agent present on two islands"
+    assert all(len(h) == 30 for h in model.history if h)
+    assert len(model.divergence_history) == 4   # Start + one per migration epoch
+
+    # Seeded island runs replay exactly
+    _, again, _ = run_islands("ring")
+    assert again["islands"] == report["islands"]
+
+def test_full_topology_routes_to_every_other_island():
+    model, report, _ = run_islands("full")
+    assert model.destinations(0) == [1, 2]
+    assert report["migrants_sent"] > 0
+
+def test_crashed_island_raises():
+    print("Killing an island worker mid-run...")
+    model = IslandModel(overrides=[SMALL, SMALL], seed=3, migrate_every=10)
+    errors = []
+
+    def epoch():
+        try:
+            model.run_epoch(5)
+        except RuntimeError as error:
+            errors.append(error)
+
+    try:
+        model.procs[1].kill()
+        model.procs[1].join()
+        model.conns[1].send = lambda message: None    # The order is lost, as if the worker died mid-epoch
+        waiter = threading.Thread(target=epoch, daemon=True)
+        waiter.start()
+        waiter.join(timeout=30)
+        assert not waiter.is_alive(), "Coordinator hangs on a dead island"
+        print(f"Coordinator noticed: {errors[0]}")
+    finally:
+        model.close()
+
+if __name__ == "__main__":
+    test_island_model()
+    test_full_topology_routes_to_every_other_island()
+    test_crashed_island_raises()
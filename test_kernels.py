@@ -0,0 +1,67 @@
+import copy
+import random
+import numpy as np
+from simulation.engine import SimulationEngine
+from simulation.kernels import ReferenceKernel, NumpyKernel, compare_backends
+from config import WORLD_SETTINGS
+
+def _paired_agents(engine):
+    for agent in engine.agents:
+        neighbors = engine.world.get_neighbors(*agent.position)
+        if neighbors:
+            yield agent, neighbors[0], neighbors
+
+def test_kernels_match_without_noise():
+    print("Checking numpy kernels against the scalar reference...")
+    saved = WORLD_SETTINGS["identity_gossip_bias"]
+    WORLD_SETTINGS["identity_gossip_bias"] = 0.0
+    try:
+        random.seed(5)
+        engine = SimulationEngine(seed=5)
+        for _ in range(10):
+            engine.run_tick()
+        for agent in engine.agents:
+            agent.dna["creativity"] = 0.0
+
+        triples = list(_paired_agents(engine))[:50]
+        agents = [t[0] for t in triples]
+        opponents = [t[1] for t in triples]
+        neighbor_lists = [t[2] for t in triples]
+        ref_agents = copy.deepcopy(agents)  # Deep copies keep the opponent links intact
+
+        ref, fast = ReferenceKernel(), NumpyKernel()
+        ledger = engine.social_ledger
+        assert np.allclose(ref.perceived_fame(ledger, opponents, agents), fast.perceived_fame(ledger, opponents, agents))
+        assert np.allclose(ref.perceived_fame(ledger, [None] * 50, agents), fast.perceived_fame(ledger, [None] * 50, agents))
+
+        fames = fast.perceived_fame(ledger, opponents, agents)
+        moves = fast.decide(agents, opponents, fames, neighbor_lists)
+        ref_moves = ref.decide(agents, opponents, fames, neighbor_lists)
+        assert moves == ref_moves
+
+        rewards = [random.choice([5, 10, -5, -1]) for _ in agents]
+        cultures = [o.cultural_signature.copy() for o in opponents]
+        seen = [random.choice("CD") for _ in agents]
+        for a, r in zip(ref_agents, agents):
+            a.last_input, a.last_action_index = r.last_input, r.last_action_index
+        ref.learn(ref_agents, rewards)
+        fast.learn(agents, rewards)
+        ref.update_culture(ref_agents, seen, cultures)
+        fast.update_culture(agents, seen, cultures)
+        for a, r in zip(agents, ref_agents):
+            assert np.allclose(a.W_hebb, r.W_hebb) and np.allclose(a.W_rl, r.W_rl)
+            assert np.allclose(a.cultural_signature, r.cultural_signature)
+        print(f"{len(agents)} agents: fame, decisions, learning and culture agree.")
+    finally:
+        WORLD_SETTINGS["identity_gossip_bias"] = saved
+
+def test_backends_statistically_equivalent():
+    print("Comparing reference and numpy trajectories...")
+    passed, report = compare_backends(seeds=(0, 1, 2), ticks=40)
+    for metric, row in report.items():
+        print(f"{metric}: ref={row['baseline']:.3f} numpy={row['candidate']:.3f} (diff {row['diff']:.3f} <= {row['tolerance']:.3f})")
+    assert passed
+
+if __name__ == "__main__":
+    test_kernels_match_without_noise()
+    test_backends_statistically_equivalent()
@@ -0,0 +1,39 @@
+import numpy as np
+from simulation.engine import SimulationEngine
+from config import LINEAGE_SETTINGS
+
+def test_lineage_tracking_and_pruning():
+    print("Starting lineage tracking test...")
+    saved = dict(LINEAGE_SETTINGS)
+    LINEAGE_SETTINGS.update({"enabled": True, "prune_every": 50})
+    try:
+        engine = SimulationEngine()
+        tracker = engine.lineage
+        for t in range(200):
+            engine.run_tick()
+        before = tracker.size
+        tracker.prune()
+        print(f"Stored nodes: {before} -> {tracker.size} (pruned {tracker.pruned} in total), pop={len(engine.agents)}")
+
+        # Every living agent is in the tree, alive, with its ancestors present
+        ids = tracker.ids[:tracker.size]
+        assert np.all(np.diff(ids) > 0)
+        rows = tracker._rows([a.lineage_id for a in engine.agents])
+        assert np.array_equal(ids[rows], [a.lineage_id for a in engine.agents])
+        assert np.all(tracker.death[rows] == -1)
+        parents = tracker.parent[:tracker.size]
+        assert np.all(np.isin(parents[parents >= 0], ids))
+
+        # Pruning keeps the tree proportional to the living population
+        assert tracker.size <= 2 * len(engine.agents) + len(tracker.living_founders())
+        assert sum(tracker.living_founders().values()) == len(engine.agents)
+
+        newick = tracker.to_newick()
+        assert newick.endswith(");") and newick.count("(") == newick.count(")")
+        assert all(f"n{a.lineage_id}:" in newick for a in engine.agents)
+    finally:
+        LINEAGE_SETTINGS.clear()
+        LINEAGE_SETTINGS.update(saved)
+
+if __name__ == "__main__":
+    test_lineage_tracking_and_pruning()
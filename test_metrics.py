@@ -0,0 +1,52 @@
+import numpy as np
+from simulation.engine import SimulationEngine
+from utils.metrics import default_registry
+
+def test_registry_subscriptions_cadence_and_sampling():
+    print("Starting metric registry test...")
+    engine = SimulationEngine(seed=3)
+    for _ in range(5):
+        engine.run_tick()
+
+    registry = default_registry()
+    full = registry.collect(engine)
+    agents = engine.agents
+    assert full["pop"] == len(agents)
+    assert np.isclose(full["avg_pts"], sum(a.points for a in agents) / len(agents))
+    assert np.isclose(full["avg_hebb_norm"], sum(np.linalg.norm(a.W_hebb) for a in agents) / len(agents))
+    assert np.isclose(full["avg_kin_bias"], np.mean([np.sum(np.abs(a.dna["W1"][5, :])) for a in agents]))
+
+    # Only subscribed metrics are computed
+    registry = default_registry()
+    registry.subscribe("console", ["pop", "avg_pts"])
+    stats = registry.collect(engine)
+    assert set(stats) == {"tick", "pop", "avg_pts"}
+    assert registry.metrics["avg_fame"].calls == 0 and "fame" not in registry.input_costs
+
+    # Cadence holds the last value between evaluations
+    registry = default_registry()
+    registry.register("avg_fame", registry.metrics["avg_fame"].fn, ["fame"], every=3)
+    seen = []
+    for _ in range(6):
+        engine.run_tick()
+        seen.append((engine.tick, registry.collect(engine)["avg_fame"]))
+    due = [k for k, (tick, _) in enumerate(seen) if k == 0 or tick % 3 == 0]
+    assert registry.metrics["avg_fame"].calls == len(due)
+    for k in range(1, len(seen)):
+        if k not in due:
+            assert seen[k][1] == seen[k - 1][1]
+
+    # Sampled metrics read a random subset of agents
+    registry = default_registry()
+    registry.min_sample = 10
+    registry.register("avg_pts", registry.metrics["avg_pts"].fn, ["points"], sample=0.05)
+    sampled = registry.collect(engine)
+    pts = np.array([a.points for a in engine.agents])
+    assert pts.min() <= sampled["avg_pts"] <= pts.max()
+    registry.register("sample_size", lambda f: len(f.agents), sample=0.05)
+    expected = max(10, int(np.ceil(0.05 * len(engine.agents))))
+    assert registry.collect(engine)["sample_size"] == expected
+    print(registry.cost_report())
+
+if __name__ == "__main__":
+    test_registry_subscriptions_cadence_and_sampling()
@@ -0,0 +1,62 @@
+import uuid
+import numpy as np
+from simulation.engine import SimulationEngine
+from simulation.network import InteractionNetwork
+from config import NETWORK_SETTINGS
+
+class _Node:
+    def __init__(self, culture):
+        self.id = uuid.uuid4()
+        self.cultural_signature = np.array(culture, dtype=float)
+
+def test_network_queries():
+    print("Starting interaction network query test...")
+    net = InteractionNetwork(decay=1.0, min_weight=0.5, tribe_radius=0.3, buffer_size=4)
+    a, b, c, d = _Node([0, 0, 0]), _Node([0, 0, 0.1]), _Node([0, 0.1, 0]), _Node([1, 1, 1])
+    # Triangle a-b-c plus a pendant d on a (buffer_size=4 forces compactions mid-way)
+    net.record(a, b, "C", "C", 0)
+    net.record(b, c, "C", "D", 0)
+    net.record(c, a, "C", "C", 1)
+    net.record(a, d, "D", "D", 1)
+    net.compact(2)
+
+    assert net.n_nodes == 4 and len(net.keys) == 8
+    assert net.degree_distribution().tolist() == [0, 1, 2, 1]
+    clustering = dict(zip(net.node_ids, net.clustering()))
+    assert np.isclose(clustering[a.id], 1 / 3) and clustering[b.id] == 1.0 and clustering[d.id] == 0.0
+    # Cooperation: a->b, b->a, b->c, c->a, a->c; only b->c is unreturned
+    assert np.isclose(net.reciprocity(), 4 / 5)
+    tribes = net.tribe_cooperation()
+    assert np.isclose(tribes["in_tribe"], 5 / 6) and tribes["out_tribe"] == 0.0
+
+    # Decay fades old edges out entirely
+    net.decay = 0.5
+    net.compact(10)
+    assert net.n_nodes == 0 and net.average_clustering() == 0.0
+
+def test_network_in_engine():
+    print("Starting interaction network engine test...")
+    saved = dict(NETWORK_SETTINGS)
+    NETWORK_SETTINGS.update({"enabled": True, "compact_every": 10})
+    try:
+        engine = SimulationEngine()
+        played = 0
+        for _ in range(30):
+            engine.run_tick()
+            played += engine.coops_this_tick + engine.defects_this_tick
+        net = engine.network
+        assert net.events_recorded == played
+        net.compact(engine.tick)
+        summary = net.summary()
+        print(f"Network after 30 ticks: {summary}")
+        assert summary["edges"] > 0 and 0 <= summary["reciprocity"] <= 1
+        assert 0 <= summary["clustering"] <= 1
+        # Edge keys stay sorted (CSR order) across compactions
+        assert np.all(np.diff(net.keys) > 0)
+    finally:
+        NETWORK_SETTINGS.clear()
+        NETWORK_SETTINGS.update(saved)
+
+if __name__ == "__main__":
+    test_network_queries()
+    test_network_in_engine()
@@ -0,0 +1,109 @@
+import threading
+import time
+import numpy as np
+from simulation.engine import SimulationEngine
+from utils.metrics import default_registry
+from utils.pipeline import PipelinedLoop, TickSnapshot
+
+def _sequential(seed, ticks):
+    engine = SimulationEngine(seed=seed)
+    metrics = default_registry()
+    rows = []
+    for _ in range(ticks):
+        engine.run_tick()
+        rows.append(metrics.collect(engine))
+    return rows
+
+def test_pipelined_stats_match_sequential():
+    print("Comparing pipelined and sequential stats...")
+    engine = SimulationEngine(seed=21)
+    metrics = default_registry()
+    rows = []
+
+    def consume(snapshot):
+        stats = metrics.collect(snapshot)
+        rows.append(stats)
+        return stats
+
+    loop = PipelinedLoop(engine, consume, queue_size=4, policy="block", metrics=metrics)
+    loop.run(15)
+    print(loop.report())
+    assert len(rows) == 15
+    assert rows == _sequential(21, 15)
+
+def test_snapshot_is_frozen():
+    engine = SimulationEngine(seed=4)
+    metrics = default_registry()
+    engine.run_tick()
+    snapshot = TickSnapshot(engine, metrics, frame=True)
+    before = [(x, y, a.points, a.cultural_signature.copy()) for x, y, a in snapshot.world.iter_agents()]
+    inputs = {name: value.copy() for name, value in snapshot.metric_frames[None].cache.items()}
+    expected = metrics.collect(engine)
+    for _ in range(3):
+        engine.run_tick()
+    after = [(x, y, a.points, a.cultural_signature) for x, y, a in snapshot.world.iter_agents()]
+    for (x0, y0, pts0, c0), (x1, y1, pts1, c1) in zip(before, after):
+        assert (x0, y0, pts0) == (x1, y1, pts1) and np.array_equal(c0, c1)
+    assert all(np.array_equal(inputs[name], value) for name, value in snapshot.metric_frames[None].cache.items())
+    assert snapshot.tick == 1 and len(snapshot.world) == len(snapshot.agents)
+
+    # The stats come from the frozen inputs, not from the engine that has moved on
+    assert metrics.collect(snapshot) == expected
+
+def test_frames_only_on_requested_ticks():
+    engine = SimulationEngine(seed=4)
+    worlds = {}
+    def consume(snapshot):
+        worlds[snapshot.tick] = snapshot.world
+        return {"tick": snapshot.tick}
+    PipelinedLoop(engine, consume, policy="block", frames=lambda tick: tick % 3 == 0).run(6)
+    assert [t for t, w in sorted(worlds.items()) if w is not None] == [3, 6]
+
+def test_slow_consumer_policies():
+    def slow(snapshot, delay=0.05):
+        time.sleep(delay)
+        return {"tick": snapshot.tick}
+
+    # Drop: the engine never waits and the stats stage skips to newer ticks.
+    # The consumer holds its first snapshot until the engine has run every tick.
+    engine = SimulationEngine(seed=8)
+    finished = threading.Event()
+    run_tick = engine.run_tick
+    def tick_and_flag():
+        run_tick()
+        if engine.tick == 20:
+            finished.set()
+    engine.run_tick = tick_and_flag
+
+    seen = []
+    def gated(snapshot):
+        seen.append(snapshot.tick)
+        assert finished.wait(timeout=60)
+        return {"tick": snapshot.tick}
+
+    loop = PipelinedLoop(engine, gated, queue_size=1, policy="drop")
+    loop.run(20)
+    assert loop.ticks == 20
+    # At most one snapshot held by the consumer and one left in the queue: the rest were dropped
+    assert seen[-1] == 20 and len(seen) <= 2
+    assert loop.snapshots.dropped == 20 - len(seen) >= 18
+    assert loop.snapshots.blocked_seconds == 0
+
+    # Block: every tick reaches the stats stage
+    seen = []
+    loop = PipelinedLoop(SimulationEngine(seed=8), lambda s: seen.append(s.tick) or slow(s), queue_size=1, policy="block")
+    loop.run(10)
+    assert seen == list(range(1, 11))
+    assert loop.snapshots.dropped == 0
+
+def test_consumer_can_stop_the_run():
+    loop = PipelinedLoop(SimulationEngine(seed=8), lambda s: None if s.tick >= 3 else {"tick": s.tick}, queue_size=1)
+    loop.run(50)
+    assert loop.ticks < 50
+
+if __name__ == "__main__":
+    test_pipelined_stats_match_sequential()
+    test_snapshot_is_frozen()
+    test_frames_only_on_requested_ticks()
+    test_slow_consumer_policies()
+    test_consumer_can_stop_the_run()
@@ -0,0 +1,40 @@
+import numpy as np
+from config import BRAIN_SETTINGS
+from simulation.engine import SimulationEngine
+from simulation.kernels import create_kernel, compare_precision
+
+def _tensors(agent):
+    return [agent.dna["W1"], agent.dna["W2"], agent.dna["genetic_signature"], agent.dna["starting_culture"],
+            agent.cultural_signature, agent.W_hebb, agent.W_rl]
+
+def test_float32_end_to_end():
+    print("Checking float32 brain and identity tensors...")
+    saved = BRAIN_SETTINGS["precision"]
+    try:
+        sizes = {}
+        for precision in ("float64", "float32"):
+            BRAIN_SETTINGS["precision"] = precision
+            for backend in ("reference", "numpy"):
+                engine = SimulationEngine(kernel=create_kernel(backend), seed=6)
+                for _ in range(25):
+                    engine.run_tick()
+                # Founders, children and everything learned since keep the configured type
+                dtypes = {t.dtype for a in engine.agents for t in _tensors(a)}
+                dtypes |= {a.last_input.dtype for a in engine.agents if a.last_input is not None}
+                assert dtypes == {np.dtype(precision)}, (backend, dtypes)
+            sizes[precision] = sum(t.nbytes for a in engine.agents for t in _tensors(a)) / len(engine.agents)
+        print(f"Brain + identity bytes per agent: {sizes['float64']:.0f} -> {sizes['float32']:.0f}")
+        assert sizes["float32"] < 0.55 * sizes["float64"]
+    finally:
+        BRAIN_SETTINGS["precision"] = saved
+
+def test_float32_outcomes_unchanged():
+    passed, report = compare_precision(backend="numpy", seeds=(0, 1, 2), ticks=40)
+    for metric, row in report.items():
+        print(f"{metric}: float64={row['baseline']:.3f} float32={row['candidate']:.3f} (diff {row['diff']:.3f} <= {row['tolerance']:.3f})")
+    assert passed
+    assert BRAIN_SETTINGS["precision"] == "float64"   # Restored after the validation run
+
+if __name__ == "__main__":
+    test_float32_end_to_end()
+    test_float32_outcomes_unchanged()
@@ -0,0 +1,66 @@
+import tempfile
+from types import SimpleNamespace
+import numpy as np
+from simulation.engine import SimulationEngine
+from config import WORLD_SETTINGS
+from simulation.agent import Agent
+from simulation.world import SparseWorld
+from utils.recorder import FrameRecorder
+from utils.replay import FrameReader
+
+def test_recorded_frames_replay():
+    print("Starting frame recorder test...")
+    engine = SimulationEngine()
+    with tempfile.TemporaryDirectory() as tmp:
+        engine.recorder = FrameRecorder(path=tmp, chunk_ticks=4)
+        expected = {}
+        for _ in range(10):
+            engine.run_tick()
+            expected[engine.tick] = sorted((a.position, a.points) for a in engine.agents)
+
+        # 8 frames are on disk, 2 still buffered; the reader only sees flushed chunks
+        reader = FrameReader(tmp)
+        assert len(reader) == 8
+        engine.recorder.close()
+        reader.refresh()
+        assert len(reader) == 10
+
+        for tick in (1, 5, 10):
+            frame = reader.frame(reader.seek(tick))
+            assert reader.ticks[reader.seek(tick)] == tick
+            got = sorted(((int(x), int(y)), float(p)) for x, y, p in zip(frame["x"], frame["y"], frame["points"]))
+            assert [g[0] for g in got] == [e[0] for e in expected[tick]]
+            assert np.allclose([g[1] for g in got], [e[1] for e in expected[tick]], rtol=1e-5)
+        print(f"Replayed {len(reader)} frames, {reader.frames.nbytes} bytes")
+
+        # The viewer draws a frame without a display
+        import matplotlib
+        matplotlib.use("Agg")
+        from utils.replay import ReplayViewer
+        viewer = ReplayViewer(tmp)
+        viewer.slider.set_val(9)
+        assert viewer.position == 9
+        del reader, viewer
+
+def test_coordinates_past_16_bits():
+    print("Recording a map wider than 65536 cells...")
+    saved = dict(WORLD_SETTINGS)
+    WORLD_SETTINGS["grid_size"] = (100_000, 80_000)
+    try:
+        world = SparseWorld()
+        far = Agent(position=(99_999, 70_000))
+        world.place_agent(far, *far.position)
+        with tempfile.TemporaryDirectory() as tmp:
+            recorder = FrameRecorder(path=tmp, world_size=WORLD_SETTINGS["grid_size"])
+            recorder.record(SimpleNamespace(tick=1, world=world))
+            recorder.close()
+            frame = FrameReader(tmp).frame(0)
+            assert (int(frame["x"][0]), int(frame["y"][0])) == (99_999, 70_000)
+            del frame
+    finally:
+        WORLD_SETTINGS.clear()
+        WORLD_SETTINGS.update(saved)
+
+if __name__ == "__main__":
+    test_recorded_frames_replay()
+    test_coordinates_past_16_bits()
@@ -0,0 +1,69 @@
+import numpy as np
+from simulation import rng
+from simulation.agent import Agent
+from simulation.engine import SimulationEngine
+from config import POPULATION_SETTINGS, BRAIN_SETTINGS
+
+def _summary(parents, genomes):
+    resized = np.mean([g["W1"].shape[1] != p.dna["W1"].shape[1] for p, g in zip(parents, genomes)])
+    same = [(p, g) for p, g in zip(parents, genomes) if g["W1"].shape == p.dna["W1"].shape]
+    touched = np.mean([np.mean(g["W1"] != p.dna["W1"]) for p, g in same])
+    traits = np.mean([g["w_hebb"] != p.dna["w_hebb"] for p, g in zip(parents, genomes)])
+    drift = np.mean([np.any(g["genetic_signature"] != p.dna["genetic_signature"]) for p, g in zip(parents, genomes)])
+    return np.array([resized, touched, traits, drift])
+
+def test_mutate_batch_matches_mutate():
+    print("Comparing batched and scalar mutation rates...")
+    rng.seed(11)
+    parents = Agent.spawn_batch([(0, 0)] * 4000)
+    scalar = _summary(parents, [p.mutate() for p in parents])
+    batched = _summary(parents, Agent.mutate_batch(parents))
+    print(f"scalar={np.round(scalar, 3)} batched={np.round(batched, 3)}")
+    assert np.allclose(scalar, batched, atol=0.02)
+
+    for p, g in zip(parents[:200], Agent.mutate_batch(parents[:200])):
+        assert g["W1"].shape == (p.dna["W1"].shape[0], g["hidden_size"])
+        assert g["W2"].shape == (g["hidden_size"], p.dna["W2"].shape[1])
+        assert np.all((g["starting_culture"] >= 0) & (g["starting_culture"] <= 1))
+
+def test_mutate_batch_takes_parents_wider_than_max_hidden():
+    print("Mutating parents born under a larger max_hidden...")
+    rng.seed(12)
+    saved = BRAIN_SETTINGS["max_hidden"]
+    BRAIN_SETTINGS["max_hidden"] = 10
+    try:
+        parents = Agent.spawn_batch([(0, 0)] * 50)
+        wide = max(parents, key=lambda p: p.dna["hidden_size"])
+        BRAIN_SETTINGS["max_hidden"] = wide.dna["hidden_size"] - 1
+        genomes = Agent.mutate_batch(parents)
+    finally:
+        BRAIN_SETTINGS["max_hidden"] = saved
+    for p, g in zip(parents, genomes):
+        assert g["W1"].shape == (p.dna["W1"].shape[0], g["hidden_size"])
+        assert g["W2"].shape == (g["hidden_size"], p.dna["W2"].shape[1])
+        # Each child owns compact weights rather than a view into the batch block
+        assert g["W1"].base is None and g["W2"].base is None
+
+def test_boom_reproduction_has_no_conflicts():
+    print("Reproducing every agent in one tick...")
+    for protocol in ("stay", "displace", "launch"):
+        saved = POPULATION_SETTINGS["birth_protocol"]
+        POPULATION_SETTINGS["birth_protocol"] = protocol
+        try:
+            engine = SimulationEngine()
+            for a in engine.agents:
+                a.points = POPULATION_SETTINGS["reproduction_threshold"] + 100
+            before = len(engine.agents)
+            engine._manage_lifecycle()
+            positions = [a.position for a in engine.agents]
+            print(f"{protocol}: {before} -> {len(engine.agents)} agents")
+            assert len(set(positions)) == len(positions)
+            assert all(engine.world.grid[x, y] is a for a, (x, y) in zip(engine.agents, positions))
+            assert sum(1 for _ in engine.world.iter_agents()) == len(engine.agents)
+        finally:
+            POPULATION_SETTINGS["birth_protocol"] = saved
+
+if __name__ == "__main__":
+    test_mutate_batch_matches_mutate()
+    test_mutate_batch_takes_parents_wider_than_max_hidden()
+    test_boom_reproduction_has_no_conflicts()
@@ -0,0 +1,39 @@
+import csv
+import os
+from utils.rollup import RollupLogger
+
+def _read(path):
+    with open(path) as f:
+        return list(csv.DictReader(f))
+
+def test_rollups_and_crash_window():
+    print("Starting rollup logger test...")
+    logger = RollupLogger(filename="test_rollup", raw_window=50, levels=(10, 100), retention={10: 5})
+    try:
+        for t in range(300):
+            pop = 500 if t < 200 else 100  # Crash at tick 200
+            logger.log_tick({"tick": t, "pop": pop, "avg_pts": float(t % 10), "note": "ignored"})
+        logger.close()
+
+        r10 = _read(logger._path("r10"))
+        r100 = _read(logger._path("r100"))
+        assert len(r10) == 30 and len(r100) == 3
+        assert len(logger.levels[0].rows) == 5, "In-memory retention not applied"
+        assert r10[0]["tick_start"] == "0" and r10[0]["tick_end"] == "9"
+        assert float(r10[0]["avg_pts_min"]) == 0 and float(r10[0]["avg_pts_max"]) == 9
+        assert float(r100[2]["pop_mean"]) == 100 and float(r100[1]["avg_pts_mean"]) == 4.5
+        assert "note_min" not in r10[0]
+        assert len(logger.recent()) == 50
+
+        assert [(tick, reason) for tick, reason, _ in logger.events] == [(200, "crash")]
+        window = _read(logger.events[0][2])
+        ticks = [int(r["tick"]) for r in window]
+        print(f"Crash window covers ticks {ticks[0]}..{ticks[-1]}")
+        assert ticks[0] == 150 and ticks[-1] == 299
+    finally:
+        for name in os.listdir("logs"):
+            if name.startswith("test_rollup"):
+                os.remove(os.path.join("logs", name))
+
+if __name__ == "__main__":
+    test_rollups_and_crash_window()
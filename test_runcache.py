@@ -0,0 +1,89 @@
+import os
+import tempfile
+import time
+from config import WORLD_SETTINGS, POPULATION_SETTINGS
+from utils.runcache import RunCache, sweep, run_key, resolve_settings, run_point
+
+SMALL = {"WORLD_SETTINGS": {"grid_size": (16, 16)}, "POPULATION_SETTINGS": {"initial_agents": 60}}
+
+def _point(mutation_rate):
+    point = {group: dict(values) for group, values in SMALL.items()}
+    point["POPULATION_SETTINGS"]["mutation_rate"] = mutation_rate
+    return point
+
+def test_key_depends_on_results_not_outputs():
+    print("Checking what the cache key covers...")
+    base = resolve_settings(SMALL)
+    assert run_key(base, 1) == run_key(resolve_settings(SMALL), 1)
+    assert run_key(base, 1) != run_key(base, 2)
+    assert run_key(base, 1) != run_key(base, 1, version="other")
+    assert run_key(base, 1) != run_key(resolve_settings(_point(0.3)), 1)
+    # Output-only settings do not change results
+    assert run_key(base, 1) == run_key(resolve_settings({**SMALL, "RECORDER_SETTINGS": {"enabled": True}}), 1)
+
+def test_sweep_only_computes_new_points():
+    print("Re-running a grown sweep...")
+    saved_world, saved_pop = dict(WORLD_SETTINGS), dict(POPULATION_SETTINGS)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = RunCache(tmp)
+        first = sweep([_point(0.1), _point(0.2)], seeds=(1, 2), ticks=15, cache=cache)
+        assert [r["computed"] for r in first] == [True] * 4
+        second = sweep([_point(0.1), _point(0.2), _point(0.3)], seeds=(1, 2), ticks=15, cache=cache)
+        assert [r["computed"] for r in second] == [False] * 4 + [True] * 2
+        assert [r["final"] for r in second[:4]] == [r["final"] for r in first]
+        assert len(cache.stats(second[0]["key"])) == second[0]["ticks"]
+        print(cache.report())
+    # Runs leave the global config as they found it
+    assert WORLD_SETTINGS == saved_world and POPULATION_SETTINGS == saved_pop
+
+def test_resume_matches_uninterrupted_run():
+    print("Resuming an interrupted run from its checkpoint...")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = RunCache(tmp)
+        settings = resolve_settings(SMALL)
+        settings["RUN_SETTINGS"]["max_ticks"] = 30
+        run_point(("whole", settings, 5, tmp, 0))
+
+        # Killed just before the finished run is written: the tick-20 checkpoint survives
+        store = RunCache.store
+        def interrupted(*args):
+            raise KeyboardInterrupt
+        RunCache.store = interrupted
+        try:
+            run_point(("resumed", settings, 5, tmp, 10))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            RunCache.store = store
+        assert not cache.has("resumed") and cache.load_partial("resumed")[0].tick == 20
+
+        run_point(("resumed", settings, 5, tmp, 10))
+        assert cache.get("resumed")["resumed_from"] == 20
+        assert cache.get("resumed")["final"] == cache.get("whole")["final"]
+        assert cache.stats("resumed") == cache.stats("whole")
+
+def test_eviction_by_age_and_size():
+    print("Evicting by age, then least recently used...")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = RunCache(tmp, max_bytes=None, max_age_days=None)
+        now = time.time()
+        for k, age_days in enumerate((40, 3, 2, 1)):
+            key = f"{k:02d}" + "0" * 62
+            cache.store(key, {"key": key}, [{"tick": 1}], None)
+            stamp = now - age_days * 86400
+            for f in cache.path(key).iterdir():
+                os.utime(f, (stamp, stamp))
+        size = cache.entries()[0][1]
+
+        cache.max_age_days = 30
+        cache.max_bytes = 2 * size
+        cache.get("01" + "0" * 62)   # A hit makes the oldest survivor the most recently used
+        removed = cache.evict(now=now)
+        assert sorted(removed) == ["00" + "0" * 62, "02" + "0" * 62]
+        assert sorted(e[0] for e in cache.entries()) == ["01" + "0" * 62, "03" + "0" * 62]
+
+if __name__ == "__main__":
+    test_key_depends_on_results_not_outputs()
+    test_sweep_only_computes_new_points()
+    test_resume_matches_uninterrupted_run()
+    test_eviction_by_age_and_size()
@@ -0,0 +1,46 @@
+import os
+import multiprocessing as mp
+import numpy as np
+from simulation.engine import SimulationEngine
+from simulation.snapshot import SnapshotPublisher, SnapshotReader
+
+def _read_in_child(name, queue):
+    reader = SnapshotReader(name)
+    snap = reader.copy()
+    queue.put((snap["tick"], snap["population"], snap["points"].sum(), snap["position"].tolist()))
+    reader.close()
+
+def test_shared_snapshot_roundtrip():
+    print("Starting shared-memory snapshot test...")
+    engine = SimulationEngine()
+    engine.publisher = SnapshotPublisher(name=f"muqa_test_{os.getpid()}")
+    try:
+        for _ in range(3):
+            engine.run_tick()
+
+        queue = mp.Queue()
+        proc = mp.Process(target=_read_in_child, args=(engine.publisher.name, queue))
+        proc.start()
+        tick, pop, total_pts, positions = queue.get(timeout=30)
+        proc.join()
+
+        print(f"Reader saw tick {tick} with {pop} agents")
+        assert tick == engine.tick
+        assert pop == len(engine.agents)
+        assert np.isclose(total_pts, sum(a.points for a in engine.agents))
+        assert [tuple(p) for p in positions] == [a.position for a in engine.agents]
+
+        # A reader holding the front buffer stays valid across one more publish only
+        reader = SnapshotReader(engine.publisher.name)
+        views, token = reader.latest()
+        engine.run_tick()
+        assert reader.still_valid(token)
+        engine.run_tick()
+        assert not reader.still_valid(token)
+        del views
+        reader.close()
+    finally:
+        engine.publisher.close()
+
+if __name__ == "__main__":
+    test_shared_snapshot_roundtrip()
@@ -0,0 +1,47 @@
+from simulation.engine import SimulationEngine
+from utils.soak import SoakTest, unexplained_growth, format_report
+from config import WORLD_SETTINGS, POPULATION_SETTINGS
+
+def _small_engine():
+    saved = (WORLD_SETTINGS["grid_size"], POPULATION_SETTINGS["initial_agents"])
+    WORLD_SETTINGS["grid_size"], POPULATION_SETTINGS["initial_agents"] = (20, 20), 100
+    try:
+        return SimulationEngine(seed=2)
+    finally:
+        WORLD_SETTINGS["grid_size"], POPULATION_SETTINGS["initial_agents"] = saved
+
+def test_leak_rule():
+    flat = [{"tick": t, "traced": 1000 * 50 + (t % 3), "agents": 50} for t in range(30)]
+    rising = [{"tick": t, "traced": (1000 + 20 * t) * 50, "agents": 50} for t in range(30)]
+    growing_pop = [{"tick": t, "traced": 1000 * (50 + t), "agents": 50 + t} for t in range(30)]
+    shrinking_pop = [{"tick": t, "traced": 50_000 + 1000 * (80 - t), "agents": 80 - t} for t in range(30)]
+    assert unexplained_growth(flat) < 0.01
+    assert unexplained_growth(rising) > 0.1
+    assert abs(unexplained_growth(growing_pop)) < 0.01      # More agents, same memory each
+    assert abs(unexplained_growth(shrinking_pop)) < 0.01    # Fixed overhead over fewer agents is no leak
+
+def test_soak_tracks_containers_and_catches_a_leak():
+    print("Starting soak harness test...")
+    soak = SoakTest(engine=_small_engine(), ticks=120, sample_every=20, warmup=20)
+    report = soak.run()
+    print(format_report(report))
+    last = report["samples"][-1]
+    assert last["ledger_dead_entries"] == 0
+    assert last["ledger_entries"] <= last["agents"]
+    assert "memory_moves" in report["growth_per_1000_ticks"]
+
+    # A structure that grows every tick regardless of population is flagged
+    engine = _small_engine()
+    hoard = []
+    original = engine.run_tick
+    def leaky_tick():
+        original()
+        hoard.append(bytearray(200_000))
+    engine.run_tick = leaky_tick
+    report = SoakTest(engine=engine, ticks=120, sample_every=20, warmup=20).run()
+    assert not report["passed"]
+    assert any("test_soak.py" in site for site, _, _ in report["top_growth"])
+
+if __name__ == "__main__":
+    test_leak_rule()
+    test_soak_tracks_containers_and_catches_a_leak()
@@ -0,0 +1,59 @@
+from simulation.world import World, SparseWorld
+from simulation.engine import SimulationEngine
+from config import WORLD_SETTINGS
+import random
+
+class _Dummy:
+    def __init__(self, position):
+        self.position = position
+
+def test_sparse_matches_dense():
+    print("Comparing sparse and dense world backends...")
+    dense, sparse = World(), SparseWorld()
+    random.seed(3)
+    agents = []
+    for _ in range(300):
+        x = random.randint(0, dense.width - 1)
+        y = random.randint(0, dense.height - 1)
+        a = _Dummy((x, y))
+        if dense.place_agent(a, x, y):
+            assert sparse.place_agent(a, x, y)
+            agents.append(a)
+
+    for a in agents[:100]:
+        target = dense.find_empty_adjacent(*a.position)
+        if target:
+            old = a.position
+            assert dense.move_agent(a, target)
+            a.position = old
+            assert sparse.move_agent(a, target)
+    for a in agents[100:150]:
+        dense.remove_agent(a)
+        sparse.remove_agent(a)
+
+    for x in range(dense.width):
+        for y in range(dense.height):
+            assert dense.grid[x, y] is sparse.grid[x, y]
+            assert dense.get_neighbors(x, y) == sparse.get_neighbors(x, y)
+    assert sorted(c[:2] for c in dense.iter_agents()) == sorted(c[:2] for c in sparse.iter_agents())
+    assert sparse.population == len(agents) - 50
+    print(f"Backends agree on {sparse.population} agents in {len(sparse.chunks)} chunks.")
+
+def test_sparse_engine_huge_map():
+    print("Running a sparse engine on a 10,000 x 10,000 map...")
+    saved = dict(WORLD_SETTINGS)
+    WORLD_SETTINGS.update({"backend": "sparse", "grid_size": (10000, 10000)})
+    try:
+        engine = SimulationEngine()
+        assert isinstance(engine.world, SparseWorld)
+        for _ in range(5):
+            engine.run_tick()
+        assert engine.world.population == len(engine.agents)
+        print(f"Pop={len(engine.agents)} | Chunks={len(engine.world.chunks)}")
+    finally:
+        WORLD_SETTINGS.clear()
+        WORLD_SETTINGS.update(saved)
+
+if __name__ == "__main__":
+    test_sparse_matches_dense()
+    test_sparse_engine_huge_map()
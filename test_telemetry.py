@@ -0,0 +1,54 @@
+import json
+import socket
+import urllib.request
+from simulation.engine import SimulationEngine
+from utils.telemetry import TelemetryServer, downsample_frame
+
+def test_telemetry_serves_stats_and_stream():
+    print("Starting telemetry server test...")
+    engine = SimulationEngine()
+    server = TelemetryServer(port=0, queue_size=4).start()
+    try:
+        # A streaming client that never reads: it must not block publishing
+        slow = socket.create_connection((server.host, server.port))
+        slow.sendall(b"GET /stream HTTP/1.1\r\nHost: x\r\n\r\n")
+
+        for t in range(5):
+            engine.run_tick()
+            frame = downsample_frame(engine.world, size=10) if t == 0 else None
+            server.publish({"tick": engine.tick, "pop": len(engine.agents)}, frame)
+
+        url = f"http://{server.host}:{server.port}"
+        stats = json.loads(urllib.request.urlopen(f"{url}/stats", timeout=5).read())
+        frame = json.loads(urllib.request.urlopen(f"{url}/frame", timeout=5).read())
+        print(f"Served stats: {stats}")
+        assert stats == {"tick": engine.tick, "pop": len(engine.agents)}
+        assert frame["width"] == 10 and len(frame["color"]) == 10
+
+        slow.settimeout(5)
+        data = b""
+        while b"event: stats" not in data:
+            data += slow.recv(65536)
+        slow.close()
+    finally:
+        server.stop()
+
+def test_start_raises_when_port_is_taken():
+    print("Starting a second server on a taken port...")
+    first = TelemetryServer(port=0).start()
+    try:
+        second = TelemetryServer(host=first.host, port=first.port)
+        try:
+            second.start(timeout=5)
+        except OSError as error:
+            print(f"Refused as expected: {error}")
+        else:
+            second.stop()
+            raise AssertionError("Binding a taken port should fail")
+        assert second.loop is None
+    finally:
+        first.stop()
+
+if __name__ == "__main__":
+    test_telemetry_serves_stats_and_stream()
+    test_start_raises_when_port_is_taken()
@@ -0,0 +1,127 @@
+from collections import deque
+import numpy as np
+from simulation.territory import TerritoryMap, components
+from simulation.engine import SimulationEngine
+from config import WORLD_SETTINGS, POPULATION_SETTINGS, TERRITORY_SETTINGS
+
+class _World:
+    def __init__(self, width, height, geometry):
+        self.width, self.height, self.geometry = width, height, geometry
+
+class _Agent:
+    def __init__(self, position, culture):
+        self.position = position
+        self.cultural_signature = culture
+
+def _brute_components(world, agents, threshold):
+    """Breadth-first flood fill over similar Moore neighbours: cell -> component number."""
+    at = {a.position: a for a in agents}
+    comp = {}
+    for a in agents:
+        if a.position in comp:
+            continue
+        comp[a.position] = len(comp)
+        label, queue = comp[a.position], deque([a.position])
+        while queue:
+            x, y = queue.popleft()
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    nx, ny = x + dx, y + dy
+                    if world.geometry == "torus":
+                        nx, ny = nx % world.width, ny % world.height
+                    elif not (0 <= nx < world.width and 0 <= ny < world.height):
+                        continue
+                    b = at.get((nx, ny))
+                    if b is None or (nx, ny) in comp:
+                        continue
+                    if np.linalg.norm(at[(x, y)].cultural_signature - b.cultural_signature) <= threshold:
+                        comp[(nx, ny)] = label
+                        queue.append((nx, ny))
+    return comp
+
+def _same_partition(territories, comp):
+    labels = {(int(k // territories.height), int(k % territories.height)): int(l)
+              for k, l in zip(territories.keys, territories.labels)}
+    pairs = {(comp[cell], labels[cell]) for cell in comp}
+    return len(pairs) == len(set(comp.values())) == len(set(labels.values()))
+
+def test_components():
+    roots = components(6, np.array([0, 4, 2]), np.array([3, 5, 3]))
+    assert roots.tolist() == [0, 1, 0, 0, 4, 4]
+
+def test_incremental_labeling_matches_flood_fill():
+    print("Comparing incremental labels with a flood fill...")
+    gen = np.random.default_rng(0)
+    for geometry in ("square", "torus"):
+        world = _World(30, 20, geometry)
+        territories = TerritoryMap(threshold=0.35, min_area=3, full_relabel=1.0)
+        cells = [(x, y) for x in range(30) for y in range(20)]
+        agents = [_Agent(cells[i], gen.random(3)) for i in gen.choice(len(cells), 400, replace=False)]
+        incremental = 0
+        for step in range(60):
+            for a in gen.choice(agents, 10, replace=False):
+                a.cultural_signature = np.clip(a.cultural_signature + gen.normal(0, 0.2, 3), 0, 1)
+            for a in gen.choice(agents, 5, replace=False):
+                taken = {b.position for b in agents}
+                free = [c for c in cells if c not in taken]
+                a.position = free[gen.integers(len(free))]
+            if step % 7 == 0:
+                agents = agents[5:]
+            territories.update(world, agents)
+            incremental += territories.relabeled < len(agents)
+            assert _same_partition(territories, _brute_components(world, agents, 0.35)), (geometry, step)
+        assert incremental > 50
+        print(f"{geometry}: {territories.report()}")
+
+def test_labels_follow_a_moving_territory():
+    world = _World(20, 20, "square")
+    territories = TerritoryMap(threshold=0.1, min_area=4)
+    block = [_Agent((x, y), np.zeros(3)) for x in range(3) for y in range(3)]
+    territories.update(world, block)
+    label = territories.territory_of(1, 1)
+    # Shift the block one column right, one edge at a time
+    for y in range(3):
+        block[y].position = (3, y)
+        territories.update(world, block)
+    assert territories.territory_of(3, 1) == label
+    assert territories.stats["territories"] == 1 and territories.stats["max_area"] == 9
+    assert territories.stats["border"] == 12
+    assert territories.stats["drift"] > 0
+
+def test_frontier_rate():
+    world = _World(10, 10, "square")
+    territories = TerritoryMap(threshold=0.1, min_area=2)
+    left = [_Agent((0, y), np.zeros(3)) for y in range(3)]
+    right = [_Agent((1, y), np.ones(3)) for y in range(3)]
+    territories.update(world, left + right)
+    assert territories.stats["territories"] == 2
+    territories.record_game(left[0], right[0])
+    territories.record_game(left[0], left[1])
+    territories.update(world, left + right)
+    assert territories.stats["frontier_rate"] == 0.5
+
+def test_engine_records_territories():
+    saved = dict(WORLD_SETTINGS), dict(POPULATION_SETTINGS), dict(TERRITORY_SETTINGS)
+    WORLD_SETTINGS["grid_size"] = (20, 20)
+    POPULATION_SETTINGS["initial_agents"] = 200
+    TERRITORY_SETTINGS["enabled"] = True
+    try:
+        from utils.metrics import default_registry
+        engine = SimulationEngine(seed=3)
+        metrics = default_registry()
+        for _ in range(5):
+            engine.run_tick()
+            stats = metrics.collect(engine)
+        assert stats["territories"] == engine.territories.stats["territories"]
+        print(engine.territories.report())
+    finally:
+        for group, values in zip((WORLD_SETTINGS, POPULATION_SETTINGS, TERRITORY_SETTINGS), saved):
+            group.clear()
+            group.update(values)
+
+if __name__ == "__main__":
+    test_components()
+    test_incremental_labeling_matches_flood_fill()
+    test_labels_follow_a_moving_territory()
+    test_frontier_rate()
+    test_engine_records_territories()
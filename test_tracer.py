@@ -0,0 +1,100 @@
+import numpy as np
+from config import TRACER_SETTINGS
+from simulation.engine import SimulationEngine
+from simulation.kernels import create_kernel
+from simulation.tracer import DecisionTracer, LAYERS
+
+def _traced_run(backend, seed=12, ticks=15, rate=0.2):
+    saved = dict(TRACER_SETTINGS)
+    TRACER_SETTINGS.update({"enabled": True, "rate": rate})
+    try:
+        engine = SimulationEngine(kernel=create_kernel(backend), seed=seed)
+        for _ in range(ticks):
+            engine.run_tick()
+    finally:
+        TRACER_SETTINGS.clear()
+        TRACER_SETTINGS.update(saved)
+    return engine
+
+def _trajectory(engine, ticks=15):
+    rows = []
+    for _ in range(ticks):
+        engine.run_tick()
+        rows.append((len(engine.agents), engine.coops_this_tick))
+    return rows
+
+def test_tracer_records_sampled_decisions():
+    print("Tracing sampled decisions...")
+    for backend in ("reference", "numpy"):
+        engine = _traced_run(backend)
+        tracer = engine.tracer
+        rec = tracer.records()
+        assert tracer.recorded > 0
+        # Only followed agents appear, and every contribution row sums to the logits that were argmax-ed
+        followed = {a.id.int & 0xFFFFFFFFFFFFFFFF for a in engine.agents if tracer.follows(a)}
+        live_ids = {a.id.int & 0xFFFFFFFFFFFFFFFF for a in engine.agents}
+        assert set(rec["agent"].tolist()) & live_ids <= followed
+        logits = rec["contributions"].sum(axis=1)
+        assert np.array_equal(np.argmax(logits, axis=1), rec["action"])
+        assert rec["tick"].min() >= 0 and rec["tick"].max() < engine.tick
+
+        stats = tracer.dominance()
+        assert stats["decisions"] == tracer.recorded
+        assert abs(sum(stats["dominant"].values()) - 1.0) < 1e-9
+        assert set(stats["pivotal"]) == set(LAYERS)
+        print(f"{backend}: {tracer.report()}")
+
+def test_tracing_does_not_change_the_run():
+    plain = _trajectory(SimulationEngine(seed=12))
+    saved = dict(TRACER_SETTINGS)
+    TRACER_SETTINGS.update({"enabled": True, "rate": 0.5})
+    try:
+        traced = _trajectory(SimulationEngine(seed=12))
+    finally:
+        TRACER_SETTINGS.clear()
+        TRACER_SETTINGS.update(saved)
+    assert plain == traced
+
+def test_agent_without_memetic_weight_is_traced():
+    # Trait mutation clamps at 0.0, so a zero memetic weight occurs in long runs
+    engine = SimulationEngine(seed=3)
+    agent, opponent = engine.agents[0], engine.agents[1]
+    agent.dna = dict(agent.dna, w_memetic=0.0)
+    tracer = DecisionTracer(rate=1.0, capacity=8)
+    for neighbors in ([opponent], None):
+        agent.decide(opponent, 0.5, neighbors=neighbors, trace=tracer)
+    rec = tracer.records()
+    assert tracer.recorded == 2
+    assert not rec["contributions"][:, LAYERS.index("memetic")].any()
+    assert np.array_equal(np.argmax(rec["contributions"].sum(axis=1), axis=1), rec["action"])
+
+def test_ring_buffer_and_attribution():
+    class _Id:
+        def __init__(self, value):
+            self.int = value
+    class _Agent:
+        def __init__(self, value):
+            self.id = _Id(value)
+
+    tracer = DecisionTracer(rate=1.0, capacity=4)
+    agent = _Agent(7)
+    # Reptilian decides action 1 on its own; noise is small and never pivotal
+    for tick in range(6):
+        tracer.tick = tick
+        contrib = np.zeros((5, 4))
+        contrib[0, 1] = 2.0
+        contrib[4, 0] = 0.5
+        tracer.record(agent, np.zeros(7), contrib, 1)
+    rec = tracer.records()
+    assert tracer.recorded == 6
+    assert rec["tick"].tolist() == [2, 3, 4, 5]   # Oldest overwritten, returned in order
+    stats = tracer.dominance()
+    assert stats["dominant"]["reptilian"] == 1.0
+    assert stats["pivotal"]["reptilian"] == 1.0 and stats["pivotal"]["creative"] == 0.0
+    assert tracer.dominance(since_tick=5)["decisions"] == 1
+
+if __name__ == "__main__":
+    test_tracer_records_sampled_decisions()
+    test_tracing_does_not_change_the_run()
+    test_agent_without_memetic_weight_is_traced()
+    test_ring_buffer_and_attribution()
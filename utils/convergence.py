@@ -0,0 +1,103 @@
+"""
+utils/convergence.py
+Steady-state detection over the per-tick stats. Each watched metric keeps
+its values over the last 2 x window ticks (NaN on ticks it was missing,
+e.g. coop_share when nobody played), so every metric's window covers the
+same ticks; the run counts as steady once, for every metric, the two halves
+have means within a relative tolerance and comparable variances, and this
+has held for `patience` consecutive checks.
+"""
+from collections import deque
+import numpy as np
+from config import RUN_SETTINGS
+
+
+def _derived(stats):
+    """Adds metrics that are ratios of raw counters."""
+    plays = stats.get("total_C", 0) + stats.get("total_D", 0)
+    if plays:
+        stats = dict(stats, coop_share=stats["total_C"] / plays)
+    return stats
+
+
+class SteadyStateDetector:
+    def __init__(self, criteria=None, window=None, patience=None, check_every=None, var_ratio=None, floor=None):
+        self.criteria = criteria or RUN_SETTINGS["steady_criteria"]  # {metric: relative tolerance}
+        self.window = window or RUN_SETTINGS["steady_window"]
+        self.patience = patience or RUN_SETTINGS["steady_patience"]
+        self.check_every = check_every or RUN_SETTINGS["steady_check_every"]
+        self.var_ratio = var_ratio or RUN_SETTINGS["steady_var_ratio"]
+        self.floor = RUN_SETTINGS["steady_floor"] if floor is None else floor
+
+        self.history = {m: deque(maxlen=2 * self.window) for m in self.criteria}
+        self.ticks = deque(maxlen=2 * self.window)     # Tick of each history slot
+        self.streak = 0
+        self._streak_start = None
+        self.ticks_seen = 0
+        self.status = "running"      # "running", "steady" or "extinct"
+        self.converged_tick = None   # First tick of the window that tested steady
+        self.detected_tick = None    # Tick at which the detector decided
+
+    def metrics(self):
+        """Raw metrics the watched criteria are computed from."""
+        needed = ["pop"]
+        for metric in self.criteria:
+            needed += ["total_C", "total_D"] if metric == "coop_share" else [metric]
+        return list(dict.fromkeys(needed))
+
+    def update(self, stats):
+        """Feeds one tick of stats (None = extinct). Returns the current status."""
+        if self.status != "running":
+            return self.status
+        if stats is None or stats.get("pop", 1) == 0:
+            self.status = "extinct"
+            self.detected_tick = stats.get("tick") if stats else None
+            return self.status
+
+        stats = _derived(stats)
+        for metric, values in self.history.items():
+            values.append(float(stats[metric]) if metric in stats else np.nan)
+        self.ticks.append(stats.get("tick", self.ticks_seen))
+        self.ticks_seen += 1
+
+        if self.ticks_seen % self.check_every == 0:
+            if self.is_steady():
+                if self.streak == 0:
+                    self._streak_start = self.ticks[0]
+                self.streak += 1
+                if self.streak >= self.patience:
+                    self.status = "steady"
+                    self.detected_tick = stats.get("tick")
+                    self.converged_tick = self._streak_start
+            else:
+                self.streak = 0
+        return self.status
+
+    def is_steady(self):
+        """Windowed test on every metric over the latest 2 x window ticks (missing samples skipped)."""
+        if len(self.ticks) < 2 * self.window:
+            return False
+        for metric, tolerance in self.criteria.items():
+            arr = np.fromiter(self.history[metric], dtype=float)
+            first, second = arr[:self.window], arr[self.window:]
+            first, second = first[~np.isnan(first)], second[~np.isnan(second)]
+            if len(first) < 2 or len(second) < 2:
+                return False
+            arr = np.concatenate([first, second])
+
+            scale = max(abs(arr.mean()), self.floor)
+            if abs(first.mean() - second.mean()) > tolerance * scale:
+                return False
+
+            v1, v2 = first.var(), second.var()
+            noise_floor = (tolerance * scale) ** 2
+            if max(v1, v2) > noise_floor and max(v1, v2) > self.var_ratio * max(min(v1, v2), 1e-12):
+                return False
+        return True
+
+    def report(self):
+        if self.status == "steady":
+            return f"Steady state from tick {self.converged_tick} (detected at tick {self.detected_tick})"
+        if self.status == "extinct":
+            return f"Extinct at tick {self.detected_tick}"
+        return "No steady state detected"
@@ -7,6 +7,9 @@ import os
 from datetime import datetime
 
 class WorldLogger:
+    # Metrics this logger writes (see utils/metrics.py)
+    METRICS = ("pop", "avg_pts", "avg_fame", "avg_mem", "total_C", "total_D", "total_deaths")
+
     def __init__(self, filename=None):
         if filename is None:
             # Create a unique filename based on the current timestamp
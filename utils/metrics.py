@@ -0,0 +1,241 @@
+"""
+utils/metrics.py
+Metric registry. Each metric declares the per-agent inputs it reads, how
+often it runs and whether it uses every agent or a random sample. Inputs
+are extracted lazily and shared between metrics within a tick. Consumers
+(logger, visualizer, telemetry, convergence) subscribe to the metrics they
+need, so only those are computed. The registry times every metric and
+input, so the expensive ones are easy to spot.
+"""
+import time
+import numpy as np
+from config import METRIC_SETTINGS, TERRITORY_SETTINGS
+from simulation import rng
+
+
+def _column(attr):
+    return lambda engine, agents: np.array([getattr(a, attr) for a in agents], dtype=float)
+
+
+def _trait(name):
+    return lambda engine, agents: np.array([a.dna[name] for a in agents], dtype=float)
+
+
+# Per-agent inputs: name -> fn(engine, agents) -> array with one row per agent
+INPUTS = {
+    "points": _column("points"),
+    "memory": _column("memory_capacity"),
+    "fame": lambda engine, agents: np.array([engine.social_ledger.get_fame(observer=None, target=a) for a in agents]),
+    "culture": lambda engine, agents: np.array([a.cultural_signature for a in agents]),
+    "genetic": lambda engine, agents: np.array([a.dna["genetic_signature"] for a in agents]),
+    "hidden": _trait("hidden_size"),
+    "w_reptilian": _trait("w_reptilian"),
+    "w_hebb": _trait("w_hebb"),
+    "w_memetic": _trait("w_memetic"),
+    "w_rl": _trait("w_rl"),
+    "creativity": _trait("creativity"),
+    "hebb_norm": lambda engine, agents: np.linalg.norm(np.array([a.W_hebb for a in agents]), axis=(1, 2)),
+    "rl_norm": lambda engine, agents: np.linalg.norm(np.array([a.W_rl for a in agents]), axis=(1, 2)),
+    # Absolute reptilian weights on the KinProx and CultProx inputs (indices 5 and 6)
+    "identity_bias": lambda engine, agents: np.array([np.abs(a.dna["W1"][5:7, :]).sum(axis=1) for a in agents]),
+}
+
+
+class Metric:
+    def __init__(self, name, fn, inputs=(), every=1, sample=None):
+        self.name = name
+        self.fn = fn            # fn(frame) -> value
+        self.inputs = tuple(inputs)
+        self.every = every      # Ticks between evaluations (the last value is held in between)
+        self.sample = sample    # Fraction of agents to use, or None for all of them
+        self.value = None
+        self.calls = 0
+        self.seconds = 0.0
+
+
+class _Frame:
+    """One tick's view of (a sample of) the population; inputs are extracted on first use."""
+    def __init__(self, registry, engine, agents):
+        self.registry = registry
+        self.engine = engine
+        self.agents = agents
+        self.cache = {}
+        self.input_seconds = 0.0
+
+    def __getitem__(self, name):
+        value = self.cache.get(name)
+        if value is None:
+            start = time.perf_counter()
+            value = self.cache[name] = INPUTS[name](self.engine, self.agents)
+            elapsed = time.perf_counter() - start
+            self.input_seconds += elapsed
+            cost = self.registry.input_costs.setdefault(name, [0, 0.0])
+            cost[0] += 1
+            cost[1] += elapsed
+        return value
+
+
+class MetricRegistry:
+    def __init__(self, min_sample=None):
+        self.min_sample = min_sample or METRIC_SETTINGS["min_sample"]
+        self.metrics = {}           # In registration order (= column order)
+        self.subscriptions = {}     # subscriber -> metric names
+        self.input_costs = {}       # input -> [extractions, seconds]
+
+    def register(self, name, fn, inputs=(), every=None, sample=None):
+        """Adds a metric; METRIC_SETTINGS overrides apply when every/sample are not given."""
+        unknown = [i for i in inputs if i not in INPUTS]
+        if unknown:
+            raise ValueError(f"Metric {name} reads unknown inputs: {unknown}")
+        every = every or METRIC_SETTINGS["every"].get(name, 1)
+        sample = sample if sample is not None else METRIC_SETTINGS["sample"].get(name)
+        self.metrics[name] = Metric(name, fn, inputs, every, sample)
+
+    def metric(self, name, inputs=(), every=None, sample=None):
+        """Decorator form of `register`."""
+        def wrap(fn):
+            self.register(name, fn, inputs, every, sample)
+            return fn
+        return wrap
+
+    # --- Subscriptions ---
+    def subscribe(self, subscriber, names=None):
+        """Declares the metrics a consumer needs (None = all of them)."""
+        names = list(self.metrics) if names is None else list(names)
+        unknown = [n for n in names if n not in self.metrics]
+        if unknown:
+            raise ValueError(f"{subscriber} subscribed to unknown metrics: {unknown}")
+        self.subscriptions[subscriber] = names
+
+    def unsubscribe(self, subscriber):
+        self.subscriptions.pop(subscriber, None)
+
+    def active(self):
+        """Metrics some subscriber needs (all of them if nobody subscribed)."""
+        if not self.subscriptions:
+            return list(self.metrics)
+        wanted = set().union(*self.subscriptions.values())
+        return [name for name in self.metrics if name in wanted]
+
+    def select(self, stats, subscriber):
+        """The part of a collected stats dict one subscriber asked for."""
+        if stats is None:
+            return None
+        return dict({"tick": stats["tick"]}, **{k: stats[k] for k in self.subscriptions[subscriber] if k in stats})
+
+    # --- Evaluation ---
+    def _sample(self, engine, fraction):
+        agents = engine.agents
+        k = min(len(agents), max(self.min_sample, int(np.ceil(fraction * len(agents)))))
+        if k == len(agents):
+            return agents
+        # The engine's own streams when it has them (a coordinator does not)
+        picks = getattr(engine, "rng", rng).stream("metrics").generator.choice(len(agents), k, replace=False)
+        return [agents[i] for i in picks.tolist()]
+
+    def _due(self, name, tick):
+        metric = self.metrics[name]
+        return metric.value is None or tick % metric.every == 0
+
+    def prepare(self, engine, view):
+        """
+        Extracts every input of the metrics due this tick from the live engine
+        into frames bound to `view`, an engine stand-in (a pipeline snapshot)
+        that carries them as `metric_frames`. `collect(view)` then evaluates
+        those metrics without reading the engine's agents again.
+        """
+        frames = {}
+        if not engine.agents:
+            return frames
+        for name in self.active():
+            if not self._due(name, engine.tick):
+                continue
+            metric = self.metrics[name]
+            frame = frames.get(metric.sample)
+            if frame is None:
+                agents = engine.agents if metric.sample is None else self._sample(engine, metric.sample)
+                frame = frames[metric.sample] = _Frame(self, engine, agents)
+            for input_name in metric.inputs:
+                frame[input_name]
+        for frame in frames.values():
+            frame.engine = view
+            frame.input_seconds = 0.0   # Billed to the inputs already
+        return frames
+
+    def collect(self, engine):
+        """Evaluates the due, subscribed metrics. Returns None once the population is extinct."""
+        if not engine.agents:
+            return None
+        frames = dict(getattr(engine, "metric_frames", None) or {})
+        stats = {"tick": engine.tick}
+        for name in self.active():
+            metric = self.metrics[name]
+            if self._due(name, engine.tick):
+                frame = frames.get(metric.sample)
+                if frame is None:
+                    agents = engine.agents if metric.sample is None else self._sample(engine, metric.sample)
+                    frame = frames[metric.sample] = _Frame(self, engine, agents)
+                before = frame.input_seconds
+                start = time.perf_counter()
+                metric.value = metric.fn(frame)
+                # Input extraction is billed to the input, not to whichever metric triggered it
+                metric.seconds += time.perf_counter() - start - (frame.input_seconds - before)
+                metric.calls += 1
+            stats[name] = metric.value
+        return stats
+
+    # --- Cost Accounting ---
+    def costs(self):
+        """[(name, calls, total seconds)] for metrics and inputs, most expensive first."""
+        rows = [(name, m.calls, m.seconds) for name, m in self.metrics.items() if m.calls]
+        rows += [(f"input:{name}", calls, seconds) for name, (calls, seconds) in self.input_costs.items()]
+        return sorted(rows, key=lambda row: -row[2])
+
+    def cost_report(self, top=5):
+        rows = self.costs()[:top]
+        return "Metric costs: " + ", ".join(f"{name} {1000 * s / max(c, 1):.2f}ms x{c}" for name, c, s in rows)
+
+
+def _divergence(signatures):
+    return np.mean(np.linalg.norm(signatures - signatures.mean(axis=0), axis=1))
+
+
+def default_registry():
+    """The model's standard metrics (the columns the dashboard and logs have always used)."""
+    registry = MetricRegistry()
+    add = registry.register
+    add("pop", lambda f: len(f.engine.agents))
+    add("avg_pts", lambda f: f["points"].mean(), ["points"])
+    add("avg_fame", lambda f: f["fame"].mean(), ["fame"])
+    add("avg_mem", lambda f: f["memory"].mean(), ["memory"])
+    add("avg_idl", lambda f: f["culture"].mean(), ["culture"])
+    add("avg_hidden", lambda f: f["hidden"].mean(), ["hidden"])
+
+    # Cognitive Stack (Avg Trust Weights)
+    for trait in ("w_reptilian", "w_hebb", "w_memetic", "w_rl"):
+        add(f"avg_{trait}", lambda f, t=trait: f[t].mean(), [trait])
+
+    # Wisdom & Creativity
+    add("avg_hebb_norm", lambda f: f["hebb_norm"].mean(), ["hebb_norm"])
+    add("avg_rl_norm", lambda f: f["rl_norm"].mean(), ["rl_norm"])
+    add("avg_creativity", lambda f: f["creativity"].mean(), ["creativity"])
+
+    # Tribal Landscape
+    add("avg_gen_div", lambda f: _divergence(f["genetic"]), ["genetic"])
+    add("avg_cult_div", lambda f: _divergence(f["culture"]), ["culture"])
+    add("avg_fame_fog", lambda f: f.engine.total_fog / f.engine.interactions_this_tick
+        if f.engine.interactions_this_tick > 0 else 0.0)
+    add("avg_kin_bias", lambda f: f["identity_bias"][:, 0].mean(), ["identity_bias"])
+    add("avg_cult_bias", lambda f: f["identity_bias"][:, 1].mean(), ["identity_bias"])
+
+    # Engine counters
+    add("total_C", lambda f: f.engine.coops_this_tick)
+    add("total_D", lambda f: f.engine.defects_this_tick)
+    add("total_deaths", lambda f: f.engine.deaths_this_tick)
+
+    # Territories (simulation/territory.py), when the engine labels them
+    if TERRITORY_SETTINGS["enabled"]:
+        for key in ("territories", "mean_area", "max_area", "border", "frontier_rate"):
+            name = key if key == "territories" else f"territory_{key}"
+            add(name, lambda f, k=key: f.engine.territories.stats.get(k, 0))
+    return registry
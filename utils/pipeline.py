@@ -0,0 +1,246 @@
+"""
+utils/pipeline.py
+Pipelined run loop. The engine runs ticks back to back on its own thread
+and ends each one with a snapshot of only what the consumers read: the
+counters, the inputs of the metrics due this tick (extracted in bulk by
+the metric registry) and, on ticks that are rendered or streamed, a map
+frame of agent columns. Snapshots go through a bounded queue to the
+stats stage (metrics, logging, telemetry, convergence), which passes them
+with their stats through a second queue to the renderer on the calling
+thread (matplotlib wants the main thread). When a stage falls behind, its
+input queue either blocks the stage feeding it ("block", nothing is lost)
+or discards the oldest pending item ("drop", the stage skips to the newest
+tick and the producer never waits).
+
+Usage: python -m utils.pipeline [ticks]   (headless timing, serial vs pipelined)
+"""
+import copy
+import queue
+import sys
+import threading
+import time
+import numpy as np
+from config import PIPELINE_SETTINGS
+
+# Engine counters consumers read (see the stats in utils/metrics.py)
+COUNTERS = (
+    "deaths_this_tick", "coops_this_tick", "defects_this_tick", "moves_this_tick",
+    "ignores_this_tick", "total_fog", "interactions_this_tick"
+)
+
+
+class FrozenAgent:
+    """One row of a FrozenWorld, with the agent attributes the map views read."""
+    __slots__ = ("position", "points", "cultural_signature", "dna")
+
+    def __init__(self, position, points, culture, genetic):
+        self.position = position
+        self.points = points
+        self.cultural_signature = culture
+        self.dna = {"genetic_signature": genetic}
+
+
+class FrozenWorld:
+    """The occupied cells of the grid at snapshot time, as a few agent columns."""
+    def __init__(self, world, agents):
+        self.width, self.height = world.width, world.height
+        self.geometry = world.geometry
+        self.positions = np.array([a.position for a in agents], dtype=np.int64).reshape(-1, 2)
+        self.points = np.array([a.points for a in agents], dtype=float)
+        self.culture = np.array([a.cultural_signature for a in agents])
+        self.genetic = np.array([a.dna["genetic_signature"] for a in agents])
+
+    def __len__(self):
+        return len(self.positions)
+
+    def iter_agents(self):
+        rows = zip(self.positions.tolist(), self.points.tolist(), self.culture, self.genetic)
+        for (x, y), points, culture, genetic in rows:
+            yield x, y, FrozenAgent((x, y), points, culture, genetic)
+
+
+class TickSnapshot:
+    """
+    An engine stand-in fixed at the end of one tick. `metrics.collect` and
+    the map consumers (telemetry frames, the dashboard) accept it wherever
+    they take the engine. `agents` is only a list of the live agents, for
+    the population count: per-agent values come from `metric_frames` (the
+    inputs of the `metrics` registry's due metrics) and `world` (built when
+    `frame` is set, else None).
+    """
+    def __init__(self, engine, metrics=None, frame=False):
+        self.tick = engine.tick
+        self.seed = engine.seed
+        for name in COUNTERS:
+            setattr(self, name, getattr(engine, name, 0))
+        self.agents = list(engine.agents)
+        self.social_ledger = None
+        self.world = FrozenWorld(engine.world, engine.agents) if frame else None
+        self.metric_frames = metrics.prepare(engine, self) if metrics is not None else None
+        # Territory labels and stats are replaced, never modified, by each update
+        territories = getattr(engine, "territories", None)
+        self.territories = copy.copy(territories) if territories is not None else None
+
+
+class BoundedQueue:
+    """Hand-off between two stages with a block or drop-oldest overflow policy."""
+    def __init__(self, size, policy, cancelled):
+        if policy not in ("block", "drop"):
+            raise ValueError(f"Unknown pipeline policy: {policy}")
+        self.queue = queue.Queue(maxsize=size)
+        self.policy = policy
+        self.cancelled = cancelled     # Set when the run is aborted: blocked puts give up
+        self.closed = threading.Event()
+        self.dropped = 0
+        self.blocked_seconds = 0.0
+
+    def put(self, item):
+        if self.policy == "drop":
+            while True:
+                try:
+                    self.queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+        start = time.perf_counter()
+        while not self.cancelled.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        self.blocked_seconds += time.perf_counter() - start
+
+    def close(self):
+        """No more items will be put; readers finish what is queued."""
+        self.closed.set()
+
+    def __iter__(self):
+        while not self.cancelled.is_set():
+            try:
+                yield self.queue.get(timeout=0.05)
+            except queue.Empty:
+                if self.closed.is_set() and self.queue.empty():
+                    return
+
+
+class PipelinedLoop:
+    """
+    Runs `engine` for up to `max_ticks` ticks with the consumers off its
+    critical path. `consume(snapshot)` runs on the stats thread and returns
+    the tick's stats, or None to end the run; `render(snapshot, stats)`, if
+    given, runs on the calling thread. `metrics` is the registry `consume`
+    collects from, and `frames(tick)` says which snapshots need a map frame
+    (default: all of them when rendering, else none).
+    """
+    def __init__(self, engine, consume, render=None, queue_size=None, policy=None,
+                 render_queue_size=None, render_policy=None, metrics=None, frames=None):
+        self.engine = engine
+        self.consume = consume
+        self.render = render
+        self.metrics = metrics
+        self.frames_needed = frames or (lambda tick: render is not None)
+        self.stop = threading.Event()        # Ask the engine to stop after its current tick
+        self.cancelled = threading.Event()   # Abort every stage (error or interrupt)
+        self.snapshots = BoundedQueue(queue_size or PIPELINE_SETTINGS["queue_size"],
+                                      policy or PIPELINE_SETTINGS["policy"], self.cancelled)
+        self.frames = BoundedQueue(render_queue_size or PIPELINE_SETTINGS["render_queue_size"],
+                                   render_policy or PIPELINE_SETTINGS["render_policy"], self.cancelled)
+        self.engine_seconds = 0.0
+        self.wall_seconds = 0.0
+        self.ticks = 0
+        self._errors = []
+
+    def _produce(self, max_ticks):
+        try:
+            for _ in range(max_ticks):
+                if self.stop.is_set() or self.cancelled.is_set():
+                    break
+                start = time.perf_counter()
+                self.engine.run_tick()
+                snapshot = TickSnapshot(self.engine, self.metrics, self.frames_needed(self.engine.tick))
+                self.engine_seconds += time.perf_counter() - start
+                self.ticks += 1
+                self.snapshots.put(snapshot)
+                if not self.engine.agents:
+                    break
+        except BaseException as exc:
+            self._fail(exc)
+        finally:
+            self.snapshots.close()
+
+    def _stats(self):
+        try:
+            for snapshot in self.snapshots:
+                stats = self.consume(snapshot)
+                if stats is None:
+                    self.stop.set()
+                    break
+                if self.render is not None:
+                    self.frames.put((snapshot, stats))
+        except BaseException as exc:
+            self._fail(exc)
+        finally:
+            self.frames.close()
+
+    def _fail(self, exc):
+        self._errors.append(exc)
+        self.cancelled.set()
+
+    def run(self, max_ticks):
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(target=self._produce, args=(max_ticks,), name="engine", daemon=True),
+            threading.Thread(target=self._stats, name="stats", daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            if self.render is not None:
+                for snapshot, stats in self.frames:
+                    self.render(snapshot, stats)
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.1)
+        except BaseException:
+            self.cancelled.set()
+            raise
+        finally:
+            self.wall_seconds = time.perf_counter() - start
+        if self._errors:
+            raise self._errors[0]
+
+    def report(self):
+        return (f"Pipeline: {self.ticks} ticks in {self.wall_seconds:.1f}s wall "
+                f"({self.engine_seconds:.1f}s engine) | engine blocked {self.snapshots.blocked_seconds:.1f}s | "
+                f"dropped {self.snapshots.dropped} snapshots, {self.frames.dropped} frames")
+
+
+def _timing(ticks):
+    """Headless run of the default metrics, serial then pipelined, from the same seed."""
+    from simulation.engine import SimulationEngine
+    from utils.metrics import default_registry
+
+    engine, metrics = SimulationEngine(seed=1), default_registry()
+    start = time.perf_counter()
+    for _ in range(ticks):
+        engine.run_tick()
+        if metrics.collect(engine) is None:
+            break
+    serial = time.perf_counter() - start
+
+    engine, metrics = SimulationEngine(seed=1), default_registry()
+    loop = PipelinedLoop(engine, metrics.collect, metrics=metrics, policy="block")
+    loop.run(ticks)
+    return serial, loop
+
+
+if __name__ == "__main__":
+    ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    serial, loop = _timing(ticks)
+    print(f"Serial: {ticks} ticks in {serial:.1f}s wall")
+    print(loop.report())
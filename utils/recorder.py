@@ -0,0 +1,100 @@
+"""
+utils/recorder.py
+Records per-tick map frames (what Visualizer.update draws: position,
+cultural colour, genetic colour, points) into a compact on-disk stream that
+utils/replay.py can memory-map and seek instantly. A recording is a
+directory holding:
+
+    meta.json   grid size and record layout
+    frames.bin  fixed-size agent records, frame after frame
+    index.bin   one (tick, first record, record count) row per frame
+
+Frames are buffered in memory and written one chunk at a time.
+"""
+import json
+import os
+from datetime import datetime
+import numpy as np
+from config import RECORDER_SETTINGS, WORLD_SETTINGS
+
+FORMAT_VERSION = 2
+
+# 18 bytes per agent (version 1 stored x/y as <u2, which wraps past 65535;
+# readers take the layout from meta.json)
+FRAME_DTYPE = np.dtype([
+    ("x", "<u4"),
+    ("y", "<u4"),
+    ("culture", "u1", (3,)),
+    ("genetic", "u1", (3,)),
+    ("points", "<f4"),
+])
+INDEX_DTYPE = np.dtype([("tick", "<i8"), ("start", "<i8"), ("count", "<i8")])
+
+
+def encode_frame(world):
+    """Packs the occupied cells of a world into FRAME_DTYPE records."""
+    cells = list(world.iter_agents())
+    frame = np.empty(len(cells), dtype=FRAME_DTYPE)
+    if not cells:
+        return frame
+    frame["x"] = [c[0] for c in cells]
+    frame["y"] = [c[1] for c in cells]
+    culture = np.array([c[2].cultural_signature[:3] for c in cells])
+    genetic = np.array([c[2].dna["genetic_signature"][:3] for c in cells])
+    frame["culture"] = np.round(np.clip(culture, 0, 1) * 255)
+    # Same mapping the visualizer uses for border colours
+    frame["genetic"] = np.round(np.clip((genetic + 2) / 4, 0, 1) * 255)
+    frame["points"] = [c[2].points for c in cells]
+    return frame
+
+
+class FrameRecorder:
+    def __init__(self, path=None, world_size=None, chunk_ticks=None):
+        if path is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            path = os.path.join(RECORDER_SETTINGS["directory"], f"recording_{timestamp}")
+        self.path = path
+        self.chunk_ticks = chunk_ticks or RECORDER_SETTINGS["chunk_ticks"]
+        os.makedirs(path, exist_ok=True)
+
+        self.width, self.height = world_size or WORLD_SETTINGS["grid_size"]
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({
+                "version": FORMAT_VERSION,
+                "width": self.width,
+                "height": self.height,
+                "frame_dtype": FRAME_DTYPE.descr,
+            }, f)
+        # Truncate any previous stream in this directory
+        open(os.path.join(path, "frames.bin"), "wb").close()
+        open(os.path.join(path, "index.bin"), "wb").close()
+
+        self.records_written = 0
+        self._pending = []
+
+    def record(self, engine):
+        """Buffers the engine's current map; flushes a chunk every chunk_ticks frames."""
+        self._pending.append((engine.tick, encode_frame(engine.world)))
+        if len(self._pending) >= self.chunk_ticks:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        index = np.empty(len(self._pending), dtype=INDEX_DTYPE)
+        start = self.records_written
+        for k, (tick, frame) in enumerate(self._pending):
+            index[k] = (tick, start, len(frame))
+            start += len(frame)
+
+        with open(os.path.join(self.path, "frames.bin"), "ab") as f:
+            f.write(np.concatenate([frame for _, frame in self._pending]).tobytes())
+        # The index is appended last, so a reader never sees frames that are not on disk yet
+        with open(os.path.join(self.path, "index.bin"), "ab") as f:
+            f.write(index.tobytes())
+
+        self.records_written = start
+        self._pending = []
+
+    def close(self):
+        self.flush()
@@ -0,0 +1,118 @@
+"""
+utils/replay.py
+Replays a recording made by utils/recorder.py without re-simulating.
+FrameReader memory-maps the stream, so seeking to any tick is a binary
+search plus a slice. ReplayViewer draws the same map as the live
+dashboard, with a tick slider and play/pause at any speed.
+
+Usage: python -m utils.replay <recording directory> [ticks per second]
+"""
+import json
+import os
+import sys
+import numpy as np
+from utils.recorder import FRAME_DTYPE, INDEX_DTYPE
+
+
+class FrameReader:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.width, self.height = self.meta["width"], self.meta["height"]
+        descr = self.meta.get("frame_dtype")
+        self.dtype = np.dtype([tuple(field) for field in descr]) if descr else FRAME_DTYPE
+        self.refresh()
+
+    def refresh(self):
+        """Re-reads the index (picks up chunks flushed by a still-running recorder)."""
+        self.index = np.fromfile(os.path.join(self.path, "index.bin"), dtype=INDEX_DTYPE)
+        frames_path = os.path.join(self.path, "frames.bin")
+        total = int(self.index["start"][-1] + self.index["count"][-1]) if len(self.index) else 0
+        self.frames = np.memmap(frames_path, dtype=self.dtype, mode="r", shape=(total,)) if total else \
+            np.empty(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.index)
+
+    @property
+    def ticks(self):
+        return self.index["tick"]
+
+    def frame(self, i):
+        """Zero-copy view of the i-th recorded frame."""
+        _, start, count = self.index[i]
+        return self.frames[start:start + count]
+
+    def seek(self, tick):
+        """Frame position of the last frame recorded at or before `tick`."""
+        return max(0, int(np.searchsorted(self.index["tick"], tick, side="right")) - 1)
+
+
+class ReplayViewer:
+    def __init__(self, path, fps=None):
+        import matplotlib.pyplot as plt
+        from matplotlib.widgets import Slider, Button
+
+        self.plt = plt
+        self.reader = FrameReader(path)
+        if len(self.reader) == 0:
+            raise ValueError(f"{path} holds no frames yet")
+        self.position = 0
+        self.playing = False
+        self.fps = fps or 30
+
+        self.fig = plt.figure(figsize=(10, 11))
+        self.ax_map = self.fig.add_axes([0.05, 0.15, 0.9, 0.8])
+        ax_slider = self.fig.add_axes([0.15, 0.06, 0.6, 0.03])
+        ax_button = self.fig.add_axes([0.8, 0.05, 0.12, 0.05])
+        self.slider = Slider(ax_slider, "Tick", 0, len(self.reader) - 1, valinit=0, valstep=1)
+        self.slider.on_changed(self._on_slide)
+        self.button = Button(ax_button, "Play")
+        self.button.on_clicked(self._toggle)
+
+        self.timer = self.fig.canvas.new_timer(interval=max(1, int(1000 / self.fps)))
+        self.timer.add_callback(self._advance)
+        self.show_frame(0)
+
+    def show_frame(self, position):
+        self.position = position
+        frame = self.reader.frame(position)
+        ax = self.ax_map
+        ax.clear()
+        ax.set_title(f"Tick: {self.reader.ticks[position]} | Pop: {len(frame)} | Replay", fontsize=14)
+        ax.set_xlim(-0.5, self.reader.width - 0.5)
+        ax.set_ylim(-0.5, self.reader.height - 0.5)
+        ax.set_aspect('equal')
+        if len(frame):
+            ax.scatter(
+                frame["x"], frame["y"],
+                c=frame["culture"] / 255.0, s=np.clip(frame["points"] / 2, 10, 400),
+                edgecolors=frame["genetic"] / 255.0, linewidths=1.5, alpha=0.9
+            )
+        self.fig.canvas.draw_idle()
+
+    def _on_slide(self, value):
+        if int(value) != self.position:
+            self.show_frame(int(value))
+
+    def _toggle(self, _event=None):
+        self.playing = not self.playing
+        self.button.label.set_text("Pause" if self.playing else "Play")
+        (self.timer.start if self.playing else self.timer.stop)()
+
+    def _advance(self):
+        if self.position + 1 >= len(self.reader):
+            self._toggle()
+            return
+        self.slider.set_val(self.position + 1)
+
+    def show(self):
+        self.plt.show()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    ReplayViewer(sys.argv[1], fps=float(sys.argv[2]) if len(sys.argv) > 2 else None).show()
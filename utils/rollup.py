@@ -0,0 +1,175 @@
+"""
+utils/rollup.py
+Multi-resolution metric logging for long runs. Per-tick stats are kept raw
+only for a recent window; older data survives as 10/100/1000-tick
+min/max/mean rollups (each level built from the one below it). Anomaly
+triggers (extinction, population crash) save a full-resolution window
+around the event, so detail is kept exactly where it matters.
+"""
+import csv
+import os
+from collections import deque
+from datetime import datetime
+from config import ROLLUP_SETTINGS
+
+
+def extinction_trigger(history, stats):
+    """Fires once when the population hits zero."""
+    if stats.get("pop", 1) == 0 and (not history or history[-1].get("pop", 0) > 0):
+        return "extinction"
+    return None
+
+
+def crash_trigger(drop=None, window=None):
+    """Fires when the population falls by `drop` (fraction) within `window` ticks."""
+    drop = ROLLUP_SETTINGS["crash_drop"] if drop is None else drop
+    window = window or ROLLUP_SETTINGS["crash_window"]
+
+    def trigger(history, stats):
+        if len(history) < window or "pop" not in stats:
+            return None
+        peak = max(row.get("pop", 0) for row in list(history)[-window:])
+        if peak > 0 and stats["pop"] <= peak * (1 - drop) and history[-1].get("pop", 0) > peak * (1 - drop):
+            return "crash"
+        return None
+    return trigger
+
+
+class _Level:
+    """Accumulates `size` rows of the level below into one min/max/mean row."""
+    def __init__(self, size, retention):
+        self.size = size
+        self.rows = deque(maxlen=retention)
+        self._reset()
+
+    def _reset(self):
+        self.acc = {}
+        self.count = 0
+        self.tick_start = None
+
+    def add(self, row, span):
+        """Adds a row covering `span` ticks. Returns the finished rollup row, if any."""
+        if self.tick_start is None:
+            self.tick_start = row["tick_start"]
+        for key, (lo, hi, mean) in row["metrics"].items():
+            a = self.acc.get(key)
+            if a is None:
+                self.acc[key] = [lo, hi, mean * span, span]
+            else:
+                a[0] = min(a[0], lo)
+                a[1] = max(a[1], hi)
+                a[2] += mean * span
+                a[3] += span
+        self.count += span
+        if self.count < self.size:
+            return None
+
+        rolled = {
+            "tick_start": self.tick_start,
+            "tick_end": row["tick_end"],
+            "metrics": {k: (lo, hi, total / n) for k, (lo, hi, total, n) in self.acc.items()},
+        }
+        self.rows.append(rolled)
+        self._reset()
+        return rolled
+
+
+class RollupLogger:
+    """
+    Drop-in alternative to WorldLogger (same log_tick/get_log_path API).
+    Writes one CSV per rollup level plus one CSV per captured event window.
+    """
+    def __init__(self, filename=None, raw_window=None, levels=None, retention=None, triggers=None):
+        if filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"world_history_{timestamp}"
+        self.name = os.path.splitext(filename)[0]
+        self.directory = "logs"
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.raw_window = raw_window or ROLLUP_SETTINGS["raw_window"]
+        self.raw = deque(maxlen=self.raw_window)
+        retention = retention or ROLLUP_SETTINGS["retention"]
+        self.levels = [_Level(size, retention.get(size)) for size in (levels or ROLLUP_SETTINGS["levels"])]
+        self.triggers = triggers if triggers is not None else [extinction_trigger, crash_trigger()]
+        self.post_window = ROLLUP_SETTINGS["event_post_window"]
+
+        self.metric_names = None
+        self.events = []      # (tick, reason, path) of every captured window
+        self._captures = []   # Windows still collecting post-event ticks
+
+    def _path(self, suffix):
+        return os.path.join(self.directory, f"{self.name}_{suffix}.csv")
+
+    def log_tick(self, stats):
+        tick = stats.get("tick")
+        numeric = {k: float(v) for k, v in stats.items() if k != "tick" and isinstance(v, (int, float))}
+        if self.metric_names is None:
+            self.metric_names = sorted(numeric)
+            for level in self.levels:
+                self._write_header(self._path(f"r{level.size}"), level=True)
+
+        # --- Anomaly triggers (see the history before this tick) ---
+        for trigger in self.triggers:
+            reason = trigger(self.raw, stats)
+            if reason:
+                self._captures.append({"tick": tick, "reason": reason, "rows": list(self.raw), "left": self.post_window})
+
+        row = dict(numeric, tick=tick)
+        self.raw.append(row)
+        for capture in self._captures:
+            capture["rows"].append(row)
+            capture["left"] -= 1
+        self._flush_captures()
+
+        # --- Rollups (each level consumes the rows finished by the level below) ---
+        rolled = {"tick_start": tick, "tick_end": tick, "metrics": {k: (v, v, v) for k, v in numeric.items()}}
+        span = 1
+        for level in self.levels:
+            rolled = level.add(rolled, span)
+            if rolled is None:
+                break
+            self._append_rollup(level, rolled)
+            span = level.size
+
+    def _flush_captures(self, force=False):
+        still_open = []
+        for capture in self._captures:
+            if capture["left"] > 0 and not force:
+                still_open.append(capture)
+                continue
+            path = self._path(f"event_{capture['tick']}_{capture['reason']}")
+            self._write_header(path, level=False)
+            with open(path, mode='a', newline='') as f:
+                writer = csv.writer(f)
+                for row in capture["rows"]:
+                    writer.writerow([row.get("tick")] + [row.get(k, "") for k in self.metric_names])
+            self.events.append((capture["tick"], capture["reason"], path))
+        self._captures = still_open
+
+    def _write_header(self, path, level):
+        if level:
+            header = ["tick_start", "tick_end"] + [f"{k}_{s}" for k in self.metric_names for s in ("min", "max", "mean")]
+        else:
+            header = ["tick"] + self.metric_names
+        with open(path, mode='w', newline='') as f:
+            csv.writer(f).writerow(header)
+
+    def _append_rollup(self, level, rolled):
+        values = []
+        for k in self.metric_names:
+            lo, hi, mean = rolled["metrics"].get(k, ("", "", ""))
+            values += [round(lo, 4), round(hi, 4), round(mean, 4)] if lo != "" else ["", "", ""]
+        with open(self._path(f"r{level.size}"), mode='a', newline='') as f:
+            csv.writer(f).writerow([rolled["tick_start"], rolled["tick_end"]] + values)
+
+    def recent(self):
+        """Per-tick rows still inside the raw window."""
+        return list(self.raw)
+
+    def close(self):
+        """Writes out event windows that are still waiting for post-event ticks."""
+        self._flush_captures(force=True)
+
+    def get_log_path(self):
+        return self._path(f"r{self.levels[0].size}") if self.levels else self.directory
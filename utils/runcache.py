@@ -0,0 +1,298 @@
+"""
+utils/runcache.py
+Content-addressed cache of run results for parameter sweeps. A run is
+keyed by a hash of its fully resolved settings (every config.py group that
+changes the simulation), its seed and the engine version (a hash of the
+code that produces the results), and its outputs live under that key:
+
+    <directory>/<key[:2]>/<key>/result.json     summary, settings and seed
+                                stats.csv       per-tick stats
+                                checkpoint.pkl  final engine (with its random streams)
+
+`sweep()` only computes the (point, seed) pairs whose key is not cached,
+so re-running a sweep after adding points computes just the new ones.
+Runs checkpoint every `checkpoint_every` ticks and an interrupted run
+resumes from its last checkpoint. The cache is trimmed after each sweep:
+entries past `max_age_days` go first, then the least recently used until
+it fits in `max_bytes`.
+
+Usage: python -m utils.runcache [stats|evict]
+"""
+import csv
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import pickle
+import shutil
+import sys
+import time
+from functools import lru_cache
+from pathlib import Path
+import numpy as np
+import config
+from config import CACHE_SETTINGS
+
+# Groups that only control outputs (where results go, how they are watched)
+# and so never change a run's results
+OUTPUT_GROUPS = (
+    "SNAPSHOT_SETTINGS", "TELEMETRY_SETTINGS", "RECORDER_SETTINGS", "SOAK_SETTINGS",
+    "PIPELINE_SETTINGS", "BRANCH_SETTINGS", "CACHE_SETTINGS"
+)
+
+# Code whose changes invalidate cached results
+_ENGINE_SOURCES = ("simulation/*.py", "utils/metrics.py", "utils/convergence.py")
+_ROOT = Path(__file__).resolve().parent.parent
+
+
+@lru_cache(maxsize=None)
+def engine_version():
+    """Hash of the simulation code (and the stats definitions)."""
+    digest = hashlib.sha256()
+    for pattern in _ENGINE_SOURCES:
+        for path in sorted(_ROOT.glob(pattern)):
+            digest.update(path.relative_to(_ROOT).as_posix().encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _canonical(value):
+    """A JSON-ready form with one spelling per value (dicts sorted, tuple keys allowed)."""
+    if isinstance(value, dict):
+        items = [(_canonical(k), _canonical(v)) for k, v in value.items()]
+        return [[k, v] for k, v in sorted(items, key=lambda kv: json.dumps(kv[0]))]
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return value
+
+
+def resolve_settings(overrides=None):
+    """The current config with {group: {key: value}} overrides merged in."""
+    settings = config.snapshot_settings()
+    for group, values in (overrides or {}).items():
+        settings[group].update(values)
+    return settings
+
+
+def run_key(settings, seed, version=None):
+    """Cache key of a run: resolved settings, seed and engine version."""
+    relevant = {g: v for g, v in settings.items() if g not in OUTPUT_GROUPS}
+    relevant["RNG_SETTINGS"] = {k: v for k, v in relevant.get("RNG_SETTINGS", {}).items() if k != "seed"}
+    blob = json.dumps([_canonical(relevant), seed, version or engine_version()], separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def _write_atomic(path, write, mode="w"):
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, mode, **({} if "b" in mode else {"newline": ""})) as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class RunCache:
+    """Result entries on disk, keyed by `run_key`."""
+    RESULT = "result.json"
+    STATS = "stats.csv"
+    CHECKPOINT = "checkpoint.pkl"
+    PARTIAL = "partial.pkl"     # Mid-run checkpoint of an unfinished run
+
+    def __init__(self, directory=None, max_bytes=None, max_age_days=None):
+        self.root = Path(directory or CACHE_SETTINGS["directory"])
+        self.max_bytes = CACHE_SETTINGS["max_bytes"] if max_bytes is None else max_bytes
+        self.max_age_days = CACHE_SETTINGS["max_age_days"] if max_age_days is None else max_age_days
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, key):
+        return self.root / key[:2] / key
+
+    def has(self, key):
+        return (self.path(key) / self.RESULT).exists()
+
+    def get(self, key):
+        """The cached result (None on a miss). A hit counts as a use for eviction."""
+        path = self.path(key) / self.RESULT
+        try:
+            with open(path) as f:
+                result = json.load(f)
+        except FileNotFoundError:
+            return None
+        os.utime(path)
+        return result
+
+    def stats(self, key):
+        """Per-tick stats of a cached run as a list of dicts (CSV strings)."""
+        with open(self.path(key) / self.STATS, newline="") as f:
+            return list(csv.DictReader(f))
+
+    def load_checkpoint(self, key):
+        """The engine at the end of a cached run (its random streams included)."""
+        with open(self.path(key) / self.CHECKPOINT, "rb") as f:
+            return pickle.load(f)
+
+    # --- Writing (worker side) ---
+    def save_partial(self, key, state):
+        entry = self.path(key)
+        entry.mkdir(parents=True, exist_ok=True)
+        _write_atomic(entry / self.PARTIAL, lambda f: pickle.dump(state, f, pickle.HIGHEST_PROTOCOL), "wb")
+
+    def load_partial(self, key):
+        try:
+            with open(self.path(key) / self.PARTIAL, "rb") as f:
+                return pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def store(self, key, result, rows, checkpoint):
+        """Writes a finished run. result.json goes last: an entry without it is incomplete."""
+        entry = self.path(key)
+        entry.mkdir(parents=True, exist_ok=True)
+        fields = list(dict.fromkeys(k for row in rows for k in row))
+
+        def write_stats(f):
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+
+        _write_atomic(entry / self.STATS, write_stats)
+        _write_atomic(entry / self.CHECKPOINT, lambda f: pickle.dump(checkpoint, f, pickle.HIGHEST_PROTOCOL), "wb")
+        _write_atomic(entry / self.RESULT, lambda f: json.dump(result, f, indent=1))
+        (entry / self.PARTIAL).unlink(missing_ok=True)
+
+    # --- Eviction ---
+    def entries(self):
+        """(key, bytes, last used) of every entry, finished or not."""
+        found = []
+        for entry in self.root.glob("??/*"):
+            if not entry.is_dir():
+                continue
+            files = [p for p in entry.iterdir() if p.is_file()]
+            if not files:
+                continue
+            size = sum(p.stat().st_size for p in files)
+            found.append((entry.name, size, max(p.stat().st_mtime for p in files)))
+        return found
+
+    def evict(self, now=None):
+        """Drops entries past the age limit, then the least recently used until under the size limit."""
+        now = time.time() if now is None else now
+        entries = sorted(self.entries(), key=lambda e: e[2])
+        removed = []
+        if self.max_age_days is not None:
+            cutoff = now - self.max_age_days * 86400
+            removed = [e for e in entries if e[2] < cutoff]
+            entries = [e for e in entries if e[2] >= cutoff]
+        if self.max_bytes is not None:
+            total = sum(e[1] for e in entries)
+            while entries and total > self.max_bytes:
+                oldest = entries.pop(0)
+                total -= oldest[1]
+                removed.append(oldest)
+        for key, _, _ in removed:
+            shutil.rmtree(self.path(key), ignore_errors=True)
+        return [e[0] for e in removed]
+
+    def report(self):
+        entries = self.entries()
+        done = sum(1 for key, _, _ in entries if self.has(key))
+        size = sum(e[1] for e in entries)
+        return (f"Run cache {self.root}: {done} finished, {len(entries) - done} partial, "
+                f"{size / 2**20:.1f} MiB")
+
+
+def run_point(job):
+    """
+    Computes one run into the cache, resuming from its partial checkpoint if
+    there is one. Runs in a worker process (or in-process, restoring config).
+    """
+    from simulation.engine import SimulationEngine
+    from utils.convergence import SteadyStateDetector
+    from utils.metrics import default_registry
+
+    key, settings, seed, directory, checkpoint_every = job
+    cache = RunCache(directory, max_bytes=None, max_age_days=None)
+    saved = config.snapshot_settings()
+    config.apply_settings(settings)
+    try:
+        stop_on_steady = config.RUN_SETTINGS["stop_on_steady_state"]
+        ticks = config.RUN_SETTINGS["max_ticks"]
+        partial = cache.load_partial(key)
+        if partial is not None:
+            engine, rows, detector = partial
+        else:
+            engine = SimulationEngine(seed=seed)
+            rows, detector = [], SteadyStateDetector()
+        metrics = default_registry()   # Lambdas: rebuilt rather than pickled
+        resumed_from = engine.tick
+
+        while engine.tick < ticks and engine.agents:
+            engine.run_tick()
+            stats = {k: _plain(v) for k, v in metrics.collect(engine).items()}
+            if stats:
+                rows.append(stats)
+            if detector.update(stats or None) == "steady" and stop_on_steady:
+                break
+            if checkpoint_every and engine.tick % checkpoint_every == 0 and engine.tick < ticks:
+                cache.save_partial(key, (engine, rows, detector))
+
+        result = {
+            "key": key, "seed": seed, "version": engine_version(), "ticks": engine.tick,
+            "status": detector.status, "converged_tick": detector.converged_tick,
+            "final": rows[-1] if rows else {}, "settings": _canonical(settings),
+            "resumed_from": resumed_from,
+        }
+        cache.store(key, result, rows, engine)
+        return key
+    finally:
+        config.apply_settings(saved)
+
+
+def sweep(points, seeds=(0,), ticks=None, cache=None, processes=None, checkpoint_every=None):
+    """
+    Runs every override dict in `points` with every seed, computing only the
+    runs missing from the cache. Returns the cached results in (point, seed)
+    order, each with its "point" overrides and "computed" set if it ran now.
+    """
+    cache = cache if cache is not None else RunCache()
+    checkpoint_every = CACHE_SETTINGS["checkpoint_every"] if checkpoint_every is None else checkpoint_every
+    runs = []
+    for point in points:
+        settings = resolve_settings(point)
+        if ticks:
+            settings["RUN_SETTINGS"]["max_ticks"] = ticks
+        for seed in seeds:
+            runs.append((point, seed, settings, run_key(settings, seed)))
+
+    todo = {key: (key, settings, seed, str(cache.root), checkpoint_every)
+            for _, seed, settings, key in runs if not cache.has(key)}
+    processes = processes or CACHE_SETTINGS["processes"] or 1
+    if processes > 1 and len(todo) > 1:
+        with mp.get_context("spawn").Pool(min(processes, len(todo))) as pool:
+            pool.map(run_point, list(todo.values()), chunksize=1)
+    else:
+        for job in todo.values():
+            run_point(job)
+
+    results = []
+    for point, seed, _, key in runs:
+        result = cache.get(key)
+        result.update(point=point, computed=key in todo)
+        results.append(result)
+    cache.evict()
+    return results
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    cache = RunCache()
+    if command == "evict":
+        removed = cache.evict()
+        print(f"Evicted {len(removed)} entries")
+    print(cache.report())
@@ -0,0 +1,177 @@
+"""
+utils/soak.py
+Long-run memory soak test. Runs the engine for many ticks and every
+`sample_every` ticks records traced Python memory (tracemalloc), process
+RSS and the sizes of the structures known to grow with the run (social
+ledger, private memories, network, lineage, dashboard history). The report
+gives each one's growth rate and the allocation sites that grew the most.
+The run fails if, after warm-up, memory keeps rising beyond what the live
+population accounts for.
+
+Usage: python -m utils.soak [ticks]
+"""
+import os
+import sys
+import tracemalloc
+import numpy as np
+from config import SOAK_SETTINGS
+
+
+def rss_bytes():
+    """Current resident set size (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def container_sizes(engine, viz=None):
+    """Element counts of the structures that grow with the run."""
+    live = {a.id for a in engine.agents}
+    ledger = engine.social_ledger.registry
+    sizes = {
+        "agents": len(engine.agents),
+        "ledger_entries": len(ledger),
+        "ledger_dead_entries": sum(1 for k in ledger if k not in live),
+        "ledger_history": sum(len(record["history"]) for record in ledger.values()),
+        "memory_opponents": sum(len(a.private_memory) for a in engine.agents),
+        "memory_dead_opponents": sum(1 for a in engine.agents for k in a.private_memory if k not in live),
+        "memory_moves": sum(len(h) for a in engine.agents for h in a.private_memory.values()),
+    }
+    if getattr(engine, "network", None) is not None:
+        sizes["network_nodes"] = engine.network.n_nodes
+        sizes["network_edges"] = len(engine.network.keys)
+        sizes["network_buffer"] = engine.network._n
+    if getattr(engine, "lineage", None) is not None:
+        sizes["lineage_nodes"] = engine.lineage.size
+    if viz is not None:
+        sizes["visualizer_points"] = len(viz.history_ticks)
+    return sizes
+
+
+def growth_rates(samples, per=1000):
+    """Least-squares slope of every sampled quantity, in units per `per` ticks."""
+    if len(samples) < 2:
+        return {}
+    ticks = np.array([s["tick"] for s in samples], dtype=float)
+    rates = {}
+    for key in samples[0]:
+        if key == "tick":
+            continue
+        values = np.array([s.get(key, 0) for s in samples], dtype=float)
+        rates[key] = float(np.polyfit(ticks, values, 1)[0] * per)
+    return rates
+
+
+def unexplained_growth(samples, key="traced"):
+    """
+    Growth of `key` over the samples that the live population does not
+    explain, relative to its mean. `key` is regressed on the agent count
+    (fixed overhead + memory per agent); a leak shows up as residuals that
+    trend upward with time.
+    """
+    if len(samples) < 3:
+        return 0.0
+    ticks = np.array([s["tick"] for s in samples], dtype=float)
+    values = np.array([s[key] for s in samples], dtype=float)
+    design = np.column_stack([np.ones(len(samples)), [s["agents"] for s in samples]])
+    coef = np.linalg.lstsq(design, values, rcond=None)[0]
+    trend = np.polyfit(ticks, values - design @ coef, 1)[0]
+    return float(trend * (ticks[-1] - ticks[0]) / max(values.mean(), 1.0))
+
+
+class SoakTest:
+    def __init__(self, engine=None, ticks=None, sample_every=None, warmup=None, tolerance=None, top=None, viz=None):
+        self.engine = engine
+        self.ticks = ticks or SOAK_SETTINGS["ticks"]
+        self.sample_every = sample_every or SOAK_SETTINGS["sample_every"]
+        self.warmup = SOAK_SETTINGS["warmup"] if warmup is None else warmup
+        self.tolerance = SOAK_SETTINGS["tolerance"] if tolerance is None else tolerance
+        self.top = top or SOAK_SETTINGS["top"]
+        self.viz = viz
+
+        self.samples = []
+        self._baseline = None   # First tracemalloc snapshot after warm-up
+        self._latest = None
+
+    def _snapshot(self):
+        snapshot = tracemalloc.take_snapshot()
+        return snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+    def sample(self):
+        # Measured on a filtered snapshot: get_traced_memory() would also count the snapshots we keep
+        snapshot = self._snapshot()
+        traced = sum(stat.size for stat in snapshot.statistics("filename"))
+        row = {"tick": self.engine.tick, "traced": traced, "rss": rss_bytes()}
+        row.update(container_sizes(self.engine, self.viz))
+        self.samples.append(row)
+
+        if self.engine.tick >= self.warmup:
+            self._latest = snapshot
+            if self._baseline is None:
+                self._baseline = snapshot
+
+    def run(self):
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        try:
+            if self.engine is None:
+                from simulation.engine import SimulationEngine
+                self.engine = SimulationEngine()
+            for _ in range(self.ticks):
+                self.engine.run_tick()
+                if not self.engine.agents:
+                    break
+                if self.engine.tick % self.sample_every == 0:
+                    self.sample()
+        finally:
+            if started:
+                tracemalloc.stop()
+        return self.report()
+
+    def top_growth(self):
+        """[(allocation site, bytes grown, blocks grown)] since the end of warm-up."""
+        if self._baseline is None or self._latest is self._baseline:
+            return []
+        stats = self._latest.compare_to(self._baseline, "lineno")
+        return [(str(s.traceback[0]), s.size_diff, s.count_diff) for s in stats[:self.top]]
+
+    def report(self):
+        settled = [s for s in self.samples if s["tick"] >= self.warmup]
+        growth = unexplained_growth(settled)
+        return {
+            "passed": growth <= self.tolerance,
+            "unexplained_growth": growth,
+            "ticks": self.engine.tick,
+            "samples": self.samples,
+            "growth_per_1000_ticks": growth_rates(settled),
+            "top_growth": self.top_growth(),
+        }
+
+
+def format_report(report):
+    lines = [f"Soak test {'PASSED' if report['passed'] else 'FAILED'} after {report['ticks']} ticks "
+             f"(unexplained growth {100 * report['unexplained_growth']:+.1f}%)"]
+    if report["samples"]:
+        last = report["samples"][-1]
+        per_agent = last["traced"] / last["agents"] if last["agents"] else 0
+        lines.append(f"Traced {last['traced'] / 1e6:.1f} MB, RSS {last['rss'] / 1e6:.1f} MB, "
+                     f"{per_agent / 1e3:.1f} kB per live agent")
+    lines.append("Growth per 1000 ticks:")
+    for key, rate in sorted(report["growth_per_1000_ticks"].items()):
+        lines.append(f"  {key:<24} {rate:+.1f}")
+    if report["top_growth"]:
+        lines.append("Top allocation growth since warm-up:")
+        for site, size, count in report["top_growth"]:
+            lines.append(f"  {size / 1e3:+10.1f} kB {count:+8d} blocks  {site}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    result = SoakTest(ticks=int(sys.argv[1]) if len(sys.argv) > 1 else None).run()
+    print(format_report(result))
+    sys.exit(0 if result["passed"] else 1)
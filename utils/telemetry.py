@@ -0,0 +1,183 @@
+"""
+utils/telemetry.py
+Opt-in live telemetry for headless runs. An asyncio HTTP server on a
+background thread serves the latest per-tick stats and downsampled map
+frames to any number of local clients:
+
+    GET /stats   -> latest stats (JSON)
+    GET /frame   -> latest map frame (JSON)
+    GET /stream  -> Server-Sent Events: one "stats" event per tick, "frame" events as produced
+
+Every streaming client has its own bounded queue. When a client cannot keep
+up, its oldest pending events are dropped; the simulation never waits.
+"""
+import asyncio
+import json
+import threading
+import numpy as np
+from config import TELEMETRY_SETTINGS, IDENTITY_SETTINGS
+
+
+def _to_json(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Cannot serialize {type(obj).__name__}")
+
+
+def downsample_frame(world, size=None):
+    """
+    Reduces the map to a size x size raster: agent density per block and the
+    mean cultural colour of each block's occupants (what the map view shows).
+    """
+    size = size or TELEMETRY_SETTINGS["frame_size"]
+    fw, fh = min(size, world.width), min(size, world.height)
+    count = np.zeros((fw, fh))
+    color = np.zeros((fw, fh, IDENTITY_SETTINGS["cultural_dim"]))
+
+    cells = [(x, y, agent.cultural_signature) for x, y, agent in world.iter_agents()]
+    if cells:
+        xs = np.array([c[0] for c in cells]) * fw // world.width
+        ys = np.array([c[1] for c in cells]) * fh // world.height
+        np.add.at(count, (xs, ys), 1)
+        np.add.at(color, (xs, ys), np.array([c[2] for c in cells]))
+        occupied = count > 0
+        color[occupied] /= count[occupied][:, None]
+
+    block_area = (world.width / fw) * (world.height / fh)
+    return {
+        "width": fw,
+        "height": fh,
+        "density": np.round(count / block_area, 3),
+        "color": np.round(color, 3),
+    }
+
+
+class _Client:
+    def __init__(self, queue_size):
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def push(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class TelemetryServer:
+    def __init__(self, host=None, port=None, unix_socket=None, queue_size=None):
+        self.host = host or TELEMETRY_SETTINGS["host"]
+        self.port = TELEMETRY_SETTINGS["port"] if port is None else port
+        self.unix_socket = unix_socket or TELEMETRY_SETTINGS.get("unix_socket")
+        self.queue_size = queue_size or TELEMETRY_SETTINGS["queue_size"]
+
+        self.loop = None
+        self.clients = set()
+        self.latest = {"stats": None, "frame": None}
+        self._servers = []
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+
+    # --- Engine side (simulation thread) ---
+    def start(self, timeout=10):
+        """Starts serving on a daemon thread. Returns once the sockets are bound, raises if they cannot be."""
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise TimeoutError(f"Telemetry server did not start within {timeout}s")
+        if self._error is not None:
+            self._thread.join()
+            raise self._error
+        return self
+
+    def publish(self, stats, frame=None):
+        """Hands a tick's stats (and optional frame) to the server. Never blocks."""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._broadcast, stats, frame)
+
+    def stop(self):
+        if self.loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout=5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        self.loop = None
+
+    # --- Server side (telemetry thread) ---
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(self._listen())
+            self.loop = loop
+        except Exception as error:   # e.g. the port is taken: start() re-raises it
+            self._error = error
+            loop.close()
+            return
+        finally:
+            self._ready.set()
+        loop.run_forever()
+        loop.close()
+
+    async def _listen(self):
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self._servers.append(server)
+        if self.unix_socket:
+            self._servers.append(await asyncio.start_unix_server(self._handle, self.unix_socket))
+
+    async def _shutdown(self):
+        for server in self._servers:
+            server.close()
+        for client in list(self.clients):
+            client.push(None)  # Wakes the stream so it can exit
+
+    def _broadcast(self, stats, frame):
+        events = [("stats", json.dumps(stats, default=_to_json))]
+        if frame is not None:
+            events.append(("frame", json.dumps(frame, default=_to_json)))
+        for kind, payload in events:
+            self.latest[kind] = payload
+            for client in self.clients:
+                client.push((kind, payload))
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass  # Headers are not needed
+            parts = request.decode("latin-1").split()
+            path = parts[1] if len(parts) > 1 else "/"
+
+            if path == "/stream":
+                await self._stream(writer)
+            elif path.lstrip("/") in self.latest:
+                body = (self.latest[path.lstrip("/")] or "null").encode()
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Content-Length: %d\r\nConnection: close\r\n\r\n" % len(body) + body)
+            else:
+                writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _stream(self, writer):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\n")
+        client = _Client(self.queue_size)
+        self.clients.add(client)
+        try:
+            while True:
+                event = await client.queue.get()
+                if event is None:
+                    break
+                kind, payload = event
+                writer.write(f"event: {kind}\ndata: {payload}\n\n".encode())
+                await writer.drain()
+        finally:
+            self.clients.discard(client)
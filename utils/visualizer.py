@@ -3,6 +3,7 @@ utils/visualizer.py
 The "Eye" of the simulation. Renders the social grid with wealth and reputation data.
 Updated to strictly use the Red-Yellow-Green (RdYlGn) diverging spectrum.
 """
+from collections import deque
 import matplotlib
 import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
@@ -15,7 +16,15 @@ except:
     pass
 
 class Visualizer:
-    def __init__(self, world_size):
+    # Metrics the dashboard plots (see utils/metrics.py)
+    METRICS = (
+        "pop", "avg_fame", "avg_idl", "avg_pts", "avg_mem", "avg_hidden",
+        "avg_w_reptilian", "avg_w_hebb", "avg_w_memetic", "avg_w_rl",
+        "avg_hebb_norm", "avg_rl_norm", "avg_creativity",
+        "avg_gen_div", "avg_cult_div", "avg_fame_fog", "avg_kin_bias", "avg_cult_bias"
+    )
+
+    def __init__(self, world_size, history_window=5000):
         self.width, self.height = world_size
         plt.ion() 
         
@@ -48,32 +57,32 @@ class Visualizer:
         
         self.cbar = None
         
-        # Data History
-        self.history_ticks = []
-        self.history_pop = []
-        self.history_fame = []
-        self.history_idl = []
-        self.history_wealth = []
-        self.history_mem = []
-        self.history_hidden = []
+        # Data History (the charts show the last `history_window` ticks)
+        self.history_ticks = deque(maxlen=history_window)
+        self.history_pop = deque(maxlen=history_window)
+        self.history_fame = deque(maxlen=history_window)
+        self.history_idl = deque(maxlen=history_window)
+        self.history_wealth = deque(maxlen=history_window)
+        self.history_mem = deque(maxlen=history_window)
+        self.history_hidden = deque(maxlen=history_window)
         
         # Cognitive Stack Data
-        self.hist_w_reptilian = []
-        self.hist_w_hebb = []
-        self.hist_w_memetic = []
-        self.hist_w_rl = []
+        self.hist_w_reptilian = deque(maxlen=history_window)
+        self.hist_w_hebb = deque(maxlen=history_window)
+        self.hist_w_memetic = deque(maxlen=history_window)
+        self.hist_w_rl = deque(maxlen=history_window)
         
         # Wisdom & Creativity
-        self.hist_hebb_norm = []
-        self.hist_rl_norm = []
-        self.hist_creativity = []
+        self.hist_hebb_norm = deque(maxlen=history_window)
+        self.hist_rl_norm = deque(maxlen=history_window)
+        self.hist_creativity = deque(maxlen=history_window)
         
         # Tribal Landscape
-        self.history_gen_div = []
-        self.history_cult_div = []
-        self.history_fame_fog = []
-        self.history_kin_bias = []
-        self.history_cult_bias = []
+        self.history_gen_div = deque(maxlen=history_window)
+        self.history_cult_div = deque(maxlen=history_window)
+        self.history_fame_fog = deque(maxlen=history_window)
+        self.history_kin_bias = deque(maxlen=history_window)
+        self.history_cult_bias = deque(maxlen=history_window)
 
     def _add_legend(self):
         """Creates a custom legend for dot sizes (Wealth/Points)."""
@@ -100,23 +109,20 @@ class Visualizer:
 
         x_coords, y_coords, sizes, colors, edge_colors = [], [], [], [], []
 
-        for x in range(self.width):
-            for y in range(self.height):
-                agent = world.grid[x, y]
-                if agent is not None:
-                    x_coords.append(x)
-                    y_coords.append(y)
-                    # Culture Vector -> RGB (Fill Color)
-                    base_color = agent.cultural_signature
-                    colors.append(base_color)
-                    
-                    # Genetic Vector -> RGB (Edge Color)
-                    # Shift and clip to ensure valid [0, 1] RGB
-                    gen_color = np.clip((agent.dna["genetic_signature"] + 2) / 4, 0, 1)
-                    edge_colors.append(gen_color)
-                    
-                    size = min(max(agent.points / 2, 10), 400)
-                    sizes.append(size)
+        for x, y, agent in world.iter_agents():
+            x_coords.append(x)
+            y_coords.append(y)
+            # Culture Vector -> RGB (Fill Color)
+            base_color = agent.cultural_signature
+            colors.append(base_color)
+            
+            # Genetic Vector -> RGB (Edge Color)
+            # Shift and clip to ensure valid [0, 1] RGB
+            gen_color = np.clip((agent.dna["genetic_signature"] + 2) / 4, 0, 1)
+            edge_colors.append(gen_color)
+            
+            size = min(max(agent.points / 2, 10), 400)
+            sizes.append(size)
 
         if x_coords:
             scatter = self.ax_map.scatter(